@@ -1,67 +1,62 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import random
+import threading
 import time
-import re
 
 from agno.agent import Agent
-from agno.team import Team
-from agno.models.openai import OpenAIChat
-from agno.db.sqlite import SqliteDb
+from agno.run.agent import RunEvent
+from agno.run.base import RunStatus
 
+from agents.narrative_cache import get_narrative_cache, narrative_cache_key
+from agents.prompts import AGENT_BUDGETS, build_prompt, token_report
+from agents.session_store import get_session_store
+from agents.validation import NumberStream, ValueIndex, check_numbers, unverified
 from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.tracing import current_span, span
 
 
-db = SqliteDb(db_file="agents.db")
+MODEL_ID = "gpt-4o"
 
+# How often a blocking debate checks its cancel event.
+CANCEL_POLL_SECONDS = 0.05
 
-# -----------------------------------
-# Agent Team Builder
-# -----------------------------------
-def build_agent_team():
-
-    bull = Agent(
-        name="Bullish Analyst",
-        role="Present upside thesis using only structured analytics.",
-        model=OpenAIChat(id="gpt-4o"),
-        instructions=[
+AGENT_SPECS = {
+    "bull": {
+        "name": "Bullish Analyst",
+        "role": "Present upside thesis using only structured analytics.",
+        "instructions": [
             "Use institutional tone.",
             "Highlight potential recovery drivers.",
             "Use only provided analytics.",
             "Do NOT invent numbers.",
         ],
-        db=db,
-        markdown=True,
-    )
-
-    bear = Agent(
-        name="Bearish Analyst",
-        role="Present downside risks and structural concerns.",
-        model=OpenAIChat(id="gpt-4o"),
-        instructions=[
+    },
+    "bear": {
+        "name": "Bearish Analyst",
+        "role": "Present downside risks and structural concerns.",
+        "instructions": [
             "Emphasize volatility, drawdown, and downside persistence.",
             "Use only provided analytics.",
             "Do NOT invent numbers.",
         ],
-        db=db,
-        markdown=True,
-    )
-
-    risk = Agent(
-        name="Chief Risk Officer",
-        role="Evaluate institutional risk posture.",
-        model=OpenAIChat(id="gpt-4o"),
-        instructions=[
+    },
+    "risk": {
+        "name": "Chief Risk Officer",
+        "role": "Evaluate institutional risk posture.",
+        "instructions": [
             "Focus on volatility percentile and drawdown severity.",
             "Clearly separate facts from interpretation.",
             "Do NOT invent numbers.",
         ],
-        db=db,
-        markdown=True,
-    )
-
-    chair = Agent(
-        name="Investment Committee Chair",
-        role="Produce final institutional memo aligned to regime discipline.",
-        model=OpenAIChat(id="gpt-4o"),
-        instructions=[
+    },
+    "chair": {
+        "name": "Investment Committee Chair",
+        "role": "Produce final institutional memo aligned to regime discipline.",
+        "instructions": [
             "Review analyst perspectives.",
             "Weight conclusions according to regime severity.",
             "If DEFENSIVE, downside must dominate narrative.",
@@ -70,65 +65,461 @@ def build_agent_team():
             "Never contradict regime classification.",
             "Do NOT invent numbers.",
         ],
-        db=db,
+    },
+}
+
+ANALYST_KEYS = ["bull", "bear", "risk"]
+
+REGENERATION_NOTE = """
+A previous draft was stopped by validation: {notes}
+Write the memo again without repeating these issues.
+"""
+
+
+def default_model_factory():
+    # The OpenAI client is only imported once a real model is built, so
+    # MockChat runs and analytics-only imports never load it.
+    from agno.models.openai import OpenAIChat
+
+    return OpenAIChat(id=MODEL_ID)
+
+
+def build_agent(key: str, model_factory=None):
+    """
+    Agents keep no session history of their own: each turn gets exactly
+    the context its prompt builds, and runs are recorded in bulk by the
+    session store (see _record).
+    """
+    spec = AGENT_SPECS[key]
+    return Agent(
+        name=spec["name"],
+        role=spec["role"],
+        model=(model_factory or default_model_factory)(),
+        instructions=spec["instructions"],
         markdown=True,
     )
 
+
+# -----------------------------------
+# Agent Team Builder
+# -----------------------------------
+def build_agent_team(model_factory=None):
+    from agno.team import Team
+
+    members = [build_agent(key, model_factory) for key in ["bull", "bear", "risk", "chair"]]
+
     return Team(
         name="Institutional Investment Committee",
-        model=OpenAIChat(id="gpt-4o"),
-        members=[bull, bear, risk, chair],
+        model=(model_factory or default_model_factory)(),
+        members=members,
         markdown=True,
     )
 
 
+# -----------------------------------
+# Prompts
+# -----------------------------------
+def build_analyst_prompt(analysis_summary: dict, key: str = "risk") -> str:
+    return build_prompt(key, analysis_summary)["text"]
+
+
+def build_chair_prompt(analysis_summary: dict, analyst_takes: dict) -> str:
+    return build_prompt("chair", analysis_summary, analyst_takes)["text"]
+
+
+def _with_prompt(turn: dict, prompt: dict) -> dict:
+    """Adds the prompt's budget accounting to a finished turn."""
+    turn.update({name: value for name, value in prompt.items() if name != "text"})
+    return turn
+
+
+# -----------------------------------
+# Reusable Investment Committee
+# -----------------------------------
+class InvestmentCommittee:
+    """
+    Long-lived committee shared across requests.
+
+    The bull, bear and risk analysts answer concurrently, then the chair
+    synthesizes their positions. Model calls run on the committee's own
+    event loop thread, so async HTTP clients are reused across requests.
+    A semaphore bounds concurrent model calls; failed calls are retried
+    with exponential backoff, stretched when the provider rate-limits.
+    Each prompt is trimmed to its agent's token budget (`budgets`
+    overrides entries of AGENT_BUDGETS).
+    """
+
+    def __init__(self, model_factory=None, max_concurrency: int = 3, retries: int = 3,
+                 backoff: float = 1.0, rate_limit_backoff: float = 5.0, regenerations: int = 1,
+                 budgets: dict = None):
+        self.model_factory = model_factory or default_model_factory
+        with span("committee.build", agents=len(AGENT_SPECS)):
+            self.agents = {key: build_agent(key, self.model_factory) for key in AGENT_SPECS}
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limit_backoff = rate_limit_backoff
+        self.regenerations = regenerations
+        self.budgets = {**AGENT_BUDGETS, **(budgets or {})}
+
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return self.agents["chair"].model.id
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="committee-loop", daemon=True).start()
+        return self._loop
+
+    @staticmethod
+    def _is_rate_limited(content) -> bool:
+        text = str(content or "").lower()
+        return "rate limit" in text or "429" in text
+
+    async def _backoff(self, attempt: int, error):
+        base = self.rate_limit_backoff if self._is_rate_limited(error) else self.backoff
+        await asyncio.sleep(base * (2 ** attempt) * (1 + random.random() * 0.25))
+
+    async def _run_agent(self, key: str, prompt: str):
+        agent = self.agents[key]
+
+        for attempt in range(self.retries + 1):
+            started = time.time()
+            with span("agent.turn", agent=key, attempt=attempt + 1, prompt_chars=len(prompt)) as turn:
+                async with self._semaphore:
+                    response = await agent.arun(prompt)
+
+                metrics = response.metrics
+                input_tokens = getattr(metrics, "input_tokens", 0) or 0
+                output_tokens = getattr(metrics, "output_tokens", 0) or 0
+                turn.set(input_tokens=input_tokens, output_tokens=output_tokens)
+                if response.status == RunStatus.error:
+                    turn.status = "error"
+                    turn.error = str(response.content)[:200]
+
+            if response.status != RunStatus.error:
+                return {
+                    "content": response.content or "",
+                    "seconds": round(time.time() - started, 3),
+                    "attempts": attempt + 1,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                }
+
+            if attempt == self.retries:
+                raise RuntimeError(f"{agent.name} failed after {attempt + 1} attempts: {response.content}")
+
+            await self._backoff(attempt, response.content)
+
+    async def _stream_agent(self, key: str, prompt: str, on_event, guard=None):
+        """
+        _run_agent for a streamed reply: each chunk goes to on_event as it
+        arrives. When `guard` reports a hard conflict the stream is closed
+        at once and the partial turn is returned with its conflicts.
+        """
+        agent = self.agents[key]
+        name = AGENT_SPECS[key]["name"]
+
+        for attempt in range(self.retries + 1):
+            started = time.time()
+            first_token_at = None
+            chunks = []
+            conflicts = []
+            error = None
+            input_tokens = output_tokens = 0
+
+            with span("agent.turn", agent=key, attempt=attempt + 1, prompt_chars=len(prompt), stream=True) as turn:
+                async with self._semaphore:
+                    stream = agent.arun(prompt, stream=True, stream_events=True)
+                    try:
+                        async for event in stream:
+                            if event.event == RunEvent.run_content and event.content:
+                                first_token_at = first_token_at or time.time()
+                                chunks.append(event.content)
+                                on_event({"type": "chunk", "agent": name, "text": event.content})
+                                conflicts = guard.feed(event.content) if guard is not None else []
+                                if conflicts:
+                                    break
+                            elif event.event == RunEvent.run_completed:
+                                input_tokens = getattr(event.metrics, "input_tokens", 0) or 0
+                                output_tokens = getattr(event.metrics, "output_tokens", 0) or 0
+                            elif event.event == RunEvent.run_error:
+                                error = str(event.content)
+                    finally:
+                        # Closing the stream stops generation on an early abort.
+                        await stream.aclose()
+
+                ttft = round(first_token_at - started, 3) if first_token_at else None
+                turn.set(input_tokens=input_tokens, output_tokens=output_tokens, ttft_seconds=ttft,
+                         chars=sum(map(len, chunks)))
+                if conflicts:
+                    turn.set(aborted=",".join(conflicts))
+                if error is not None:
+                    turn.status = "error"
+                    turn.error = error[:200]
+
+            if error is None:
+                return {
+                    "content": "".join(chunks),
+                    "seconds": round(time.time() - started, 3),
+                    "attempts": attempt + 1,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "ttft_seconds": ttft,
+                    "conflicts": conflicts,
+                }
+
+            if chunks:
+                on_event({"type": "restart", "agent": name, "reason": "error", "notes": [error[:200]]})
+            if attempt == self.retries:
+                raise RuntimeError(f"{agent.name} failed after {attempt + 1} attempts: {error}")
+
+            await self._backoff(attempt, error)
+
+    async def _stream_memo(self, prompt: str, on_event, guard_factory=None):
+        """
+        Streams the chair's memo, regenerating up to `regenerations` times
+        when a guard from `guard_factory` stops a draft. The last draft
+        runs to completion, so there is always a memo to override and score.
+        """
+        started = time.time()
+        stopped = []
+
+        for regeneration in range(self.regenerations + 1):
+            last = regeneration == self.regenerations
+            guard = guard_factory() if guard_factory is not None and not last else None
+            turn = await self._stream_agent("chair", prompt, on_event, guard)
+
+            if not turn.pop("conflicts"):
+                turn["seconds"] = round(time.time() - started, 3)
+                turn["regenerations"] = regeneration
+                turn["discarded_chars"] = sum(draft["chars"] for draft in stopped)
+                turn["stopped_drafts"] = stopped
+                return turn
+
+            stopped.append({"conflicts": list(guard.conflicts), "chars": guard.characters})
+            on_event({"type": "restart", "agent": AGENT_SPECS["chair"]["name"], "reason": "conflict",
+                      "notes": guard.notes})
+            prompt += REGENERATION_NOTE.format(notes=" ".join(guard.notes))
+
+    async def _debate(self, analysis_summary: dict, parent=None, on_turn=None, on_event=None,
+                      guard_factory=None) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Runs on the committee loop thread, so the caller's span is passed in.
+        with span("committee.debate", parent=parent, ticker=analysis_summary.get("ticker")):
+            return await self._debate_turns(analysis_summary, on_turn, on_event, guard_factory)
+
+    async def _turn(self, key: str, prompt: dict, on_turn=None):
+        turn = _with_prompt(await self._run_agent(key, prompt["text"]), prompt)
+        if on_turn is not None:
+            on_turn(AGENT_SPECS[key]["name"], turn)
+        return turn
+
+    async def _debate_turns(self, analysis_summary: dict, on_turn=None, on_event=None,
+                            guard_factory=None) -> dict:
+        analyst_turns = await asyncio.gather(*(
+            self._turn(key, build_prompt(key, analysis_summary, budget=self.budgets[key]), on_turn)
+            for key in ANALYST_KEYS
+        ))
+        analyst_takes = {
+            AGENT_SPECS[key]["name"]: turn["content"] for key, turn in zip(ANALYST_KEYS, analyst_turns)
+        }
+
+        # The chair reads condensed positions, not the analysts' full replies.
+        chair_prompt = build_prompt("chair", analysis_summary, analyst_takes, budget=self.budgets["chair"])
+        if on_event is None:
+            chair_turn = await self._turn("chair", chair_prompt, on_turn)
+        else:
+            chair_turn = _with_prompt(await self._stream_memo(chair_prompt["text"], on_event, guard_factory),
+                                      chair_prompt)
+            if on_turn is not None:
+                on_turn(AGENT_SPECS["chair"]["name"], chair_turn)
+
+        turns = dict(zip(ANALYST_KEYS, analyst_turns))
+        turns["chair"] = chair_turn
+
+        return {
+            "narrative": chair_turn["content"],
+            "analyst_takes": analyst_takes,
+            "turns": {
+                AGENT_SPECS[key]["name"]: {k: v for k, v in turn.items() if k != "content"}
+                for key, turn in turns.items()
+            },
+        }
+
+    def _submit(self, analysis_summary: dict, on_turn=None, on_event=None, guard_factory=None):
+        return asyncio.run_coroutine_threadsafe(
+            self._debate(analysis_summary, current_span(), on_turn, on_event, guard_factory), self._ensure_loop()
+        )
+
+    async def adebate(self, analysis_summary: dict, on_turn=None, on_event=None, guard_factory=None) -> dict:
+        future = self._submit(analysis_summary, on_turn, on_event, guard_factory)
+        return await asyncio.wrap_future(future)
+
+    def debate(self, analysis_summary: dict, on_turn=None, on_event=None, guard_factory=None,
+               cancel: threading.Event = None) -> dict:
+        """
+        Runs one debate. `on_turn(agent_name, turn)` is called from the
+        committee loop thread as each analyst, then the chair, finishes.
+        With `on_event` the chair's memo is streamed to it chunk by chunk
+        and checked by a guard from `guard_factory` (see _stream_memo).
+        Setting `cancel` stops the debate's model calls and raises
+        CancelledError.
+        """
+        future = self._submit(analysis_summary, on_turn, on_event, guard_factory)
+        if cancel is None:
+            return future.result()
+
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_SECONDS)
+            except concurrent.futures.TimeoutError:
+                if cancel.is_set():
+                    # Cancels the task on the committee loop, closing open streams.
+                    future.cancel()
+                    raise concurrent.futures.CancelledError("debate cancelled")
+
+
+_committee = None
+_committee_lock = threading.Lock()
+
+
+def get_committee() -> InvestmentCommittee:
+    global _committee
+    with _committee_lock:
+        if _committee is None:
+            _committee = InvestmentCommittee()
+    return _committee
+
+
+def set_committee(committee: InvestmentCommittee):
+    """Installs the shared committee, e.g. one built on MockChat."""
+    global _committee
+    with _committee_lock:
+        _committee = committee
+
+
 # -----------------------------------
 # Validation Layer
 # -----------------------------------
-def validate_narrative(narrative: str, summary: dict):
+# (phrase, validation flag, note) per regime.
+REGIME_PHRASE_RULES = {
+    "DEFENSIVE": [
+        ("increase exposure", "allocation_conflict", "Exposure increase suggested in DEFENSIVE regime."),
+        ("strong upside", "regime_conflict", "Optimistic tone conflicts with DEFENSIVE regime."),
+    ],
+}
+
+# Conflicts that stop a streamed memo early. Unverified numbers only
+# cost consistency score by default; add "fabricated_numbers_detected"
+# to regenerate on them too.
+HARD_CONFLICTS = ("regime_conflict", "allocation_conflict")
+
+
+def validate_narrative(narrative: str, summary: dict, index: ValueIndex = None):
+    """
+    Checks every number in the memo against the summary's value index
+    and the narrative against the regime. `numeric_findings` carries a
+    span-level record per number; only unverified ones count as
+    fabricated.
+    """
 
     validation = {
         "fabricated_numbers_detected": False,
         "regime_conflict": False,
         "allocation_conflict": False,
         "validation_notes": [],
+        "numeric_findings": [],
     }
 
-    numeric_values = re.findall(r"\d+\.?\d*", narrative)
+    findings = check_numbers(narrative, index or ValueIndex.from_summary(summary))
+    validation["numeric_findings"] = findings
 
-    allowed_numbers = [
-        str(summary.get("annualized_volatility")),
-        str(summary.get("max_drawdown_pct")),
-        str(summary.get("volatility_percentile")),
-        str(summary.get("downtrend_days")),
-        str(summary.get("recovery_probability_pct")),
-    ]
+    for finding in unverified(findings):
+        validation["fabricated_numbers_detected"] = True
+        validation["validation_notes"].append(
+            f"Potential fabricated number detected: {finding['text']}"
+        )
 
-    for num in numeric_values:
-        if num not in allowed_numbers:
-            validation["fabricated_numbers_detected"] = True
-            validation["validation_notes"].append(
-                f"Potential fabricated number detected: {num}"
-            )
+    lowered = narrative.lower()
 
-    regime = summary.get("regime")
-
-    if regime == "DEFENSIVE":
-        if "increase exposure" in narrative.lower():
-            validation["allocation_conflict"] = True
-            validation["validation_notes"].append(
-                "Exposure increase suggested in DEFENSIVE regime."
-            )
-
-        if "strong upside" in narrative.lower():
-            validation["regime_conflict"] = True
-            validation["validation_notes"].append(
-                "Optimistic tone conflicts with DEFENSIVE regime."
-            )
+    for phrase, flag, note in REGIME_PHRASE_RULES.get(summary.get("regime"), []):
+        if phrase in lowered:
+            validation[flag] = True
+            validation["validation_notes"].append(note)
 
     return validation
 
 
+def validate_narratives(items) -> list:
+    """
+    Validates many (narrative, summary) pairs, building each summary's
+    value index once even when memos share a summary.
+    """
+    indexes = {}
+    results = []
+
+    for narrative, summary in items:
+        # The summary is kept alongside its index so its id stays unique.
+        cached = indexes.get(id(summary))
+        if cached is None:
+            cached = indexes[id(summary)] = (summary, ValueIndex.from_summary(summary))
+        results.append(validate_narrative(narrative, summary, cached[1]))
+
+    return results
+
+
+class NarrativeGuard:
+    """
+    Incremental validate_narrative checks over a streamed memo.
+
+    feed() returns the hard conflicts the new chunk introduced, so the
+    caller can stop generating as soon as the memo is known to fail.
+    Phrase checks rescan only the overlap with the previous chunk.
+    """
+
+    def __init__(self, summary: dict, index: ValueIndex = None, hard_conflicts=HARD_CONFLICTS):
+        self.rules = REGIME_PHRASE_RULES.get(summary.get("regime"), [])
+        self.hard_conflicts = set(hard_conflicts)
+        self.numbers = NumberStream(index or ValueIndex.from_summary(summary))
+        self.conflicts = {}
+        self._lowered = ""
+        self._overlap = max((len(phrase) for phrase, _, _ in self.rules), default=1) - 1
+
+    def feed(self, chunk: str) -> list:
+        new = {}
+
+        flagged = unverified(self.numbers.feed(chunk))
+        if flagged and "fabricated_numbers_detected" not in self.conflicts:
+            new["fabricated_numbers_detected"] = f"Potential fabricated number detected: {flagged[0]['text']}"
+
+        start = max(len(self._lowered) - self._overlap, 0)
+        self._lowered += chunk.lower()
+        window = self._lowered[start:]
+        for phrase, flag, note in self.rules:
+            if flag not in self.conflicts and phrase in window:
+                new[flag] = note
+
+        self.conflicts.update(new)
+        return [flag for flag in new if flag in self.hard_conflicts]
+
+    @property
+    def notes(self) -> list:
+        return [self.conflicts[flag] for flag in self.conflicts if flag in self.hard_conflicts]
+
+    @property
+    def characters(self) -> int:
+        return len(self.numbers.text)
+
+
 # -----------------------------------
 # Consistency Scoring
 # -----------------------------------
@@ -170,42 +561,32 @@ def enforce_regime_override(narrative: str, summary: dict):
 # -----------------------------------
 # Main Orchestration
 # -----------------------------------
-def run_financial_intelligence(ticker: str):
-
-    start_time = time.time()
+def _finalize(analysis_summary: dict, debate: dict) -> dict:
 
-    analysis_summary = build_analysis_summary(ticker)
+    narrative = debate["narrative"]
 
-    team = build_agent_team()
-
-    prompt = f"""
-Institutional Financial Intelligence Debate
-
-Structured Analytics:
-{analysis_summary}
-
-Debate Order:
-1. Bullish Analyst
-2. Bearish Analyst
-3. Chief Risk Officer
-4. Investment Committee Chair
+    # Regime-weighted enforcement
+    narrative = enforce_regime_override(narrative, analysis_summary)
 
-Rules:
-- Use only provided analytics.
-- Never contradict regime classification.
-- Do NOT fabricate numerical data.
-"""
+    # Validation
+    with span("narrative.validation", narrative_chars=len(narrative)) as stage:
+        validation = validate_narrative(narrative, analysis_summary)
+        consistency_score = compute_consistency_score(validation)
+        stage.set(consistency_score=consistency_score)
 
-    response = team.run(prompt)
+    return {
+        "agent_narrative": narrative,
+        "analyst_takes": debate["analyst_takes"],
+        "validation": validation,
+        "consistency_score": consistency_score,
+        "agent_turns": debate["turns"],
+    }
 
-    narrative = response.content if hasattr(response, "content") else str(response)
 
-    # Regime-weighted enforcement
-    narrative = enforce_regime_override(narrative, analysis_summary)
+def _assemble(ticker: str, analysis_summary: dict, debate_result: dict, start_time: float, cache_status: str,
+              first_token: dict = None):
 
-    # Validation
-    validation = validate_narrative(narrative, analysis_summary)
-    consistency_score = compute_consistency_score(validation)
+    narrative = debate_result["agent_narrative"]
 
     runtime_seconds = round(time.time() - start_time, 2)
 
@@ -215,20 +596,181 @@ Rules:
         "risk_score": analysis_summary.get("risk_score"),
         "runtime_seconds": runtime_seconds,
         "narrative_length_chars": len(narrative),
+        "narrative_cache": cache_status,
+        "agent_turns": debate_result["agent_turns"],
+        # A cached memo cost nothing this run; its original usage is kept for reference.
+        "token_usage": {**token_report(debate_result["agent_turns"]), "billed": cache_status != "hit"},
     }
+    if first_token:
+        observability["time_to_first_token_seconds"] = first_token.get("seconds")
 
     return {
         "analysis_summary": analysis_summary,
         "agent_narrative": narrative,
-        "validation": validation,
-        "consistency_score": consistency_score,
+        "analyst_takes": debate_result["analyst_takes"],
+        "validation": debate_result["validation"],
+        "consistency_score": debate_result["consistency_score"],
         "observability": observability,
         "reasoning_log": [
             "Step 1: Deterministic analytics computed.",
             f"Step 2: Regime classified as {analysis_summary.get('regime')}.",
-            "Step 3: Multi-agent debate executed.",
+            "Step 3: Multi-agent debate executed." if cache_status != "hit"
+            else "Step 3: Multi-agent debate reused from narrative cache.",
             "Step 4: Regime-weighted synthesis enforced.",
             "Step 5: Post-generation validation performed.",
             "Step 6: Observability metrics logged.",
         ],
     }
+
+
+def _cache_lookup(analysis_summary: dict, committee: InvestmentCommittee, use_cache: bool):
+    if not use_cache:
+        return None, None, None
+
+    cache = get_narrative_cache()
+    key = narrative_cache_key(analysis_summary, AGENT_SPECS, committee.model_id, committee.budgets)
+    return cache, key, cache.get(key)
+
+
+def _record(ticker: str, analysis_summary: dict, debate_result: dict, committee: InvestmentCommittee):
+    store = get_session_store()
+    if store is None:
+        return
+    with span("session.record", ticker=ticker, turns=len(debate_result["agent_turns"])) as record:
+        # The session log is best-effort: a locked or full database is
+        # traced, never allowed to fail a finished debate.
+        try:
+            store.record_debate(ticker, committee.model_id, analysis_summary, debate_result)
+        except Exception as exc:
+            record.status = "error"
+            record.error = f"{type(exc).__name__}: {exc}"
+
+
+def _streaming(on_event, start_time: float, stage):
+    """
+    Wraps on_event to record the time from request to first memo chunk.
+    Returns (wrapped callback, dict filled in when the first chunk lands).
+    """
+    if on_event is None:
+        return None, None
+    first_token = {}
+
+    def emit(event):
+        if event["type"] == "chunk" and not first_token:
+            first_token["seconds"] = round(time.time() - start_time, 3)
+            stage.set(time_to_first_token_seconds=first_token["seconds"])
+        on_event(event)
+
+    return emit, first_token
+
+
+def _guard_factory(analysis_summary: dict, on_event, hard_conflicts):
+    if on_event is None or not hard_conflicts:
+        return None
+    index = ValueIndex.from_summary(analysis_summary)
+    return lambda: NarrativeGuard(analysis_summary, index, hard_conflicts)
+
+
+def run_financial_intelligence(ticker: str, context: AnalysisContext = None,
+                               committee: InvestmentCommittee = None, use_cache: bool = True,
+                               on_turn=None, on_event=None, hard_conflicts=HARD_CONFLICTS,
+                               cancel: threading.Event = None):
+    """
+    Full pipeline for one ticker. With `on_event`, the chair's memo is
+    streamed as {"type": "chunk", "text"} events and checked as it
+    arrives; a {"type": "restart"} event means the text so far was
+    discarded because a draft hit one of `hard_conflicts` (or failed)
+    and is being regenerated. A cached memo arrives as a single chunk.
+    Setting `cancel` abandons the debate (see InvestmentCommittee.debate).
+    """
+
+    start_time = time.time()
+
+    with span("pipeline.intelligence", ticker=ticker) as stage:
+
+        with span("analytics.summary", ticker=ticker):
+            analysis_summary = build_analysis_summary(ticker, context=context)
+
+        committee = committee or get_committee()
+        cache, key, cached = _cache_lookup(analysis_summary, committee, use_cache)
+        on_event, first_token = _streaming(on_event, start_time, stage)
+
+        if cached is not None:
+            stage.set(narrative_cache="hit")
+            if on_event is not None:
+                on_event({"type": "chunk", "agent": AGENT_SPECS["chair"]["name"], "text": cached["agent_narrative"]})
+            return _assemble(ticker, analysis_summary, cached, start_time, "hit", first_token)
+
+        debate = committee.debate(analysis_summary, on_turn, on_event,
+                                  _guard_factory(analysis_summary, on_event, hard_conflicts), cancel)
+        debate_result = _finalize(analysis_summary, debate)
+        _record(ticker, analysis_summary, debate_result, committee)
+
+        if cache is not None:
+            cache.put(key, debate_result)
+
+        cache_status = "miss" if use_cache else "bypass"
+        stage.set(narrative_cache=cache_status)
+        return _assemble(ticker, analysis_summary, debate_result, start_time, cache_status, first_token)
+
+
+async def arun_financial_intelligence(ticker: str, context: AnalysisContext = None,
+                                      committee: InvestmentCommittee = None, use_cache: bool = True,
+                                      on_turn=None, on_event=None, hard_conflicts=HARD_CONFLICTS):
+
+    start_time = time.time()
+
+    with span("pipeline.intelligence", ticker=ticker) as stage:
+
+        with span("analytics.summary", ticker=ticker):
+            analysis_summary = await asyncio.to_thread(build_analysis_summary, ticker, context)
+
+        committee = committee or get_committee()
+        cache, key, cached = _cache_lookup(analysis_summary, committee, use_cache)
+        on_event, first_token = _streaming(on_event, start_time, stage)
+
+        if cached is not None:
+            stage.set(narrative_cache="hit")
+            if on_event is not None:
+                on_event({"type": "chunk", "agent": AGENT_SPECS["chair"]["name"], "text": cached["agent_narrative"]})
+            return _assemble(ticker, analysis_summary, cached, start_time, "hit", first_token)
+
+        debate = await committee.adebate(analysis_summary, on_turn, on_event,
+                                         _guard_factory(analysis_summary, on_event, hard_conflicts))
+        debate_result = _finalize(analysis_summary, debate)
+        await asyncio.to_thread(_record, ticker, analysis_summary, debate_result, committee)
+
+        if cache is not None:
+            cache.put(key, debate_result)
+
+        cache_status = "miss" if use_cache else "bypass"
+        stage.set(narrative_cache=cache_status)
+        return _assemble(ticker, analysis_summary, debate_result, start_time, cache_status, first_token)
+
+
+def stream_financial_intelligence(ticker: str, context: AnalysisContext = None, **options):
+    """
+    Generator form of run_financial_intelligence(on_event=...): yields
+    its chunk and restart events as they happen, then
+    {"type": "result", "result": ...}. The pipeline runs on a worker
+    thread so its spans stay out of the consumer's context.
+    """
+    events = queue.Queue()
+
+    def produce():
+        try:
+            result = run_financial_intelligence(ticker, context=context, on_event=events.put, **options)
+            events.put({"type": "result", "result": result})
+        except Exception as exc:
+            events.put({"type": "error", "error": exc})
+
+    worker = contextvars.copy_context()
+    threading.Thread(target=worker.run, args=(produce,), name=f"memo-stream-{ticker}", daemon=True).start()
+
+    while True:
+        event = events.get()
+        if event["type"] == "error":
+            raise event["error"]
+        yield event
+        if event["type"] == "result":
+            return
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Union
+
+from agno.exceptions import ModelRateLimitError
+from agno.metrics import MessageMetrics
+from agno.models.base import Model
+from agno.models.response import ModelResponse
+
+
+DEFAULT_REPLY = (
+    "The committee reviewed the structured analytics provided. "
+    "Position sizing should follow the deterministic regime classification, "
+    "with risk limits applied before any change in exposure."
+)
+
+
+@dataclass
+class MockChat(Model):
+    """
+    Offline stand-in for OpenAIChat, used by tests and benchmarks.
+
+    `reply` is either a fixed string or a callable receiving the message
+    list. `latency` simulates network time per call, and the first
+    `rate_limit_failures` calls raise ModelRateLimitError to exercise
+    the committee's backoff.
+    """
+
+    id: str = "mock-chat"
+    name: str = "MockChat"
+    provider: str = "Mock"
+
+    reply: Union[str, Callable[[list], str]] = DEFAULT_REPLY
+    latency: float = 0.0
+    chunk_size: int = 16
+    rate_limit_failures: int = 0
+    calls: int = field(default=0, init=False)
+
+    def _next_reply(self, messages) -> str:
+        self.calls += 1
+        if self.calls <= self.rate_limit_failures:
+            raise ModelRateLimitError("Mock rate limit exceeded", model_name=self.name, model_id=self.id)
+        return self.reply(messages) if callable(self.reply) else self.reply
+
+    def _usage(self, messages, content: str) -> MessageMetrics:
+        prompt_chars = sum(len(str(m.content or "")) for m in messages)
+        input_tokens = prompt_chars // 4
+        output_tokens = len(content) // 4
+        return MessageMetrics(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+
+    def _chunks(self, content: str):
+        for i in range(0, len(content), self.chunk_size):
+            yield content[i:i + self.chunk_size]
+
+    def invoke(self, messages, assistant_message, **kwargs) -> ModelResponse:
+        time.sleep(self.latency)
+        content = self._next_reply(messages)
+        return ModelResponse(role="assistant", content=content, response_usage=self._usage(messages, content))
+
+    async def ainvoke(self, messages, assistant_message, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        content = self._next_reply(messages)
+        return ModelResponse(role="assistant", content=content, response_usage=self._usage(messages, content))
+
+    def invoke_stream(self, messages, assistant_message, **kwargs):
+        content = self._next_reply(messages)
+        for chunk in self._chunks(content):
+            time.sleep(self.latency / max(len(content) / self.chunk_size, 1))
+            yield ModelResponse(role="assistant", content=chunk)
+        yield ModelResponse(response_usage=self._usage(messages, content))
+
+    async def ainvoke_stream(self, messages, assistant_message, **kwargs):
+        content = self._next_reply(messages)
+        for chunk in self._chunks(content):
+            await asyncio.sleep(self.latency / max(len(content) / self.chunk_size, 1))
+            yield ModelResponse(role="assistant", content=chunk)
+        yield ModelResponse(response_usage=self._usage(messages, content))
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
+
+
+def mock_model_factory(**options) -> Callable[[], MockChat]:
+    """Returns a model factory for InvestmentCommittee / build_agent_team."""
+    return lambda: MockChat(**options)
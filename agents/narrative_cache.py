@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from core.data import temp_path
+
+
+DEFAULT_NARRATIVE_CACHE_DIR = os.environ.get("FINANCE_NARRATIVE_CACHE_DIR", os.path.join(".cache", "narratives"))
+DEFAULT_NARRATIVE_TTL_SECONDS = int(os.environ.get("FINANCE_NARRATIVE_CACHE_TTL", 24 * 60 * 60))
+DEFAULT_NARRATIVE_MAX_ENTRIES = int(os.environ.get("FINANCE_NARRATIVE_CACHE_MAX_ENTRIES", 5000))
+
+# An overflowing cache is trimmed to this fraction of max_entries, so the
+# directory is scanned again only after that many more writes.
+EVICTION_LOW_WATER = 0.9
+
+
+def narrative_cache_key(analysis_summary: dict, agent_specs: dict, model_id: str, budgets: dict = None) -> str:
+    """
+    Stable content hash of everything that determines the debate prompt:
+    the analytics summary, the agent configurations, the prompt budgets
+    and the model id.
+    """
+    payload = json.dumps(
+        {"summary": analysis_summary, "agents": agent_specs, "model": model_id, "budgets": budgets},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NarrativeCache:
+    """
+    Persistent store of committee debate results, one JSON file per key.
+
+    Entries older than ttl_seconds are treated as misses and removed. When
+    the store grows past max_entries, the least recently written entries
+    are evicted down to EVICTION_LOW_WATER of it. Writes are counted
+    against the last scan, so the directory is listed only when it may
+    have overflowed, not on every put.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_NARRATIVE_CACHE_DIR,
+                 ttl_seconds: int = DEFAULT_NARRATIVE_TTL_SECONDS,
+                 max_entries: int = DEFAULT_NARRATIVE_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        # Entries found by the last scan plus writes since; an upper bound for this process.
+        self._counted = None
+        self._since_scan = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
+
+    def get(self, key: str):
+        path = self._path(key)
+
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if time.time() - entry.get("created_at", 0) >= self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            self._count("misses")
+            self._count("evictions")
+            return None
+
+        self._count("hits")
+        return entry
+
+    def put(self, key: str, entry: dict):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = dict(entry, created_at=time.time())
+
+        path = self._path(key)
+        tmp = temp_path(path)
+        try:
+            tmp.write_text(json.dumps(entry, default=str))
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        self._count("writes")
+        with self._lock:
+            self._since_scan += 1
+            due = self._counted is None or self._counted + self._since_scan > self.max_entries
+        if due:
+            self._evict_overflow()
+
+    def _evict_overflow(self):
+        # One scan at a time. A writer that finds one running leaves it the
+        # work, and the scan repeats while writes made meanwhile could overflow.
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            due = True
+            while due:
+                with self._lock:
+                    self._since_scan = 0
+                counted = self._scan()
+                with self._lock:
+                    self._counted = counted
+                    due = counted + self._since_scan > self.max_entries
+        finally:
+            self._evict_lock.release()
+
+    def _scan(self) -> int:
+        """Evicts the oldest entries past max_entries; returns the entries left."""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # Removed by another writer since the listing.
+                continue
+
+        if len(entries) <= self.max_entries:
+            return len(entries)
+
+        keep = int(self.max_entries * EVICTION_LOW_WATER)
+        entries.sort(key=lambda entry: entry[0])
+        for _, path in entries[:len(entries) - keep]:
+            path.unlink(missing_ok=True)
+        self._count("evictions", len(entries) - keep)
+        return keep
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._counted, self._since_scan = 0, 0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["entries"] = len(list(self.cache_dir.glob("*.json"))) if self.cache_dir.exists() else 0
+        return stats
+
+
+_default_cache = None
+
+
+def get_narrative_cache() -> NarrativeCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = NarrativeCache()
+    return _default_cache
+
+
+def set_narrative_cache(cache: NarrativeCache):
+    global _default_cache
+    _default_cache = cache
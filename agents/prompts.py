@@ -0,0 +1,210 @@
+import math
+import re
+
+
+# Canonical order of the analytics in every prompt. Unknown fields
+# follow in key order, so the same summary always serializes the same.
+PROMPT_FIELDS = [
+    "ticker",
+    "time_period",
+    "regime",
+    "risk_score",
+    "trend",
+    "annualized_volatility",
+    "volatility_percentile",
+    "max_drawdown_pct",
+    "downtrend_days",
+    "recovery_probability_pct",
+    "observations",
+    "position_size_suggestion",
+]
+
+# Bookkeeping fields that carry nothing for the model.
+OMITTED_FIELDS = {"data_available", "message"}
+
+# Sent to every agent whatever its budget: the regime call and what it rests on.
+CORE_FIELDS = ["ticker", "time_period", "regime", "risk_score", "trend", "position_size_suggestion"]
+
+# The remaining fields per agent, most needed first; trimming drops from the end.
+AGENT_FIELDS = {
+    "bull": ["recovery_probability_pct", "annualized_volatility", "volatility_percentile",
+             "max_drawdown_pct", "downtrend_days", "observations"],
+    "bear": ["max_drawdown_pct", "downtrend_days", "annualized_volatility",
+             "volatility_percentile", "recovery_probability_pct", "observations"],
+    "risk": ["volatility_percentile", "max_drawdown_pct", "annualized_volatility",
+             "downtrend_days", "recovery_probability_pct", "observations"],
+    "chair": ["annualized_volatility", "volatility_percentile", "max_drawdown_pct",
+              "downtrend_days", "recovery_probability_pct", "observations"],
+}
+
+# Prompt budgets in estimated tokens, excluding the agent's instructions.
+AGENT_BUDGETS = {
+    "bull": 400,
+    "bear": 400,
+    "risk": 400,
+    "chair": 900,
+}
+
+# Cap on each analyst position passed to the chair.
+POSITION_TOKENS = 160
+
+CHARS_PER_TOKEN = 4
+
+HEADER = "Institutional Financial Intelligence Debate"
+
+ANALYST_RULES = [
+    "Use only provided analytics.",
+    "Never contradict regime classification.",
+    "Do NOT fabricate numerical data.",
+]
+
+CHAIR_RULES = ANALYST_RULES + ["Produce the final committee memo."]
+
+# Headings are dropped whole; list markers and emphasis are unwrapped.
+MARKDOWN = re.compile(r"^[ \t]*#+[ \t].*$|^[ \t]*(?:[-*+>]|\d+[.)])[ \t]+|\*\*|__|`", re.MULTILINE)
+# Sentence ends are punctuation before whitespace, so "81.48" stays whole.
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# -----------------------------------
+# Serialization
+# -----------------------------------
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else "n/a"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(map(_format_value, value))
+    return str(value)
+
+
+def serialize_summary(summary: dict, fields=None) -> str:
+    """
+    One `field: value` line per analytic in canonical order. Values are
+    written exactly as stored, so numbers quoted from the prompt match
+    the validation index.
+    """
+    known = [field for field in PROMPT_FIELDS if field in summary]
+    extra = sorted(field for field in summary if field not in PROMPT_FIELDS and field not in OMITTED_FIELDS)
+    selected = set(fields) if fields is not None else None
+
+    return "\n".join(
+        f"{field}: {_format_value(summary[field])}"
+        for field in known + extra
+        if (selected is None or field in selected) and summary[field] is not None
+    )
+
+
+def condense_position(text: str, max_tokens: int = POSITION_TOKENS) -> str:
+    """
+    An analyst's reply cut to `max_tokens`: markdown and repeated
+    sentences are stripped and whole sentences are kept, the opening
+    sentence of each paragraph first, then the rest in reading order.
+    """
+    paragraphs = [p for p in re.split(r"\n\s*\n", MARKDOWN.sub("", text)) if p.strip()]
+    sentences = []
+    seen = set()
+    for p, paragraph in enumerate(paragraphs):
+        for s, sentence in enumerate(SENTENCE_END.split(paragraph.strip())):
+            sentence = " ".join(sentence.split())
+            if sentence and sentence not in seen:
+                seen.add(sentence)
+                sentences.append((s > 0, p, s, sentence))
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept = []
+    for entry in sorted(sentences):
+        cost = len(entry[3]) + 1
+        if cost > budget:
+            continue
+        kept.append(entry)
+        budget -= cost
+
+    return " ".join(sentence for _, _, _, sentence in sorted(kept, key=lambda entry: entry[1:3]))
+
+
+# -----------------------------------
+# Prompt Builder
+# -----------------------------------
+def _render(analytics: str, positions: dict, rules: list) -> str:
+    parts = [HEADER, "", "Structured Analytics:", analytics]
+    if positions:
+        parts += ["", "Analyst Positions:", *(f"{name}: {take}" for name, take in positions.items())]
+    parts += ["", "Rules:", *(f"- {rule}" for rule in rules)]
+    return "\n".join(parts) + "\n"
+
+
+def build_prompt(key: str, summary: dict, analyst_takes: dict = None, budget: int = None) -> dict:
+    """
+    The prompt for one agent, trimmed to its token budget, with its
+    accounting. Analysts see the analytics only; the chair also gets
+    each analyst's position, condensed to an equal share of what the
+    analytics and rules leave of its budget. If the prompt is still
+    over budget, the agent's lowest-priority analytics are dropped;
+    the core fields never are.
+    """
+    budget = budget if budget is not None else AGENT_BUDGETS[key]
+    rules = CHAIR_RULES if analyst_takes else ANALYST_RULES
+    optional = [field for field in AGENT_FIELDS[key] if field in summary]
+    fields = CORE_FIELDS + optional
+
+    positions = {}
+    condensed = {}
+    if analyst_takes:
+        base = estimate_tokens(_render(serialize_summary(summary, fields), {}, rules))
+        share = max((budget - base) // len(analyst_takes), 0)
+        for name, take in analyst_takes.items():
+            positions[name] = condense_position(take, min(POSITION_TOKENS, share))
+            condensed[name] = {"original_tokens": estimate_tokens(take),
+                               "kept_tokens": estimate_tokens(positions[name])}
+
+    text = _render(serialize_summary(summary, fields), positions, rules)
+    while estimate_tokens(text) > budget and optional:
+        optional.pop()
+        text = _render(serialize_summary(summary, CORE_FIELDS + optional), positions, rules)
+
+    tokens = estimate_tokens(text)
+    return {
+        "text": text,
+        "prompt_tokens": tokens,
+        "budget_tokens": budget,
+        "over_budget": tokens > budget,
+        "dropped_fields": [field for field in AGENT_FIELDS[key] if field in summary and field not in optional],
+        "condensed_positions": condensed,
+    }
+
+
+# -----------------------------------
+# Token Accounting
+# -----------------------------------
+def token_report(turns: dict) -> dict:
+    """
+    Per-agent and total token usage for one debate, from the turns in
+    its observability. Provider counts are used where reported; drafts
+    stopped by guardrails are estimated from their length.
+    """
+    agents = {}
+    for name, turn in turns.items():
+        discarded = sum(draft["chars"] for draft in turn.get("stopped_drafts", []))
+        agents[name] = {
+            "prompt_tokens": turn.get("prompt_tokens"),
+            "budget_tokens": turn.get("budget_tokens"),
+            "input_tokens": turn.get("input_tokens", 0),
+            "output_tokens": turn.get("output_tokens", 0),
+            "discarded_tokens": math.ceil(discarded / CHARS_PER_TOKEN),
+        }
+
+    input_tokens = sum(row["input_tokens"] for row in agents.values())
+    output_tokens = sum(row["output_tokens"] for row in agents.values())
+    return {
+        "agents": agents,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "prompt_tokens": sum(row["prompt_tokens"] or 0 for row in agents.values()),
+        "discarded_tokens": sum(row["discarded_tokens"] for row in agents.values()),
+    }
@@ -0,0 +1,291 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Empty or "off" disables persistence for the default store.
+DEFAULT_SESSION_DB = os.environ.get("FINANCE_SESSION_DB", os.path.join(".cache", "sessions.db"))
+DEFAULT_SESSION_POOL_SIZE = int(os.environ.get("FINANCE_SESSION_POOL_SIZE", 4))
+DEFAULT_SESSION_BATCH_SIZE = int(os.environ.get("FINANCE_SESSION_BATCH_SIZE", 1))
+DEFAULT_SESSION_RETENTION_DAYS = float(os.environ.get("FINANCE_SESSION_RETENTION_DAYS", 30))
+DEFAULT_SESSION_MAX_RUNS = int(os.environ.get("FINANCE_SESSION_MAX_RUNS", 10000))
+
+# Retention is applied after this many runs are written.
+COMPACT_EVERY_RUNS = 200
+
+# How long a writer waits on another connection's lock before failing.
+BUSY_TIMEOUT_SECONDS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS debate_runs (
+    run_id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    model TEXT,
+    regime TEXT,
+    consistency_score REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS debate_runs_created ON debate_runs (created_at);
+CREATE INDEX IF NOT EXISTS debate_runs_ticker ON debate_runs (ticker, created_at);
+CREATE TABLE IF NOT EXISTS debate_turns (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    content TEXT,
+    metrics TEXT,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class ConnectionPool:
+    """
+    A fixed number of SQLite connections shared across threads. Each
+    connection is used by one thread at a time; callers beyond the pool
+    size wait for one to be returned.
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_SESSION_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False,
+                               isolation_level=None)
+        # Only takes effect on a new file, so it must precede the switch to WAL.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL lets readers run alongside the single writer; NORMAL sync is
+        # durable across process crashes, which is enough for run history.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                conn = self._connect()
+                with self._lock:
+                    self._all.append(conn)
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            connections, self._all = self._all, []
+            self._created = 0
+        self._idle = queue.LifoQueue()
+        for conn in connections:
+            conn.close()
+
+
+class SessionStore:
+    """
+    Committee run history in one SQLite file.
+
+    Each debate is buffered in memory and written with its turns in a
+    single transaction once `batch_size` runs are pending (at the end of
+    every run by default). Runs older than `retention_days`, and the
+    oldest beyond `max_runs`, are deleted every COMPACT_EVERY_RUNS
+    writes and the freed pages returned to the filesystem.
+    """
+
+    def __init__(self, path: str = DEFAULT_SESSION_DB, pool_size: int = DEFAULT_SESSION_POOL_SIZE,
+                 batch_size: int = DEFAULT_SESSION_BATCH_SIZE,
+                 retention_days: float = DEFAULT_SESSION_RETENTION_DAYS,
+                 max_runs: int = DEFAULT_SESSION_MAX_RUNS):
+        self.path = Path(path)
+        self.batch_size = max(batch_size, 1)
+        self.retention_days = retention_days
+        self.max_runs = max_runs
+        self.stats = {"runs_written": 0, "turns_written": 0, "flushes": 0, "runs_deleted": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = ConnectionPool(str(self.path), pool_size)
+        self._pending = []
+        self._since_compact = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    # -----------------------------------
+    # Writes
+    # -----------------------------------
+    def record_debate(self, ticker: str, model: str, analysis_summary: dict, debate_result: dict) -> str:
+        """Queues one finished debate; returns its run id."""
+        run_id = uuid.uuid4().hex
+        turns = debate_result.get("agent_turns", {})
+        contents = {**debate_result.get("analyst_takes", {})}
+        chair = list(turns)[-1] if turns else None
+        if chair is not None and chair not in contents:
+            contents[chair] = debate_result.get("agent_narrative")
+
+        run = (
+            run_id, ticker, time.time(), model, analysis_summary.get("regime"),
+            debate_result.get("consistency_score"),
+            sum(turn.get("input_tokens", 0) for turn in turns.values()),
+            sum(turn.get("output_tokens", 0) for turn in turns.values()),
+            json.dumps(analysis_summary, default=str, separators=(",", ":")),
+        )
+        turn_rows = [
+            (run_id, seq, agent, contents.get(agent), json.dumps(metrics, default=str, separators=(",", ":")))
+            for seq, (agent, metrics) in enumerate(turns.items())
+        ]
+
+        with self._lock:
+            self._pending.append((run, turn_rows))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        return run_id
+
+    def flush(self):
+        """Writes every pending run in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            turn_rows = [row for _, rows in pending for row in rows]
+            try:
+                with self._pool.connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany("INSERT INTO debate_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                         [run for run, _ in pending])
+                        conn.executemany("INSERT INTO debate_turns VALUES (?, ?, ?, ?, ?)", turn_rows)
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+            except BaseException:
+                # Keep the runs for the next flush rather than losing them.
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+
+            self.stats["runs_written"] += len(pending)
+            self.stats["turns_written"] += len(turn_rows)
+            self.stats["flushes"] += 1
+            self._since_compact += len(pending)
+
+            if self._since_compact >= COMPACT_EVERY_RUNS:
+                self._since_compact = 0
+                self.compact()
+
+    def compact(self) -> int:
+        """Applies the retention policy; returns the number of runs deleted."""
+        cutoff = time.time() - self.retention_days * 24 * 60 * 60
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.execute(
+                    "DELETE FROM debate_runs WHERE created_at < ? OR run_id IN ("
+                    "SELECT run_id FROM debate_runs ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (cutoff, self.max_runs),
+                ).rowcount
+                conn.execute("DELETE FROM debate_turns WHERE run_id NOT IN (SELECT run_id FROM debate_runs)")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            # Frees one page per step; executescript runs it to completion.
+            conn.executescript("PRAGMA incremental_vacuum;")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        self.stats["runs_deleted"] += deleted
+        return deleted
+
+    # -----------------------------------
+    # Reads
+    # -----------------------------------
+    def recent_runs(self, ticker: str = None, limit: int = 20) -> list:
+        """Newest runs first, optionally for one ticker, with their turns."""
+        self.flush()
+        where, params = ("WHERE ticker = ?", (ticker,)) if ticker else ("", ())
+
+        with self._pool.connection() as conn:
+            runs = conn.execute(
+                f"SELECT run_id, ticker, created_at, model, regime, consistency_score, input_tokens, "
+                f"output_tokens FROM debate_runs {where} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            turns = {}
+            for run_id, seq, agent, content, metrics in conn.execute(
+                f"SELECT run_id, seq, agent, content, metrics FROM debate_turns WHERE run_id IN "
+                f"({','.join('?' * len(runs))}) ORDER BY run_id, seq",
+                [run[0] for run in runs],
+            ):
+                turns.setdefault(run_id, []).append({"agent": agent, "content": content, **json.loads(metrics)})
+
+        columns = ("run_id", "ticker", "created_at", "model", "regime", "consistency_score",
+                   "input_tokens", "output_tokens")
+        return [{**dict(zip(columns, run)), "turns": turns.get(run[0], [])} for run in runs]
+
+    def metrics(self) -> dict:
+        self.flush()
+        with self._pool.connection() as conn:
+            runs, = conn.execute("SELECT COUNT(*) FROM debate_runs").fetchone()
+        size = sum(p.stat().st_size for p in self.path.parent.glob(self.path.name + "*"))
+        return {**self.stats, "runs": runs, "bytes": size}
+
+    def close(self):
+        self.flush()
+        self._pool.close()
+
+
+_UNSET = object()
+_default_store = _UNSET
+_default_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    The shared store, opened on first use from FINANCE_SESSION_DB.
+    Returns None when persistence is disabled.
+    """
+    global _default_store
+    with _default_lock:
+        if _default_store is _UNSET:
+            disabled = DEFAULT_SESSION_DB.strip().lower() in ("", "off", "none")
+            _default_store = None if disabled else SessionStore(DEFAULT_SESSION_DB)
+            if _default_store is not None:
+                atexit.register(_default_store.close)
+        return _default_store
+
+
+def set_session_store(store):
+    """Installs the shared store; None disables persistence, e.g. for stateless batches."""
+    global _default_store
+    with _default_lock:
+        _default_store = store
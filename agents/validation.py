@@ -0,0 +1,332 @@
+import math
+import re
+from bisect import bisect_left
+
+
+# Anchored on a digit so the scanner can skip text quickly; signs and
+# identifiers ("Q3", "v1.2") are resolved from the preceding character.
+TOKEN_PATTERN = re.compile(
+    r"[0-9]+(?:,[0-9]{3})*(?:\.[0-9]+)?"
+    r"(?:(?P<date>-[0-9]{2}-[0-9]{2}\b)|(?P<unit>\s?%|[ -](?:days?|weeks?|months?|years?)\b))?"
+)
+
+# "1. ", "2) " or "Step 3" at the start of a line.
+LIST_MARKER = re.compile(r"^[ \t]*(?:(\d+)[.)][ \t]|step[ \t]+(\d+)\b)", re.IGNORECASE | re.MULTILINE)
+
+# Unit class of each summary field. A figure only verifies against
+# fields of a class its written unit allows (see TOKEN_CLASSES).
+SUMMARY_FIELDS = {
+    "annualized_volatility": "fraction",
+    "volatility_percentile": "percent",
+    "max_drawdown_pct": "percent",
+    "downtrend_days": "days",
+    "recovery_probability_pct": "percent",
+    "risk_score": "count",
+    "observations": "count",
+}
+
+# Fields stored as fractions that memos usually quote as percentages.
+FRACTION_FIELDS = {"annualized_volatility"}
+
+# Classes a token may match, by written unit. A bare number carries no
+# unit to contradict; "%" never matches a day count and "days" never a
+# percentage. Weeks, months and years match nothing: they are lookback
+# horizons ("a 5-year history"), marked incidental instead.
+TOKEN_CLASSES = {
+    None: ("fraction", "percent", "days", "count", "allocation"),
+    "percent": ("percent", "allocation"),
+    "days": ("days",),
+}
+
+# A percentage in a clause about sizing ("Allocate 55% of the book") is a
+# position size and only matches the position-size bands, unless a
+# metric is named between the sizing word and the number.
+ALLOCATION_WORDS = re.compile(r"\b(?:allocat\w*|exposure|position\w*|weight\w*|stake|sizing)\b", re.IGNORECASE)
+METRIC_WORDS = re.compile(
+    r"\b(?:volatility|drawdown|percentile|probability|recovery|decline|loss|risk)\b", re.IGNORECASE
+)
+CONTEXT_CHARS = 80
+
+# Lookback windows the analytics themselves use ("200-day average").
+METHOD_WINDOWS = {20, 30, 50, 60, 200, 252}
+
+# Units of the history horizon a memo describes ("over 3 months").
+HORIZON_UNITS = {"weeks", "months", "years"}
+
+# Half a unit in the last written place, by number of decimals.
+TOLERANCES = [0.5 * 10 ** -decimals + 1e-9 for decimals in range(12)]
+
+# Trailing characters that can still change a streamed token: a unit
+# (" months") or date tail ("-12-31") plus the word boundary after it.
+STREAM_HOLDBACK = 10
+
+
+# -----------------------------------
+# Tokens
+# -----------------------------------
+def _unit(raw: str) -> str:
+    if not raw:
+        return None
+    raw = raw.strip(" -").lower()
+    if raw == "%":
+        return "percent"
+    return raw if raw.endswith("s") else raw + "s"
+
+
+def _sign(text: str, start: int):
+    """
+    -1 or 1 for an explicitly signed token, 0 for an unsigned one, None
+    inside an identifier. A dash after a number or unit ("1%-3%") is a
+    range, not a sign.
+    """
+    previous = text[start - 1] if start else " "
+    if previous.isalnum() or previous in "._":
+        return None
+    if previous not in "+-" or (start >= 2 and (text[start - 2].isalnum() or text[start - 2] == "%")):
+        return 0
+    return -1 if previous == "-" else 1
+
+
+def _is_allocation(text: str, start: int) -> bool:
+    """True when the clause before `start` is about position sizing."""
+    window = text[max(start - CONTEXT_CHARS, 0):start]
+    clause = window[max(window.rfind(". "), window.rfind("\n"), window.rfind("; ")) + 1:]
+    sizing = [match.end() for match in ALLOCATION_WORDS.finditer(clause)]
+    metrics = [match.end() for match in METRIC_WORDS.finditer(clause)]
+    return bool(sizing) and sizing[-1] > max(metrics, default=-1)
+
+
+def _scan(text: str):
+    """
+    (match, sign) per number token, skipping digits that are part of
+    identifiers.
+    """
+    for match in TOKEN_PATTERN.finditer(text):
+        sign = _sign(text, match.start())
+        if sign is not None:
+            yield match, sign
+
+
+def _parse(match, sign: int):
+    """(value, decimals, unit) of one token; unit is "date" for dates."""
+    date, unit = match.groups()
+    if date:
+        return None, 0, "date"
+
+    digits = match.group(0)
+    if unit:
+        digits = digits[:len(digits) - len(unit)]
+    digits = digits.replace(",", "")
+    point = digits.find(".")
+    value = -float(digits) if sign < 0 else float(digits)
+    return value, (len(digits) - point - 1 if point >= 0 else 0), _unit(unit)
+
+
+def tokenize_numbers(text: str) -> list:
+    """
+    Every number in `text` with its value, decimals, unit and position.
+    Linear in the length of the text.
+    """
+    tokens = []
+    for match, sign in _scan(text):
+        value, decimals, unit = _parse(match, sign)
+        tokens.append({
+            "text": match.group(0),
+            "kind": "date" if unit == "date" else "number",
+            "value": value,
+            "decimals": decimals,
+            "unit": None if unit == "date" else unit,
+            "start": match.start(),
+            "end": match.end(),
+        })
+    return tokens
+
+
+# -----------------------------------
+# Value Index
+# -----------------------------------
+class ValueIndex:
+    """
+    Sorted index of every legitimate figure a summary allows in a memo,
+    per unit class (fraction, percent, days, count, allocation).
+
+    Each field contributes its absolute value and sign, and fraction
+    fields their percentage form too. A token written with d decimals
+    matches a value it rounds to, i.e. one within half a unit in its last
+    place, so "35%" and "35.2%" both match a volatility of 0.352. An
+    explicit sign must agree with the field's: "-38.2%" and "38.2%" match
+    a -38.2 drawdown, "+38.2%" does not.
+    """
+
+    def __init__(self, entries):
+        self.classes = {}
+        for unit_class, value, field in sorted(entries, key=lambda entry: (entry[0], abs(entry[1]))):
+            values, fields, signs = self.classes.setdefault(unit_class, ([], [], []))
+            values.append(abs(value))
+            fields.append(field)
+            signs.append((value > 0) - (value < 0))
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "ValueIndex":
+        entries = []
+
+        for field, unit_class in SUMMARY_FIELDS.items():
+            value = summary.get(field)
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or math.isnan(value):
+                continue
+            entries.append((unit_class, float(value), field))
+            if field in FRACTION_FIELDS:
+                entries.append(("percent", round(float(value) * 100, 10), field))
+
+        # Allocation bands quoted from the position-size suggestion ("1%-3%").
+        for token in tokenize_numbers(str(summary.get("position_size_suggestion") or "")):
+            if token["kind"] == "number":
+                entries.append(("allocation", abs(token["value"]), "position_size_suggestion"))
+
+        return cls(entries)
+
+    def lookup(self, value: float, decimals: int, unit: str = None, sign: int = 0, allocation: bool = False):
+        """Summary field a written value rounds from, or None."""
+        classes = ("allocation",) if allocation and unit == "percent" else TOKEN_CLASSES.get(unit, ())
+        value = abs(value)
+        tolerance = TOLERANCES[decimals] if decimals < len(TOLERANCES) else 1e-9
+
+        for unit_class in classes:
+            values, fields, signs = self.classes.get(unit_class, ((), (), ()))
+            i = bisect_left(values, value - tolerance)
+
+            while i < len(values) and values[i] <= value + tolerance:
+                candidate = values[i]
+                # "0" is not a rounding of 0.35: it would match any small value.
+                if (value != 0 or candidate == 0) and (not sign or signs[i] in (sign, 0)):
+                    return fields[i]
+                i += 1
+
+        return None
+
+
+# -----------------------------------
+# Findings
+# -----------------------------------
+def _marker_start(match) -> int:
+    return match.start(1) if match.group(1) else match.start(2)
+
+
+def _list_marker_positions(text: str) -> set:
+    return {_marker_start(match) for match in LIST_MARKER.finditer(text)}
+
+
+def _is_list_marker(text: str, start: int) -> bool:
+    """Single-token form of _list_marker_positions."""
+    match = LIST_MARKER.match(text, text.rfind("\n", 0, start) + 1)
+    return match is not None and _marker_start(match) == start
+
+
+def _incidental_reason(start: int, value: float, decimals: int, unit: str, list_markers: set):
+    if unit == "date":
+        return "date"
+    if start in list_markers:
+        return "list_marker"
+    if decimals == 0 and unit is None and 1900 <= value <= 2100:
+        return "year"
+    if unit == "days" and value in METHOD_WINDOWS:
+        return "method_window"
+    if unit in HORIZON_UNITS:
+        return "horizon"
+    return None
+
+
+def check_numbers(text: str, index: ValueIndex) -> list:
+    """
+    Span-level findings for every number in `text`.
+
+    status is "verified" (rounds from a summary value), "incidental"
+    (dates, years, list numbering, analytics window lengths, horizons) or
+    "unverified" (not traceable to the summary). Memos repeat the same
+    figures, so each distinct token is parsed and looked up once.
+    """
+    list_markers = _list_marker_positions(text)
+    seen = {}
+    return [
+        _finding(match, sign, index, seen, match.start() in list_markers)
+        for match, sign in _scan(text)
+    ]
+
+
+def _finding(match, sign: int, index: ValueIndex, seen: dict, list_marker: bool) -> dict:
+    start, end = match.span()
+    allocation = bool(match.group("unit")) and _is_allocation(match.string, start)
+    key = (match.group(0), sign, allocation)
+
+    parsed = seen.get(key)
+    if parsed is None:
+        value, decimals, unit = _parse(match, sign)
+        field = index.lookup(value, decimals, unit, sign, allocation) if unit != "date" else None
+        parsed = seen[key] = (value, decimals, unit, field)
+    value, decimals, unit, field = parsed
+
+    if list_marker:
+        field = None
+    reason = None if field else _incidental_reason(start, value, decimals, unit, {start} if list_marker else ())
+
+    return {
+        "text": key[0],
+        "start": start,
+        "end": end,
+        "value": value,
+        "unit": None if unit == "date" else unit,
+        "status": "verified" if field else ("incidental" if reason else "unverified"),
+        "field": field,
+        "reason": reason,
+    }
+
+
+class NumberStream:
+    """
+    check_numbers over text that arrives in chunks.
+
+    A token is reported once STREAM_HOLDBACK characters follow it, when
+    no later text can extend it or change its unit, so the findings of a
+    whole stream equal check_numbers on the joined text. Scanning resumes
+    at the first unsettled token, keeping the total work linear.
+    """
+
+    def __init__(self, index: ValueIndex):
+        self.index = index
+        self.text = ""
+        self.findings = []
+        self._position = 0
+        self._seen = {}
+
+    def feed(self, chunk: str) -> list:
+        """Appends `chunk` and returns the findings it settled."""
+        self.text += chunk
+        return self._advance(len(self.text) - STREAM_HOLDBACK)
+
+    def close(self) -> list:
+        """Settles the remaining tokens at the end of the stream."""
+        return self._advance(len(self.text))
+
+    def _advance(self, limit: int) -> list:
+        text = self.text
+        new = []
+
+        for match in TOKEN_PATTERN.finditer(text, self._position):
+            if match.end() > limit:
+                self._position = match.start()
+                break
+            self._position = match.end()
+
+            sign = _sign(text, match.start())
+            if sign is not None:
+                new.append(_finding(match, sign, self.index, self._seen, _is_list_marker(text, match.start())))
+        else:
+            # No digits past here: the next chunk is the next place to look.
+            self._position = len(text)
+
+        self.findings.extend(new)
+        return new
+
+
+def unverified(findings: list) -> list:
+    return [finding for finding in findings if finding["status"] == "unverified"]
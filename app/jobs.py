@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.context import AnalysisContext
+from run_report import report_pipeline
+
+
+DEFAULT_JOB_WORKERS = 4
+
+# Finished jobs are kept this long so reruns and other sessions reuse them.
+DEFAULT_JOB_TTL_SECONDS = 15 * 60
+
+QUEUED = "queued"
+DEBATING = "debating"
+RENDERING = "rendering"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """
+    One ticker's committee debate and PDF build.
+
+    Workers append turns as the committee produces them; the viewer
+    reads consistent copies through snapshot() while the job runs.
+    """
+
+    def __init__(self, ticker: str):
+        self.id = uuid.uuid4().hex
+        self.ticker = ticker
+        self.status = QUEUED
+        self.turns = []
+        self.draft = ""
+        self.restarts = []
+        self.result = None
+        self.pdf = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def add_turn(self, agent: str, turn: dict):
+        with self._lock:
+            self.turns.append({"agent": agent, **turn})
+
+    def add_event(self, event: dict):
+        """Memo stream events: chunks extend the draft, a restart discards it."""
+        with self._lock:
+            if event["type"] == "chunk":
+                self.draft += event["text"]
+            elif event["type"] == "restart":
+                self.draft = ""
+                self.restarts.append(event)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "ticker": self.ticker,
+                "status": self.status,
+                "turns": list(self.turns),
+                "draft": self.draft,
+                "restarts": list(self.restarts),
+                "result": self.result,
+                "pdf": self.pdf,
+                "error": self.error,
+                "elapsed_seconds": round((self.finished_at or time.time()) - self.created_at, 1),
+            }
+
+
+class JobQueue:
+    """
+    Bounded background workers for the slow half of a viewer request.
+
+    Requests for the same ticker and data share one job, whether they
+    come from reruns of one session or from other users, so a debate
+    is never run twice concurrently.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS, ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="viewer-job")
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, ticker: str, hist, summary: dict) -> Job:
+        key = (ticker, summary.get("time_period"), summary.get("observations"))
+
+        with self._lock:
+            self._prune()
+            job = self._by_key.get(key)
+            if job is not None and job.status != FAILED:
+                return job
+
+            job = Job(ticker)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+
+        self._pool.submit(self._run, job, hist, summary)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            self._by_key = {key: other for key, other in self._by_key.items() if other is not job}
+
+    @staticmethod
+    def _run(job: Job, hist, summary: dict):
+        try:
+            context = AnalysisContext(job.ticker, hist)
+            context.summary = summary
+
+            def on_stage(name, value):
+                if name == "result":
+                    job.update(status=RENDERING, result=value)
+
+            # Charts render while the committee debates; only layout is left after the memo.
+            job.update(status=DEBATING)
+            pipeline = report_pipeline(on_turn=job.add_turn, on_event=job.add_event)
+            results = pipeline.run({"ticker": job.ticker, "output": None, "label": None,
+                                    "context": context, "summary": summary}, on_stage=on_stage)
+
+            job.update(status=DONE, pdf=results["pdf"], finished_at=time.time())
+        except Exception as exc:
+            job.update(status=FAILED, error=f"{type(exc).__name__}: {exc}", finished_at=time.time())
@@ -4,10 +4,144 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from run_report import generate_report
-from agents.finance_agent_team import run_financial_intelligence
+from agents.finance_agent_team import get_committee
+from app.jobs import DEBATING, DONE, FAILED, RENDERING, JobQueue
 from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import DEFAULT_TTL_SECONDS, get_price_cache
+from core.horizons import build_horizon_summary, horizon_table
 
+POLL_SECONDS = 1.0
+
+STATUS_MESSAGES = {
+    DEBATING: "Investment committee in session...",
+    RENDERING: "Memo complete. Building the research packet...",
+}
+
+
+# -------------------------
+# SHARED RESOURCES
+# -------------------------
+@st.cache_resource
+def committee():
+    """The agent team is built once per server and shared by every session."""
+    return get_committee()
+
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    committee()
+    return JobQueue()
+
+
+@st.cache_data(ttl=DEFAULT_TTL_SECONDS, max_entries=256, show_spinner=False)
+def load_history(ticker: str):
+    return get_price_cache().get(ticker)
+
+
+@st.cache_data(ttl=DEFAULT_TTL_SECONDS, max_entries=256, show_spinner=False)
+def load_summary(ticker: str) -> dict:
+    return build_analysis_summary(ticker, context=AnalysisContext(ticker, load_history(ticker)))
+
+
+@st.cache_data(ttl=DEFAULT_TTL_SECONDS, max_entries=256, show_spinner=False)
+def load_horizons(ticker: str) -> dict:
+    return build_horizon_summary(ticker)
+
+
+# -------------------------
+# RENDERING
+# -------------------------
+def render_regime_banner(regime: str):
+    if regime == "DEFENSIVE":
+        st.markdown("<h2 style='color:red;'>🔴 DEFENSIVE REGIME</h2>", unsafe_allow_html=True)
+    elif regime == "CAUTION":
+        st.markdown("<h2 style='color:orange;'>🟡 CAUTION REGIME</h2>", unsafe_allow_html=True)
+    else:
+        st.markdown("<h2 style='color:green;'>🟢 CONSTRUCTIVE REGIME</h2>", unsafe_allow_html=True)
+
+
+def render_metrics(summary: dict):
+    col1, col2, col3 = st.columns(3)
+
+    col1.metric("Trend", summary["trend"])
+    col2.metric("Volatility", summary["annualized_volatility"])
+    col3.metric("Drawdown (%)", summary["max_drawdown_pct"])
+
+    col4, col5, col6 = st.columns(3)
+
+    col4.metric("Volatility Percentile", f"{summary['volatility_percentile']}%")
+    col5.metric("Downtrend Days", summary["downtrend_days"])
+    col6.metric("Recovery Probability", f"{summary['recovery_probability_pct']}%")
+
+    st.write("### Position Sizing Suggestion")
+    st.write(summary["position_size_suggestion"])
+
+
+def render_horizons(multi: dict):
+    """Short- and long-horizon regimes side by side."""
+    if not multi.get("data_available", False):
+        return
+    st.write("### Regimes by Horizon")
+    st.dataframe(horizon_table(multi), width="stretch")
+
+
+def render_job(job: dict):
+    """Committee output so far: analyst turns and the streaming memo, then the final memo and PDF."""
+    if job["status"] == FAILED:
+        st.error(f"Committee analysis failed: {job['error']}")
+        return
+
+    result = job["result"]
+
+    if result is None:
+        st.info(f"{STATUS_MESSAGES[DEBATING]} ({job['elapsed_seconds']}s)")
+        for turn in job["turns"]:
+            with st.expander(f"{turn['agent']} ({turn['seconds']}s)", expanded=not job["draft"]):
+                st.markdown(turn["content"])
+        if job["restarts"]:
+            st.warning("Draft stopped by guardrails and regenerated: " + " ".join(job["restarts"][-1]["notes"]))
+        if job["draft"]:
+            st.markdown(job["draft"] + " ▌")
+        return
+
+    # Render the memo
+    st.markdown(result["agent_narrative"])
+
+    if job["status"] == RENDERING:
+        st.info(STATUS_MESSAGES[RENDERING])
+        return
+
+    # -------------------------
+    # DOWNLOAD PDF
+    # -------------------------
+    st.download_button(
+        label="Download Full Research Packet",
+        data=job["pdf"],
+        file_name=f"{job['ticker']}_institutional_report.pdf",
+        mime="application/pdf",
+    )
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def live_committee_panel(job_id: str):
+    """
+    Re-renders only this panel while the job runs. Once it finishes, the
+    whole app reruns and the panel is drawn statically instead.
+    """
+    job = job_queue().get(job_id)
+    if job is None:
+        st.rerun()
+
+    snapshot = job.snapshot()
+    render_job(snapshot)
+    if snapshot["status"] in (DONE, FAILED):
+        st.rerun()
+
+
+# -------------------------
+# PAGE
+# -------------------------
 st.set_page_config(layout="wide")
 st.title("AI Institutional Financial Intelligence")
 
@@ -18,64 +152,37 @@ if st.button("Analyze"):
     if not ticker:
         st.warning("Please enter a ticker.")
     else:
+        st.session_state["ticker"] = ticker.strip().upper()
+        st.session_state.pop("job_id", None)
 
-        summary = build_analysis_summary(ticker)
+active = st.session_state.get("ticker")
 
-        if not summary.get("data_available", False):
-            st.error(summary.get("message"))
-        else:
+if active:
 
-            regime = summary["regime"]
-
-            # -------------------------
-            # REGIME BANNER
-            # -------------------------
-            if regime == "DEFENSIVE":
-                st.markdown("<h2 style='color:red;'>🔴 DEFENSIVE REGIME</h2>", unsafe_allow_html=True)
-            elif regime == "CAUTION":
-                st.markdown("<h2 style='color:orange;'>🟡 CAUTION REGIME</h2>", unsafe_allow_html=True)
-            else:
-                st.markdown("<h2 style='color:green;'>🟢 CONSTRUCTIVE REGIME</h2>", unsafe_allow_html=True)
-
-            # -------------------------
-            # METRICS DASHBOARD
-            # -------------------------
-            col1, col2, col3 = st.columns(3)
-
-            col1.metric("Trend", summary["trend"])
-            col2.metric("Volatility", summary["annualized_volatility"])
-            col3.metric("Drawdown (%)", summary["max_drawdown_pct"])
-
-            col4, col5, col6 = st.columns(3)
-
-            col4.metric("Volatility Percentile", f"{summary['volatility_percentile']}%")
-            col5.metric("Downtrend Days", summary["downtrend_days"])
-            col6.metric("Recovery Probability", f"{summary['recovery_probability_pct']}%")
-
-            st.write("### Position Sizing Suggestion")
-            st.write(summary["position_size_suggestion"])
-
-            # -------------------------
-            # RUN MULTI-AGENT ANALYSIS
-            # -------------------------
-            st.write("---")
-            st.write("## Institutional Investment Committee Analysis")
-
-            result = run_financial_intelligence(ticker)
-
-            # Render the memo
-            st.markdown(result["agent_narrative"])
-
-            # -------------------------
-            # DOWNLOAD PDF
-            # -------------------------
-            output_file = f"{ticker}_institutional_report.pdf"
-            generate_report(ticker, output_file)
-
-            with open(output_file, "rb") as f:
-                st.download_button(
-                    label="Download Full Research Packet",
-                    data=f,
-                    file_name=output_file,
-                    mime="application/pdf",
-                )
+    summary = load_summary(active)
+
+    if not summary.get("data_available", False):
+        st.error(summary.get("message"))
+    else:
+
+        # Metrics come straight from the cached analytics.
+        render_regime_banner(summary["regime"])
+        render_metrics(summary)
+        render_horizons(load_horizons(active))
+
+        # -------------------------
+        # RUN MULTI-AGENT ANALYSIS
+        # -------------------------
+        st.write("---")
+        st.write("## Institutional Investment Committee Analysis")
+
+        queue = job_queue()
+        job = queue.get(st.session_state.get("job_id", ""))
+        if job is None:
+            job = queue.submit(active, load_history(active), summary)
+            st.session_state["job_id"] = job.id
+
+        if job.finished:
+            render_job(job.snapshot())
+        else:
+            live_committee_panel(job.id)
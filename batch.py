@@ -0,0 +1,206 @@
+import json
+import os
+import random
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from agents.finance_agent_team import run_financial_intelligence
+from agents.session_store import get_session_store
+from core.archive import get_result_archive
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from run_report import build_report_pdf
+
+
+DEFAULT_IO_WORKERS = 8
+DEFAULT_RENDER_WORKERS = max((os.cpu_count() or 2) - 1, 1)
+DEFAULT_TIMEOUT_SECONDS = 600
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+
+def with_retries(func, *args, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF_SECONDS, **kwargs):
+    """
+    Calls func, retrying with exponential backoff and jitter.
+    Returns (value, attempts); re-raises the last error once retries are spent.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func(*args, **kwargs), attempt
+        except Exception:
+            if attempt > retries:
+                raise
+            time.sleep(backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25))
+
+
+def report_filename(ticker: str, label: str) -> str:
+    safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_")
+    return f"{ticker}_{safe_label}_institutional_report.pdf" if safe_label else f"{ticker}_institutional_report.pdf"
+
+
+# -----------------------------------
+# Stage Workers
+# -----------------------------------
+def _analyze(key: int, ticker: str, retries: int, backoff: float, started: dict):
+    """Thread-pool stage: network-bound data fetch and committee debate."""
+    started[key] = time.time()
+    timings = {}
+
+    t0 = time.time()
+    context, fetch_attempts = with_retries(AnalysisContext.load, ticker, retries=retries, backoff=backoff)
+    timings["fetch_seconds"] = round(time.time() - t0, 3)
+
+    t0 = time.time()
+    build_analysis_summary(ticker, context=context)
+    timings["analytics_seconds"] = round(time.time() - t0, 3)
+
+    t0 = time.time()
+    result, debate_attempts = with_retries(
+        run_financial_intelligence, ticker, context=context, retries=retries, backoff=backoff
+    )
+    timings["debate_seconds"] = round(time.time() - t0, 3)
+
+    return context.hist, result, timings, fetch_attempts + debate_attempts - 2
+
+
+def _render(ticker: str, label: str, hist, result: dict, output_path: str):
+    """Process-pool stage: CPU-bound chart rendering and PDF assembly."""
+    t0 = time.time()
+    build_report_pdf(ticker, AnalysisContext(ticker, hist), result, output_path, label=label)
+    return {"render_seconds": round(time.time() - t0, 3)}
+
+
+# -----------------------------------
+# Batch Orchestration
+# -----------------------------------
+def run_batch(
+    companies,
+    output_dir: str = "reports",
+    io_workers: int = DEFAULT_IO_WORKERS,
+    render_workers: int = DEFAULT_RENDER_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+    manifest_path: str = None,
+) -> dict:
+    """
+    Runs one report per (ticker, label) pair.
+
+    Fetches and debates run on a thread pool; chart rendering and PDF
+    assembly run on a process pool as soon as a ticker's debate finishes.
+    A ticker that fails or exceeds `timeout` seconds is recorded in the
+    manifest and the rest of the batch continues. Every finished debate
+    is added to the result archive in one append at the end; if that
+    append fails, its error is recorded as the manifest's archive_error.
+    """
+    batch_start = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+
+    entries = {
+        key: {
+            "ticker": ticker,
+            "label": label,
+            "status": "pending",
+            "output_path": os.path.join(output_dir, report_filename(ticker, label)),
+            "retries": 0,
+            "error": None,
+            "timings": {},
+        }
+        for key, (ticker, label) in enumerate(companies)
+    }
+
+    started = {}
+    pending = {}
+    archived = []
+    archive_error = None
+
+    io_pool = ThreadPoolExecutor(max_workers=io_workers)
+    render_pool = ProcessPoolExecutor(max_workers=render_workers)
+
+    try:
+        for key, entry in entries.items():
+            future = io_pool.submit(_analyze, key, entry["ticker"], retries, backoff, started)
+            pending[future] = (key, "analyze")
+
+        while pending:
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key, stage = pending.pop(future)
+                entry = entries[key]
+                ticker = entry["ticker"]
+
+                if entry["status"] == "timeout":
+                    continue
+
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    entry["status"] = "failed"
+                    entry["error"] = f"{stage}: {type(exc).__name__}: {exc}"
+                    continue
+
+                if stage == "analyze":
+                    hist, result, timings, retried = value
+                    entry["timings"].update(timings)
+                    entry["retries"] = retried
+                    entry["regime"] = result["analysis_summary"].get("regime")
+                    entry["consistency_score"] = result["consistency_score"]
+                    archived.append((ticker, entry["label"], result, hist))
+                    render = render_pool.submit(_render, ticker, entry["label"], hist, result, entry["output_path"])
+                    pending[render] = (key, "render")
+                else:
+                    entry["timings"].update(value)
+                    entry["status"] = "ok"
+
+            # Threads cannot be interrupted, so an overdue ticker is
+            # abandoned: its result is ignored if it ever arrives.
+            now = time.time()
+            for future, (key, stage) in list(pending.items()):
+                if key in started and now - started[key] > timeout:
+                    entries[key]["status"] = "timeout"
+                    entries[key]["error"] = f"{stage}: exceeded {timeout}s"
+                    future.cancel()
+                    pending.pop(future)
+
+        archive = get_result_archive()
+        if archive is not None:
+            # The reports are written either way; a failed append is
+            # recorded in the manifest rather than losing it.
+            try:
+                archive.append(archived)
+            except Exception as exc:
+                archive_error = f"{type(exc).__name__}: {exc}"
+    finally:
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        render_pool.shutdown(wait=False, cancel_futures=True)
+
+        # Debates buffered under FINANCE_SESSION_BATCH_SIZE are written in one go.
+        store = get_session_store()
+        if store is not None:
+            store.flush()
+
+    manifest = {
+        "started_at": batch_start,
+        "wall_seconds": round(time.time() - batch_start, 3),
+        "settings": {
+            "io_workers": io_workers,
+            "render_workers": render_workers,
+            "timeout": timeout,
+            "retries": retries,
+            "backoff": backoff,
+        },
+        "succeeded": sum(1 for e in entries.values() if e["status"] == "ok"),
+        "failed": sum(1 for e in entries.values() if e["status"] != "ok"),
+        "archive_error": archive_error,
+        "reports": list(entries.values()),
+    }
+
+    manifest_path = manifest_path or os.path.join(output_dir, "batch_manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
@@ -0,0 +1,132 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_THRESHOLD = 0.20
+
+# Differences below this are timer noise, whatever the ratio.
+NOISE_FLOOR_SECONDS = 0.0005
+
+
+# -----------------------------------
+# Measurement
+# -----------------------------------
+def measure(func, setup=None, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Times func(*setup()) `repeat` times after `warmup` untimed runs.
+    `setup` runs outside the timed region, so memoized state (e.g. an
+    AnalysisContext) can be rebuilt for every sample.
+    """
+    samples = []
+
+    for i in range(warmup + repeat):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed)
+
+    return {
+        "median_seconds": round(statistics.median(samples), 6),
+        "min_seconds": round(min(samples), 6),
+        "max_seconds": round(max(samples), 6),
+        "repeat": repeat,
+    }
+
+
+class BenchmarkRun:
+    """Collects named cases and their parameters for one harness run."""
+
+    def __init__(self, profile: str, repeat: int, verbose: bool = True):
+        self.profile = profile
+        self.repeat = repeat
+        self.verbose = verbose
+        self.results = {}
+
+    def case(self, name: str, func, setup=None, repeat: int = None, items: int = None, **params):
+        result = measure(func, setup=setup, repeat=repeat or self.repeat)
+        result["params"] = params
+        if items:
+            result["items"] = items
+            result["items_per_second"] = round(items / result["median_seconds"], 1) if result["median_seconds"] else None
+
+        self.results[name] = result
+        if self.verbose:
+            print(f"{name:<52} {result['median_seconds'] * 1000:>11.3f} ms", flush=True)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "profile": self.profile,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": self.results,
+        }
+
+
+# -----------------------------------
+# Baselines
+# -----------------------------------
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def save_results(run: dict, name: str) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2))
+    return path
+
+
+def load_results(name: str) -> dict:
+    return json.loads(baseline_path(name).read_text())
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compares median timings case by case. A case regresses when it is
+    more than `threshold` slower than the baseline and the difference
+    is above the timer noise floor.
+    """
+    rows = []
+
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+
+        before = reference["median_seconds"]
+        after = result["median_seconds"]
+        ratio = after / before if before else float("inf")
+
+        rows.append({
+            "case": name,
+            "baseline_seconds": before,
+            "current_seconds": after,
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold and after - before > NOISE_FLOOR_SECONDS,
+            "improvement": ratio < 1 - threshold and before - after > NOISE_FLOOR_SECONDS,
+        })
+
+    return rows
+
+
+def print_comparison(rows: list, threshold: float):
+    print(f"\n{'case':<52} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ("  faster" if row["improvement"] else "")
+        print(f"{row['case']:<52} {row['baseline_seconds'] * 1000:>12.3f} "
+              f"{row['current_seconds'] * 1000:>12.3f} {row['ratio']:>7.2f}{flag}")
+
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%} across {len(rows)} compared case(s)")
@@ -0,0 +1,352 @@
+"""
+Reproducible benchmarks on synthetic data.
+
+    python -m benchmarks.run --profile quick --save-baseline main
+    python -m benchmarks.run --profile quick --compare main --threshold 0.2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD,
+    BenchmarkRun,
+    compare,
+    load_results,
+    print_comparison,
+    save_results,
+)
+from benchmarks.synthetic import (
+    synthetic_close_matrix,
+    synthetic_history,
+    synthetic_intraday,
+    synthetic_narrative,
+    synthetic_universe,
+)
+from core.analytics import (
+    TREND_MA_WINDOW,
+    VOLATILITY_PERCENTILE_WINDOW,
+    build_analysis_summary,
+    calculate_downtrend_duration,
+    calculate_volatility_percentile,
+    classify_risk_regime,
+)
+from core.charts import CHART_RENDERERS, render_charts
+from core.context import AnalysisContext
+from core.data import FixtureProvider, PriceCache, normalize_history, set_price_cache
+from core.horizons import DEFAULT_HORIZONS, build_horizon_summary
+from core.kernels import KERNEL_BACKEND, close_stats
+from core.screening import screen_universe
+
+
+PROFILES = {
+    "quick": {
+        "years": [1, 5],
+        "universes": [1, 100],
+        "batch": [2],
+        "narratives": [1, 10],
+        "portfolios": [10],
+        "intraday_years": [1],
+        "repeat": 3,
+    },
+    "full": {
+        "years": [1, 5, 10, 30],
+        "universes": [1, 100, 1000, 5000],
+        "batch": [1, 10, 50],
+        "narratives": [1, 10, 100],
+        "portfolios": [10, 50, 200],
+        "intraday_years": [1, 5],
+        "repeat": 5,
+    },
+}
+
+SUITES = ["analytics", "screening", "charts", "report", "portfolio", "validation", "batch", "archive", "intraday",
+          "imports"]
+
+# Entry points timed from a cold interpreter; "python" is bare startup.
+IMPORT_TARGETS = ["python", "core.analytics", "cli", "agents.finance_agent_team", "run_report", "batch"]
+
+# Heavy dependencies whose presence after an import is recorded.
+HEAVY_MODULES = ["agno", "openai", "matplotlib", "fpdf", "yfinance", "sqlalchemy"]
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+TICKER = "SYN00000"
+
+
+def _history(years: float):
+    return normalize_history(synthetic_history(TICKER, years))
+
+
+def _result_for(ticker: str, context: AnalysisContext) -> dict:
+    """A run_financial_intelligence-shaped result without the committee."""
+    summary = build_analysis_summary(ticker, context=context)
+    return {
+        "analysis_summary": summary,
+        "agent_narrative": synthetic_narrative(summary),
+        "reasoning_log": [f"Step {i}: synthetic benchmark step." for i in range(1, 7)],
+    }
+
+
+# -----------------------------------
+# Suites
+# -----------------------------------
+def suite_analytics(run: BenchmarkRun, profile: dict):
+    for years in profile["years"]:
+        hist = _history(years)
+        rows = len(hist)
+        fresh = lambda: (AnalysisContext(TICKER, hist),)
+        returns = lambda: (AnalysisContext(TICKER, hist).daily_returns,)
+
+        run.case(f"analytics.returns.{years}y", lambda ctx: ctx.daily_returns, fresh, rows=rows)
+        run.case(f"analytics.volatility.{years}y", lambda r: r.std() * np.sqrt(252), returns, rows=rows)
+        run.case(f"analytics.drawdown.{years}y", lambda ctx: ctx.drawdown.min(), fresh, rows=rows)
+        run.case(f"analytics.volatility_percentile.{years}y", calculate_volatility_percentile, returns, rows=rows)
+        run.case(f"analytics.downtrend_duration.{years}y", lambda: calculate_downtrend_duration(hist), rows=rows)
+        run.case(f"analytics.close_stats.{years}y",
+                 lambda: close_stats(hist["close"], VOLATILITY_PERCENTILE_WINDOW, TREND_MA_WINDOW),
+                 rows=rows, backend=KERNEL_BACKEND)
+
+        summary = build_analysis_summary(TICKER, context=AnalysisContext(TICKER, hist))
+        run.case(f"analytics.regime_classification.{years}y", lambda: classify_risk_regime(summary))
+        run.case(f"analytics.summary.{years}y", lambda ctx: build_analysis_summary(TICKER, context=ctx),
+                 fresh, rows=rows)
+        run.case(f"analytics.horizons.{years}y", lambda ctx: build_horizon_summary(TICKER, context=ctx),
+                 fresh, rows=rows, horizons=len(DEFAULT_HORIZONS))
+
+    for count in profile["universes"]:
+        histories = [(t, normalize_history(h)) for t, h in synthetic_universe(count, 5).items()]
+        run.case(
+            f"analytics.summary_loop.{count}x5y",
+            lambda: [build_analysis_summary(t, context=AnalysisContext(t, h)) for t, h in histories],
+            repeat=1 if count >= 1000 else None, items=count, tickers=count,
+        )
+
+
+def suite_screening(run: BenchmarkRun, profile: dict):
+    for count in profile["universes"]:
+        prices = synthetic_close_matrix(count, 5)
+        run.case(f"screening.screen_universe.{count}x5y", lambda: screen_universe(prices),
+                 items=count, tickers=count)
+
+
+def suite_charts(run: BenchmarkRun, profile: dict):
+    for years in profile["years"]:
+        context = AnalysisContext(TICKER, _history(years))
+        for name, render in CHART_RENDERERS.items():
+            run.case(f"charts.{name}.{years}y", lambda r=render: r(context), rows=len(context.hist))
+
+
+def suite_report(run: BenchmarkRun, profile: dict):
+    from run_report import build_report_pdf, report_pipeline
+
+    output_path = os.path.join(tempfile.mkdtemp(prefix="bench-report-"), "report.pdf")
+
+    for years in profile["years"]:
+        context = AnalysisContext(TICKER, _history(years))
+        result = _result_for(TICKER, context)
+        charts = render_charts(context)
+
+        run.case(f"report.end_to_end.{years}y",
+                 lambda: build_report_pdf(TICKER, AnalysisContext(TICKER, context.hist), result, output_path),
+                 rows=len(context.hist))
+        run.case(f"report.layout_and_write.{years}y",
+                 lambda: build_report_pdf(TICKER, context, result, output_path, charts=charts))
+        # Charts on the pipeline's threads; the debate result is supplied.
+        run.case(f"report.pipeline.{years}y",
+                 lambda: report_pipeline().run({"ticker": TICKER, "output": output_path, "label": None,
+                                                "context": AnalysisContext(TICKER, context.hist),
+                                                "result": result}),
+                 rows=len(context.hist))
+
+
+def suite_portfolio(run: BenchmarkRun, profile: dict):
+    from core.portfolio import PortfolioContext, build_portfolio_summary
+    from run_report import build_portfolio_pdf
+
+    for count in profile["portfolios"]:
+        universe = synthetic_universe(count, 5)
+        contexts = {ticker: AnalysisContext(ticker, normalize_history(hist)) for ticker, hist in universe.items()}
+        weights = {ticker: 1.0 for ticker in universe}
+        fresh = lambda: (PortfolioContext({t: AnalysisContext(t, c.hist) for t, c in contexts.items()}, weights),)
+
+        run.case(f"portfolio.summary.{count}x5y", build_portfolio_summary, fresh, items=count, tickers=count)
+        run.case(f"portfolio.packet.{count}x5y", build_portfolio_pdf, fresh,
+                 repeat=1 if count >= 50 else None, items=count, tickers=count)
+
+
+def _guard_stream(guard, chunks) -> list:
+    return [flag for chunk in chunks for flag in guard.feed(chunk)]
+
+
+def suite_validation(run: BenchmarkRun, profile: dict):
+    from agents.finance_agent_team import NarrativeGuard, validate_narrative
+
+    summary = build_analysis_summary(TICKER, context=AnalysisContext(TICKER, _history(5)))
+    for paragraphs in profile["narratives"]:
+        narrative = synthetic_narrative(summary, paragraphs)
+        run.case(f"validation.validate_narrative.{paragraphs}p", lambda: validate_narrative(narrative, summary),
+                 chars=len(narrative))
+
+        # Token-sized chunks, as a streamed memo arrives.
+        chunks = [narrative[i:i + 16] for i in range(0, len(narrative), 16)]
+        run.case(f"validation.stream_guard.{paragraphs}p",
+                 lambda: _guard_stream(NarrativeGuard(summary), chunks),
+                 chars=len(narrative))
+
+
+def suite_batch(run: BenchmarkRun, profile: dict):
+    """End-to-end batch path with the MockChat committee and a fixture price cache."""
+    from agents.finance_agent_team import InvestmentCommittee, set_committee
+    from agents.mock_model import mock_model_factory
+    from agents.narrative_cache import NarrativeCache, set_narrative_cache
+    from agents.session_store import SessionStore, set_session_store
+    from batch import run_batch
+    from core.archive import ResultArchive, set_result_archive
+
+    set_committee(InvestmentCommittee(mock_model_factory()))
+
+    for count in profile["batch"]:
+        universe = synthetic_universe(count, 5)
+        companies = [(ticker, "Synthetic") for ticker in universe]
+
+        def setup():
+            # Fresh caches per sample, so every run fetches and debates.
+            set_price_cache(PriceCache(tempfile.mkdtemp(prefix="bench-prices-"), FixtureProvider(universe)))
+            set_narrative_cache(NarrativeCache(tempfile.mkdtemp(prefix="bench-narratives-")))
+            set_session_store(SessionStore(os.path.join(tempfile.mkdtemp(prefix="bench-sessions-"), "sessions.db")))
+            set_result_archive(ResultArchive(tempfile.mkdtemp(prefix="bench-archive-")))
+            return (tempfile.mkdtemp(prefix="bench-batch-"),)
+
+        def batch(output_dir):
+            manifest = run_batch(companies, output_dir=output_dir, retries=0)
+            if manifest["failed"]:
+                raise RuntimeError(f"{manifest['failed']} benchmark report(s) failed")
+
+        run.case(f"batch.run_batch.{count}x5y", batch, setup, repeat=1 if count >= 10 else None,
+                 items=count, tickers=count)
+
+
+def suite_archive(run: BenchmarkRun, profile: dict):
+    """Batch appends to the result archive and the scans audit jobs run over it."""
+    from core.archive import ResultArchive
+
+    for count in profile["universes"]:
+        contexts = [AnalysisContext(t, normalize_history(h)) for t, h in synthetic_universe(count, 5).items()]
+        records = [(ctx.ticker, "Synthetic", _result_for(ctx.ticker, ctx), ctx) for ctx in contexts]
+        fresh = lambda: (ResultArchive(tempfile.mkdtemp(prefix="bench-archive-")),)
+
+        run.case(f"archive.append.{count}x5y", lambda archive: archive.append(records), fresh,
+                 repeat=1 if count >= 1000 else None, items=count, tickers=count)
+
+        archive = ResultArchive(tempfile.mkdtemp(prefix="bench-archive-"))
+        archive.append(records)
+        run.case(f"archive.runs.{count}", archive.runs, items=count)
+        run.case(f"archive.series.{count}x5y", lambda: archive.series(tickers=[TICKER]), tickers=count)
+
+
+def suite_intraday(run: BenchmarkRun, profile: dict):
+    """Minute bars written to the chunked store, then read back raw and resampled."""
+    from core.intraday import BAR_COLUMNS, IntradayStore, build_intraday_summary
+
+    for years in profile["intraday_years"]:
+        hist = normalize_history(synthetic_intraday(TICKER, years))
+        rows = len(hist)
+        fresh = lambda: (IntradayStore(tempfile.mkdtemp(prefix="bench-intraday-")),)
+        run.case(f"intraday.write.{years}y", lambda store: store.write(TICKER, "1m", hist), fresh,
+                 repeat=1 if years >= 5 else None, rows=rows)
+
+        store = IntradayStore(tempfile.mkdtemp(prefix="bench-intraday-"),
+                              FixtureProvider({f"{TICKER}.1m": hist}), ttl_seconds=10 ** 9)
+        store.write(TICKER, "1m", hist)
+        store.update(TICKER, "1m")
+        run.case(f"intraday.load_close.{years}y", lambda: store.load(TICKER, "1m"), rows=rows)
+        for target in ("5m", "1h", "1d"):
+            run.case(f"intraday.resample_{target}.{years}y",
+                     lambda t=target: store.load(TICKER, "1m", columns=BAR_COLUMNS, resample_to=t), rows=rows)
+        run.case(f"intraday.pandas_resample_1d.{years}y",
+                 lambda: hist.set_index("date").resample("1D").agg(
+                     {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna(),
+                 rows=rows)
+        run.case(f"intraday.summary_1m.{years}y", lambda: build_intraday_summary(TICKER, "1m", store=store),
+                 rows=rows)
+
+
+def suite_imports(run: BenchmarkRun, profile: dict):
+    """Wall time of a fresh interpreter importing each entry point."""
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+
+    for target in IMPORT_TARGETS:
+        statement = "pass" if target == "python" else f"import {target}"
+        probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        command = [sys.executable, "-c", probe]
+        loaded = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+                                check=True).stdout.strip()
+
+        run.case(f"imports.{target}", lambda: subprocess.run(command, cwd=REPO_ROOT, env=env,
+                                                             capture_output=True, check=True),
+                 loaded=loaded or None)
+
+
+SUITE_FUNCTIONS = {
+    "analytics": suite_analytics,
+    "screening": suite_screening,
+    "charts": suite_charts,
+    "report": suite_report,
+    "portfolio": suite_portfolio,
+    "validation": suite_validation,
+    "batch": suite_batch,
+    "archive": suite_archive,
+    "intraday": suite_intraday,
+    "imports": suite_imports,
+}
+
+
+# -----------------------------------
+# Entry Point
+# -----------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks on synthetic market data.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--suite", default=",".join(SUITES), help="Comma-separated suites to run.")
+    parser.add_argument("--repeat", type=int, default=None, help="Override the profile's sample count.")
+    parser.add_argument("--output", help="Write this run's results to a JSON file.")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Store results as benchmarks/baselines/NAME.json.")
+    parser.add_argument("--compare", metavar="NAME", help="Baseline name or JSON path to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown ratio flagged as a regression (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    profile = PROFILES[args.profile]
+    run = BenchmarkRun(args.profile, args.repeat or profile["repeat"])
+
+    for suite in [s.strip() for s in args.suite.split(",") if s.strip()]:
+        if suite not in SUITE_FUNCTIONS:
+            parser.error(f"unknown suite {suite!r}; choose from {', '.join(SUITES)}")
+        SUITE_FUNCTIONS[suite](run, profile)
+
+    results = run.to_dict()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        print(f"\nBaseline written to {save_results(results, args.save_baseline)}")
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row["regression"] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
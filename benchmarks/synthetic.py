@@ -0,0 +1,99 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_END_DATE = "2024-12-31"
+
+
+def ticker_seed(ticker: str, seed: int = 0) -> int:
+    """Stable per-ticker seed, independent of PYTHONHASHSEED."""
+    return zlib.crc32(f"{ticker}:{seed}".encode())
+
+
+def synthetic_history(ticker: str, years: float = 5, seed: int = 0,
+                      end_date: str = DEFAULT_END_DATE) -> pd.DataFrame:
+    """
+    Deterministic daily OHLCV bars shaped like a provider frame
+    (Date index, capitalized columns).
+
+    Each ticker gets its own drift and volatility, and some get a crash
+    and slow recovery, so a universe spans all three regimes.
+    """
+    rng = np.random.default_rng(ticker_seed(ticker, seed))
+    n = max(int(round(years * TRADING_DAYS_PER_YEAR)), 2)
+    dates = pd.bdate_range(end=end_date, periods=n)
+
+    drift = rng.uniform(-0.0004, 0.0008)
+    vol = rng.uniform(0.008, 0.035)
+    returns = rng.normal(drift, vol, n)
+
+    if rng.random() < 0.3:
+        start = int(rng.integers(0, max(n - 60, 1)))
+        returns[start:start + 60] -= rng.uniform(0.003, 0.012)
+
+    close = rng.uniform(20, 400) * np.exp(np.cumsum(returns))
+    open_ = close * np.exp(rng.normal(0, vol / 4, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    volume = rng.lognormal(14, 0.5, n).round()
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=pd.Index(dates, name="Date"),
+    )
+
+
+def synthetic_intraday(ticker: str, years: float = 1, minutes: int = 1, seed: int = 0,
+                       end_date: str = DEFAULT_END_DATE) -> pd.DataFrame:
+    """
+    Deterministic regular-session bars (9:30-16:00 New York) every
+    `minutes`, shaped like a provider frame with a tz-aware Datetime index.
+    """
+    rng = np.random.default_rng(ticker_seed(f"{ticker}.{minutes}m", seed))
+    days = pd.bdate_range(end=end_date, periods=max(int(round(years * TRADING_DAYS_PER_YEAR)), 1))
+    offsets = pd.timedelta_range("9h30min", "15h59min", freq=f"{minutes}min")
+    dates = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel()).tz_localize("America/New_York")
+    n = len(dates)
+
+    vol = rng.uniform(0.008, 0.035) / np.sqrt(len(offsets))
+    close = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = close * np.exp(rng.normal(0, vol / 4, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    volume = rng.lognormal(9, 0.8, n).round()
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=pd.Index(dates, name="Datetime"),
+    )
+
+
+def synthetic_tickers(count: int) -> list:
+    return [f"SYN{i:05d}" for i in range(count)]
+
+
+def synthetic_universe(count: int, years: float = 5, seed: int = 0) -> dict:
+    """ticker -> OHLCV frame, ready for FixtureProvider."""
+    return {ticker: synthetic_history(ticker, years, seed) for ticker in synthetic_tickers(count)}
+
+
+def synthetic_close_matrix(count: int, years: float = 5, seed: int = 0) -> pd.DataFrame:
+    """dates x tickers close matrix, as load_close_matrix returns."""
+    return pd.DataFrame({
+        ticker: hist["Close"] for ticker, hist in synthetic_universe(count, years, seed).items()
+    })
+
+
+def synthetic_narrative(summary: dict, paragraphs: int = 4) -> str:
+    """Committee-style memo quoting the summary's figures plus a few stray numbers."""
+    body = (
+        f"Annualized volatility stands at {summary.get('annualized_volatility')} with a "
+        f"volatility percentile of {summary.get('volatility_percentile')}. The maximum drawdown "
+        f"of {summary.get('max_drawdown_pct')}% and {summary.get('downtrend_days')} days below the "
+        f"200-day average frame a recovery probability of {summary.get('recovery_probability_pct')}%. "
+        "Exposure should stay within 3% to 5% of the portfolio over the next 12 months."
+    )
+    return "\n\n".join([body] * paragraphs)
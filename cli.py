@@ -1,17 +1,160 @@
+import argparse
+import json
+import os
 import sys
-from run_report import run
+from core.tracing import summarize_trace
+
+# Report, committee and charting modules are imported by the commands
+# that use them, so `analytics` starts without agno, matplotlib or fpdf.
+
+
+USAGE = (
+    "Usage: python cli.py [options] <TICKER> <LABEL> [<TICKER> <LABEL> ...]\n"
+    "       python cli.py --portfolio [options] <TICKER> <WEIGHT> [<TICKER> <WEIGHT> ...]\n"
+    "       python cli.py analytics [options] <TICKER> [<TICKER> ...]"
+)
+
+
+def print_stage_summary(stats: dict):
+    print(f"\n{'stage':<34} {'count':>6} {'total_s':>9} {'p50_s':>8} {'p95_s':>8} {'p99_s':>8}")
+    for name, row in stats.items():
+        print(f"{name:<34} {row['count']:>6} {row['total_seconds']:>9.3f} "
+              f"{row['p50_seconds']:>8.4f} {row['p95_seconds']:>8.4f} {row['p99_seconds']:>8.4f}")
+
+
+def run_analytics(argv):
+    """Deterministic summaries for many tickers as JSON, without the committee or reports."""
+    parser = argparse.ArgumentParser(prog="python cli.py analytics",
+                                     description="Print analytics summaries as a JSON array.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for data fetches.")
+    parser.add_argument("--horizons", metavar="PERIODS",
+                        help="Comma-separated horizons (e.g. 1y,3y,5y,10y) for a multi-horizon summary per ticker.")
+    parser.add_argument("--interval", default="1d",
+                        help="Bar interval (e.g. 5m, 1h); intraday bars come from the chunked intraday store.")
+    parser.add_argument("--resample", metavar="INTERVAL",
+                        help="Coarser interval to aggregate intraday bars to before the regime model.")
+    parser.add_argument("--indent", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in args.tickers))
+
+    if args.interval != "1d":
+        from core.intraday import build_intraday_summary
+
+        output = [build_intraday_summary(t, args.interval, resample_to=args.resample, period=args.period)
+                  for t in tickers]
+    elif args.horizons:
+        from core.context import AnalysisContext
+        from core.data import covering_period, load_histories
+        from core.horizons import build_horizon_summary
+
+        horizons = [h.strip() for h in args.horizons.split(",") if h.strip()]
+        histories = load_histories(tickers, covering_period(horizons), max_workers=args.workers)
+        output = [build_horizon_summary(t, AnalysisContext(t, histories[t]), horizons) for t in tickers]
+    else:
+        from core.data import load_close_matrix
+        from core.screening import screen_summaries, screen_universe
+
+        summaries = screen_summaries(screen_universe(load_close_matrix(tickers, args.period, max_workers=args.workers)))
+        output = [summaries[ticker] for ticker in tickers]
+
+    json.dump(output, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+
+
+def run_portfolio(pairs, args):
+    from run_report import generate_portfolio_report
+
+    try:
+        weights = [(ticker, float(weight)) for ticker, weight in pairs]
+    except ValueError:
+        print(USAGE)
+        sys.exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, "portfolio_report.pdf")
+    generate_portfolio_report(weights, output_path, with_committee=args.committee)
+    print(f"Portfolio packet written to {output_path}")
+
+    if args.trace:
+        print_stage_summary(summarize_trace(args.trace))
 
 
 def main():
-    args = sys.argv[1:]
+    if sys.argv[1:2] == ["analytics"]:
+        run_analytics(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(usage=USAGE)
+    parser.add_argument("pairs", nargs="*")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for data fetches and LLM calls.")
+    parser.add_argument("--render-workers", type=int, default=None, help="Processes for charts and PDF assembly.")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-ticker timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--trace", metavar="FILE", help="Write per-stage spans as JSON lines and print a stage summary.")
+    parser.add_argument("--profile", metavar="STAGES", help="Comma-separated stages to run under cProfile/tracemalloc.")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="Treat pairs as ticker/weight and write one consolidated portfolio packet.")
+    parser.add_argument("--committee", action="store_true",
+                        help="With --portfolio, add each holding's committee memo to its appendix.")
+    parser.add_argument("--no-sessions", action="store_true",
+                        help="Do not record committee runs in the session store.")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Do not add batch results to the result archive.")
+    args = parser.parse_args()
 
-    if len(args) % 2 != 0:
-        print("Usage: python cli.py <TICKER> <LABEL> [<TICKER> <LABEL> ...]")
+    if not args.pairs or len(args.pairs) % 2 != 0:
+        print(USAGE)
         sys.exit(1)
 
-    companies = [(args[i], args[i+1]) for i in range(0, len(args), 2)]
+    companies = [(args.pairs[i], args.pairs[i+1]) for i in range(0, len(args.pairs), 2)]
+
+    # Set before the pools start so render processes trace to the same file.
+    if args.trace:
+        open(args.trace, "w").close()
+        os.environ["FINANCE_TRACE_FILE"] = args.trace
+    if args.profile:
+        os.environ["FINANCE_PROFILE_STAGES"] = args.profile
+    if args.no_sessions:
+        from agents.session_store import set_session_store
+
+        set_session_store(None)
+    if args.no_archive:
+        from core.archive import set_result_archive
+
+        set_result_archive(None)
+
+    if args.portfolio:
+        run_portfolio(companies, args)
+        return
 
-    run(companies)
+    options = {
+        "output_dir": args.output_dir,
+        "io_workers": args.workers,
+        "timeout": args.timeout,
+        "retries": args.retries,
+    }
+    if args.render_workers:
+        options["render_workers"] = args.render_workers
+
+    from run_report import run
+
+    manifest = run(companies, **options)
+
+    for report in manifest["reports"]:
+        detail = report["output_path"] if report["status"] == "ok" else report["error"]
+        print(f"{report['ticker']:<8} {report['status']:<8} {detail}")
+
+    print(f"{manifest['succeeded']} succeeded, {manifest['failed']} failed in {manifest['wall_seconds']}s")
+
+    if args.trace:
+        print_stage_summary(summarize_trace(args.trace))
+
+    if manifest["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
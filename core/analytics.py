@@ -1,38 +1,41 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from core.context import AnalysisContext
+from core.data import get_price_cache
+from core.kernels import KERNEL_BACKEND, below_ma_streak, close_stats, percentile_of_last, rolling_volatility
+from core.tracing import span
 
-def fetch_history(ticker: str, period="5y") -> pd.DataFrame:
-    stock = yf.Ticker(ticker)
-    hist = stock.history(period=period)
 
-    if hist.empty:
-        return pd.DataFrame()
+DEFAULT_PERIOD = "5y"
+
+# Rolling volatility window ranked for the volatility percentile.
+VOLATILITY_PERCENTILE_WINDOW = 60
+
+# Moving average a downtrend is measured against.
+TREND_MA_WINDOW = 200
+
 
-    hist = hist.reset_index()
-    hist.rename(columns=str.lower, inplace=True)
-    return hist
+def fetch_history(ticker: str, period=DEFAULT_PERIOD, refresh: bool = False, interval: str = "1d") -> pd.DataFrame:
+    if interval != "1d":
+        from core.intraday import get_intraday_store
 
+        return get_intraday_store().history(ticker, interval, period=period, refresh=refresh)
+    return get_price_cache().get(ticker, period=period, refresh=refresh)
 
-def calculate_volatility_percentile(returns: pd.Series) -> float:
-    rolling_vol = returns.rolling(60).std() * np.sqrt(252)
-    current_vol = rolling_vol.iloc[-1]
-    percentile = (rolling_vol.rank(pct=True).iloc[-1]) * 100
-    return round(float(percentile), 2)
 
+def calculate_volatility_percentile(returns: pd.Series, rolling_vol: pd.Series = None,
+                                    window: int = VOLATILITY_PERCENTILE_WINDOW) -> float:
+    if rolling_vol is None:
+        rolling_vol = rolling_volatility(returns, window)
+    return round(percentile_of_last(rolling_vol), 2)
 
-def calculate_downtrend_duration(hist: pd.DataFrame) -> int:
-    ma200 = hist["close"].rolling(200).mean()
-    below_ma = hist["close"] < ma200
 
-    duration = 0
-    for val in reversed(below_ma.tolist()):
-        if val:
-            duration += 1
-        else:
-            break
-    return duration
+def calculate_downtrend_duration(hist: pd.DataFrame, ma200: pd.Series = None, window: int = TREND_MA_WINDOW) -> int:
+    if ma200 is None:
+        return below_ma_streak(hist["close"], window)
+    below_ma = (hist["close"] < ma200).to_numpy()
+    return len(below_ma) if below_ma.all() else int(np.argmax(~below_ma[::-1]))
 
 
 def estimate_recovery_probability(trend: str, drawdown: float, vol_percentile: float) -> float:
@@ -97,9 +100,15 @@ def classify_risk_regime(summary: dict) -> dict:
     }
 
 
-def build_analysis_summary(ticker: str) -> dict:
+def build_analysis_summary(ticker: str, context: AnalysisContext = None) -> dict:
 
-    hist = fetch_history(ticker)
+    if context is None:
+        context = AnalysisContext.load(ticker)
+
+    if context.summary is not None:
+        return context.summary
+
+    hist = context.hist
 
     if hist.empty:
         return {
@@ -108,14 +117,21 @@ def build_analysis_summary(ticker: str) -> dict:
             "message": "No historical market data available for this ticker.",
         }
 
-    returns = hist["close"].pct_change().dropna()
-    volatility = returns.std() * np.sqrt(252)
-    trend = "upward" if hist["close"].iloc[-1] > hist["close"].iloc[0] else "downward"
-    drawdown = (hist["close"] / hist["close"].cummax() - 1).min()
+    rows = len(hist)
+
+    # Volatility, drawdown, volatility percentile and downtrend in one fused kernel.
+    with span("analytics.kernel", rows=rows, backend=KERNEL_BACKEND):
+        close = context.close.to_numpy(dtype=np.float64)
+        stats = close_stats(close, VOLATILITY_PERCENTILE_WINDOW, TREND_MA_WINDOW)
+        trend = "upward" if close[-1] > close[0] else "downward"
+
+    volatility = stats["volatility"]
+    drawdown = stats["max_drawdown"]
+    vol_percentile = round(stats["volatility_percentile"], 2)
+    downtrend_days = stats["downtrend_days"]
 
-    vol_percentile = calculate_volatility_percentile(returns)
-    downtrend_days = calculate_downtrend_duration(hist)
-    recovery_prob = estimate_recovery_probability(trend, drawdown * 100, vol_percentile)
+    with span("analytics.recovery_probability"):
+        recovery_prob = estimate_recovery_probability(trend, drawdown * 100, vol_percentile)
 
     summary = {
         "ticker": ticker,
@@ -127,11 +143,13 @@ def build_analysis_summary(ticker: str) -> dict:
         "max_drawdown_pct": round(float(drawdown * 100), 2),
         "downtrend_days": downtrend_days,
         "recovery_probability_pct": recovery_prob,
-        "observations": len(hist),
+        "observations": rows,
     }
 
-    regime_data = classify_risk_regime(summary)
-    summary.update(regime_data)
-    summary["position_size_suggestion"] = suggest_position_size(regime_data["regime"])
+    with span("analytics.regime_classification"):
+        regime_data = classify_risk_regime(summary)
+        summary.update(regime_data)
+        summary["position_size_suggestion"] = suggest_position_size(regime_data["regime"])
 
+    context.summary = summary
     return summary
@@ -0,0 +1,429 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from core.analytics import TREND_MA_WINDOW, VOLATILITY_PERCENTILE_WINDOW
+from core.context import AnalysisContext
+from core.data import temp_path
+from core.tracing import span
+
+
+# Empty or "off" disables the default archive.
+DEFAULT_ARCHIVE_DIR = os.environ.get("FINANCE_ARCHIVE_DIR", os.path.join(".cache", "archive"))
+
+# Bumped when a change to either schema cannot be read as nulls by older code.
+ARCHIVE_VERSION = 1
+
+MANIFEST_NAME = "archive.json"
+
+# Times a read re-lists its parts when compaction deletes one mid-read.
+READ_ATTEMPTS = 3
+
+RUN_SCHEMA = pa.schema([
+    ("run_id", pa.string()),
+    ("ticker", pa.string()),
+    ("label", pa.string()),
+    ("archived_at", pa.timestamp("ms", tz="UTC")),
+    ("as_of", pa.date32()),
+    ("time_period", pa.string()),
+    ("regime", pa.string()),
+    ("risk_score", pa.int64()),
+    ("trend", pa.string()),
+    ("annualized_volatility", pa.float64()),
+    ("volatility_percentile", pa.float64()),
+    ("max_drawdown_pct", pa.float64()),
+    ("downtrend_days", pa.int64()),
+    ("recovery_probability_pct", pa.float64()),
+    ("observations", pa.int64()),
+    ("position_size_suggestion", pa.string()),
+    ("consistency_score", pa.float64()),
+    ("fabricated_numbers_detected", pa.bool_()),
+    ("regime_conflict", pa.bool_()),
+    ("allocation_conflict", pa.bool_()),
+    ("validation_notes", pa.list_(pa.string())),
+    ("runtime_seconds", pa.float64()),
+    ("time_to_first_token_seconds", pa.float64()),
+    ("narrative_cache", pa.string()),
+    ("input_tokens", pa.int64()),
+    ("output_tokens", pa.int64()),
+    ("narrative_chars", pa.int64()),
+    ("narrative", pa.string()),
+], metadata={"archive_version": str(ARCHIVE_VERSION)})
+
+# The memo and notes are the only wide columns; scans skip them unless asked.
+TEXT_COLUMNS = ("validation_notes", "narrative")
+METRIC_COLUMNS = [name for name in RUN_SCHEMA.names if name not in TEXT_COLUMNS]
+
+SUMMARY_COLUMNS = ["time_period", "regime", "risk_score", "trend", "annualized_volatility",
+                   "volatility_percentile", "max_drawdown_pct", "downtrend_days",
+                   "recovery_probability_pct", "observations", "position_size_suggestion"]
+VALIDATION_COLUMNS = ["fabricated_numbers_detected", "regime_conflict", "allocation_conflict"]
+
+MA_COLUMN = f"ma_{TREND_MA_WINDOW}"
+VOLATILITY_COLUMN = f"volatility_{VOLATILITY_PERCENTILE_WINDOW}d"
+
+# Per-day series behind each summary, stored uncompressed so reads map the file.
+SERIES_SCHEMA = pa.schema([
+    ("run_id", pa.string()),
+    ("ticker", pa.string()),
+    ("date", pa.date32()),
+    ("close", pa.float64()),
+    ("return", pa.float64()),
+    ("drawdown", pa.float64()),
+    (MA_COLUMN, pa.float64()),
+    (VOLATILITY_COLUMN, pa.float64()),
+], metadata={"archive_version": str(ARCHIVE_VERSION)})
+
+
+# -----------------------------------
+# Row Builders
+# -----------------------------------
+def _run_row(run_id: str, ticker: str, label: str, archived_at: float, result: dict) -> dict:
+    summary = result.get("analysis_summary", {})
+    validation = result.get("validation") or {}
+    observability = result.get("observability", {})
+    tokens = observability.get("token_usage", {})
+    narrative = result.get("agent_narrative")
+    period = summary.get("time_period")
+
+    row = {
+        "run_id": run_id,
+        "ticker": ticker,
+        "label": label,
+        "archived_at": pd.Timestamp(archived_at, unit="s", tz="UTC"),
+        "as_of": pd.Timestamp(period.split(" to ")[-1]).date() if period else None,
+        "consistency_score": result.get("consistency_score"),
+        "validation_notes": validation.get("validation_notes"),
+        "runtime_seconds": observability.get("runtime_seconds"),
+        "time_to_first_token_seconds": observability.get("time_to_first_token_seconds"),
+        "narrative_cache": observability.get("narrative_cache"),
+        "input_tokens": tokens.get("input_tokens"),
+        "output_tokens": tokens.get("output_tokens"),
+        "narrative_chars": len(narrative) if narrative is not None else None,
+        "narrative": narrative,
+    }
+    row.update({column: summary.get(column) for column in SUMMARY_COLUMNS})
+    row.update({column: validation.get(column) for column in VALIDATION_COLUMNS})
+    return row
+
+
+def _series_table(run_id: str, ticker: str, context: AnalysisContext) -> pa.Table:
+    n = len(context.hist)
+    dates = pd.to_datetime(context.dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+
+    return pa.Table.from_pydict({
+        "run_id": pa.array([run_id] * n, pa.string()),
+        "ticker": pa.array([ticker] * n, pa.string()),
+        "date": pa.array(dates.to_numpy(dtype="datetime64[D]"), pa.date32()),
+        "close": context.close.to_numpy(dtype=np.float64),
+        "return": context.returns.to_numpy(dtype=np.float64),
+        "drawdown": context.drawdown.to_numpy(dtype=np.float64),
+        MA_COLUMN: context.moving_average(TREND_MA_WINDOW).to_numpy(dtype=np.float64),
+        VOLATILITY_COLUMN: context.rolling_volatility(VOLATILITY_PERCENTILE_WINDOW).to_numpy(dtype=np.float64),
+    }, schema=SERIES_SCHEMA)
+
+
+def _write_atomic(path: Path, write):
+    # Write-then-rename so scans never see a partial part.
+    tmp = temp_path(path)
+    try:
+        write(str(tmp))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+# -----------------------------------
+# Archive
+# -----------------------------------
+class ResultArchive:
+    """
+    Append-only store of committee results for audit and monitoring.
+
+    Each append writes one part per table: a Parquet file with a row of
+    summary, validation and observability metrics per run, and an
+    uncompressed Arrow IPC file with the per-day series each summary was
+    computed from. Parts are never rewritten, so concurrent readers
+    always see whole batches. compact() merges parts into a new one and
+    records in the manifest which parts it replaces before the merged
+    part appears, so a read never counts a row twice. Metric scans read
+    only the columns asked for; series reads memory-map their parts.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR):
+        self.root = Path(root)
+        self.runs_dir = self.root / "runs"
+        self.series_dir = self.root / "series"
+        self._lock = threading.Lock()
+
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.series_dir.mkdir(parents=True, exist_ok=True)
+
+        self.manifest_path = self.root / MANIFEST_NAME
+        if self.manifest_path.exists():
+            version = self._manifest().get("version")
+            if version != ARCHIVE_VERSION:
+                raise ValueError(f"archive at {self.root} is version {version}; "
+                                 f"this code reads version {ARCHIVE_VERSION}")
+        else:
+            self._save_manifest({"version": ARCHIVE_VERSION})
+
+    def _part_name(self) -> str:
+        return f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+
+    def _manifest(self) -> dict:
+        return json.loads(self.manifest_path.read_text())
+
+    def _save_manifest(self, manifest: dict):
+        _write_atomic(self.manifest_path, lambda tmp: Path(tmp).write_text(json.dumps(manifest)))
+
+    def _parts(self, directory: Path, suffix: str) -> list:
+        """
+        The parts a read should use: every part on disk except those
+        replaced by a merged part that is also on disk. The directory is
+        listed before the manifest is read, and compaction records a
+        merge before writing the merged part, so whenever the listing
+        holds a merged part the manifest read says what it replaces.
+        """
+        parts = sorted(directory.glob(f"part-*{suffix}"))
+        present = {f"{directory.name}/{part.name}" for part in parts}
+        replaced = {
+            source
+            for merged, sources in self._manifest().get("compacted", {}).items() if merged in present
+            for source in sources
+        }
+        return [part for part in parts if f"{directory.name}/{part.name}" not in replaced]
+
+    # -----------------------------------
+    # Writes
+    # -----------------------------------
+    def append(self, records) -> list:
+        """
+        Archives a batch of runs in one part per table. `records` are
+        (ticker, label, result, context) tuples, where result is a
+        run_financial_intelligence result and context an AnalysisContext
+        or history frame (None skips the series). Returns the run ids.
+        """
+        records = list(records)
+        if not records:
+            return []
+
+        archived_at = time.time()
+        run_ids = [uuid.uuid4().hex for _ in records]
+
+        with span("archive.append", runs=len(records)) as stage:
+            rows = [_run_row(run_id, ticker, label, archived_at, result)
+                    for run_id, (ticker, label, result, _) in zip(run_ids, records)]
+            runs = pa.Table.from_pylist(rows, schema=RUN_SCHEMA)
+
+            contexts = [(run_id, ticker, AnalysisContext.coerce(context, ticker))
+                        for run_id, (ticker, _, _, context) in zip(run_ids, records) if context is not None]
+            series = [_series_table(run_id, ticker, context) for run_id, ticker, context in contexts
+                      if not context.empty]
+
+            name = self._part_name()
+            with self._lock:
+                _write_atomic(self.runs_dir / f"{name}.parquet",
+                              lambda tmp: pq.write_table(runs, tmp, compression="zstd"))
+                if series:
+                    _write_atomic(self.series_dir / f"{name}.arrow",
+                                  lambda tmp: _write_ipc(pa.concat_tables(series), tmp))
+
+            stage.set(rows=sum(len(table) for table in series))
+
+        return run_ids
+
+    def compact(self) -> dict:
+        """
+        Merges every part of each table into one; returns the part
+        counts merged. The merge is recorded in the manifest first,
+        then the merged part is written and the old parts are deleted.
+        """
+        with self._lock, span("archive.compact") as stage:
+            manifest = self._manifest()
+            compacted = self._finish_compactions(manifest.get("compacted", {}))
+            if compacted != manifest.get("compacted", {}):
+                self._save_manifest({**manifest, "compacted": compacted})
+
+            merged = {}
+            name = self._part_name()
+            for directory, suffix, read, write in (
+                (self.runs_dir, ".parquet", pq.read_table,
+                 lambda table, tmp: pq.write_table(table, tmp, compression="zstd")),
+                (self.series_dir, ".arrow", _read_ipc, _write_ipc),
+            ):
+                parts = self._parts(directory, suffix)
+                merged[directory.name] = len(parts)
+                if len(parts) < 2:
+                    continue
+                table = pa.concat_tables([read(str(part)) for part in parts], promote_options="default")
+
+                target = directory / f"{name}{suffix}"
+                compacted[f"{directory.name}/{target.name}"] = [f"{directory.name}/{part.name}" for part in parts]
+                self._save_manifest({**manifest, "compacted": compacted})
+                _write_atomic(target, lambda tmp: write(table, tmp))
+                for part in parts:
+                    part.unlink()
+            stage.set(**merged)
+        return merged
+
+    def _finish_compactions(self, compacted: dict) -> dict:
+        """
+        Deletes parts left behind by an interrupted compaction and keeps
+        only the merges whose old parts are still on disk.
+        """
+        remaining = {}
+        for merged, sources in compacted.items():
+            if (self.root / merged).exists():
+                for source in sources:
+                    (self.root / source).unlink(missing_ok=True)
+            else:
+                sources = [source for source in sources if (self.root / source).exists()]
+                if sources:
+                    remaining[merged] = sources
+        return remaining
+
+    # -----------------------------------
+    # Reads
+    # -----------------------------------
+    def runs(self, columns=None, tickers=None, since=None) -> pd.DataFrame:
+        """
+        Archived runs, oldest first. Reads METRIC_COLUMNS unless
+        `columns` are given; `tickers` and `since` (anything
+        pd.Timestamp accepts, UTC) are pushed down into the scan.
+        """
+        columns = list(columns or METRIC_COLUMNS)
+        condition = None
+        if tickers is not None:
+            condition = ds.field("ticker").isin(list(tickers))
+        if since is not None:
+            since = pd.Timestamp(since)
+            since = since.tz_localize("UTC") if since.tzinfo is None else since.tz_convert("UTC")
+            after = ds.field("archived_at") >= pa.scalar(since, RUN_SCHEMA.field("archived_at").type)
+            condition = after if condition is None else condition & after
+
+        with span("archive.scan", table="runs") as stage:
+            table = _read_parts(lambda: self._scan_runs(columns, condition))
+            stage.set(rows=table.num_rows, bytes=table.nbytes)
+
+        frame = table.to_pandas(date_as_object=False)
+        if "archived_at" in frame:
+            frame = frame.sort_values("archived_at", kind="stable").reset_index(drop=True)
+        return frame
+
+    def _scan_runs(self, columns: list, condition) -> pa.Table:
+        parts = self._parts(self.runs_dir, ".parquet")
+        if not parts:
+            return RUN_SCHEMA.empty_table().select(columns)
+        # The current schema reads older parts, with added columns as nulls.
+        dataset = ds.dataset([str(part) for part in parts], schema=RUN_SCHEMA, format="parquet")
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def series(self, tickers=None, run_ids=None) -> pd.DataFrame:
+        """Per-day series for the given tickers or runs (all by default), read through memory maps."""
+        with span("archive.scan", table="series") as stage:
+            tables = _read_parts(lambda: self._scan_series(tickers, run_ids))
+            table = pa.concat_tables(tables) if tables else SERIES_SCHEMA.empty_table()
+            stage.set(parts=len(tables), rows=table.num_rows)
+        return table.to_pandas(date_as_object=False)
+
+    def _scan_series(self, tickers, run_ids) -> list:
+        tables = []
+        for part in self._parts(self.series_dir, ".arrow"):
+            table = _read_ipc(str(part))
+            if tickers is not None:
+                table = table.filter(pc.is_in(table["ticker"], pa.array(list(tickers), pa.string())))
+            if run_ids is not None:
+                table = table.filter(pc.is_in(table["run_id"], pa.array(list(run_ids), pa.string())))
+            if table.num_rows:
+                tables.append(table)
+        return tables
+
+    def latest(self, tickers=None, columns=None) -> pd.DataFrame:
+        """The most recent archived run per ticker."""
+        runs = self.runs(columns=columns, tickers=tickers)
+        return runs.drop_duplicates("ticker", keep="last").reset_index(drop=True)
+
+
+def _write_ipc(table: pa.Table, path: str):
+    with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_parts(scan):
+    """Runs `scan`, listing the parts again if compaction deleted one before it was opened."""
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            return scan()
+        except FileNotFoundError:
+            if attempt == READ_ATTEMPTS - 1:
+                raise
+
+
+def _read_ipc(path: str) -> pa.Table:
+    # Uncompressed buffers are used in place: only the pages touched are read.
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+# -----------------------------------
+# Query Helpers
+# -----------------------------------
+def regime_transitions(runs: pd.DataFrame) -> pd.DataFrame:
+    """Runs whose regime differs from the same ticker's previous run, with the regime before."""
+    runs = runs.sort_values(["ticker", "archived_at"], kind="stable")
+    previous = runs.groupby("ticker")["regime"].shift()
+    changed = runs.assign(previous_regime=previous)[previous.notna() & (previous != runs["regime"])]
+    return changed.reset_index(drop=True)
+
+
+def compare_runs(runs: pd.DataFrame, by: str = "regime") -> pd.DataFrame:
+    """Run counts, consistency, runtime and token usage grouped by a column (regime by default)."""
+    grouped = runs.groupby(by, dropna=False)
+    return pd.DataFrame({
+        "runs": grouped.size(),
+        "tickers": grouped["ticker"].nunique(),
+        "mean_consistency": grouped["consistency_score"].mean().round(3),
+        "min_consistency": grouped["consistency_score"].min(),
+        "p50_runtime_seconds": grouped["runtime_seconds"].median().round(3),
+        "p95_runtime_seconds": grouped["runtime_seconds"].quantile(0.95).round(3),
+        "mean_output_tokens": grouped["output_tokens"].mean().round(1),
+        "cache_hit_rate": grouped["narrative_cache"].apply(lambda s: round(float((s == "hit").mean()), 3)),
+    })
+
+
+_UNSET = object()
+_default_archive = _UNSET
+_default_lock = threading.Lock()
+
+
+def get_result_archive():
+    """
+    The shared archive, opened on first use from FINANCE_ARCHIVE_DIR.
+    Returns None when archiving is disabled.
+    """
+    global _default_archive
+    with _default_lock:
+        if _default_archive is _UNSET:
+            disabled = DEFAULT_ARCHIVE_DIR.strip().lower() in ("", "off", "none")
+            _default_archive = None if disabled else ResultArchive(DEFAULT_ARCHIVE_DIR)
+        return _default_archive
+
+
+def set_result_archive(archive):
+    """Installs the shared archive; None disables archiving."""
+    global _default_archive
+    with _default_lock:
+        _default_archive = archive
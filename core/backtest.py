@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+from core.screening import (
+    classify_regimes,
+    estimate_recovery_probabilities,
+    pack_to_bottom,
+    score_risk,
+)
+
+
+# Midpoints of the suggest_position_size bands.
+POSITION_SIZE_WEIGHTS = {
+    "CONSTRUCTIVE": 0.04,
+    "CAUTION": 0.02,
+    "DEFENSIVE": 0.0,
+    "NO_DATA": 0.0,
+}
+
+
+# -----------------------------------
+# Point-in-time Helpers
+# -----------------------------------
+def _unpack(packed_result: np.ndarray, order: np.ndarray) -> np.ndarray:
+    out = np.empty_like(packed_result)
+    np.put_along_axis(out, order, packed_result, axis=0)
+    return out
+
+
+def _streak(mask: np.ndarray) -> np.ndarray:
+    """Length of the run of True ending at each row, per column."""
+    counts = np.cumsum(mask, axis=0)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=0)
+    return counts - resets
+
+
+def _rolling_max_drawdown(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    Exact peak-to-trough drawdown inside each trailing window, per column.
+
+    Drawdown merges across adjacent segments from (peak, low, drawdown),
+    so rows are cut into window-sized blocks and every window is one
+    block suffix joined with the next block's prefix (van Herk /
+    Gil-Werman). Each value is the same close_k / close_i - 1 ratio a
+    direct scan picks, in O(rows) per column.
+    """
+    n_rows, n_cols = close.shape
+    total = n_rows + window - 1
+    n_blocks = -(-total // window)
+    padded = np.full((n_blocks * window, n_cols), np.nan)
+    padded[window - 1:total] = close
+    blocks = padded.reshape(n_blocks, window, n_cols)
+
+    with np.errstate(invalid="ignore"):
+        prefix_low = np.fmin.accumulate(blocks, axis=1)
+        prefix_drawdown = np.fmin.accumulate(blocks / np.fmax.accumulate(blocks, axis=1) - 1, axis=1)
+
+        backwards = blocks[:, ::-1]
+        suffix_peak = np.fmax.accumulate(backwards, axis=1)[:, ::-1]
+        suffix_drawdown = np.fmin.accumulate(
+            np.fmin.accumulate(backwards, axis=1) / backwards - 1, axis=1
+        )[:, ::-1]
+
+    prefix_low = prefix_low.reshape(-1, n_cols)
+    prefix_drawdown = prefix_drawdown.reshape(-1, n_cols)
+    suffix_peak = suffix_peak.reshape(-1, n_cols)
+    suffix_drawdown = suffix_drawdown.reshape(-1, n_cols)
+
+    starts = np.arange(n_rows)
+    ends = starts + window - 1
+    with np.errstate(invalid="ignore"):
+        across = prefix_low[ends] / suffix_peak[starts] - 1
+        merged = np.fmin(np.fmin(suffix_drawdown[starts], prefix_drawdown[ends]), across)
+
+    # A window starting on a block boundary is that whole block.
+    aligned = (starts % window == 0)[:, None]
+    return np.where(aligned, prefix_drawdown[ends], merged)
+
+
+# -----------------------------------
+# Regime Time Series
+# -----------------------------------
+def regime_time_series(prices: pd.DataFrame, lookback: int = None) -> dict:
+    """
+    Daily trend, volatility, drawdown, volatility percentile, downtrend
+    duration, recovery probability, risk score and regime for every
+    ticker in a dates x tickers close matrix.
+
+    Every value on day t uses only bars up to t. With `lookback=None` each
+    day is classified on all history so far; otherwise on the trailing
+    `lookback` bars (e.g. 1260 for the 5y summary window), matching what
+    build_analysis_summary would report on that window alone.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    n_rows = values.shape[0]
+    valid = ~np.isnan(values)
+    order = np.argsort(valid, axis=0, kind="stable")
+    packed, counts = pack_to_bottom(values)
+    first_row = n_rows - counts
+
+    returns = np.full_like(packed, np.nan)
+    returns[1:] = packed[1:] / packed[:-1] - 1
+    returns_frame = pd.DataFrame(returns)
+    close_frame = pd.DataFrame(packed)
+
+    first = packed[np.minimum(first_row, n_rows - 1), np.arange(packed.shape[1])]
+
+    if lookback is None:
+        upward = packed > first
+        volatility = returns_frame.expanding(min_periods=2).std().to_numpy()
+        with np.errstate(invalid="ignore"):
+            drawdown = np.fmin.accumulate(packed / np.fmax.accumulate(packed, axis=0) - 1, axis=0)
+    else:
+        start_close = close_frame.shift(lookback - 1).to_numpy()
+        start_close = np.where(np.isnan(start_close), first, start_close)
+        upward = packed > start_close
+        volatility = returns_frame.rolling(lookback - 1, min_periods=2).std().to_numpy()
+        drawdown = _rolling_max_drawdown(packed, lookback)
+
+    volatility = volatility * np.sqrt(252)
+
+    rolling_vol = returns_frame.rolling(60).std() * np.sqrt(252)
+    if lookback is None:
+        vol_rank = rolling_vol.expanding().rank(pct=True)
+    else:
+        # Inside a trailing window only the last lookback - 60 rolling vols exist.
+        vol_rank = rolling_vol.rolling(max(lookback - 60, 1), min_periods=1).rank(pct=True)
+    vol_percentile = np.round(vol_rank.to_numpy() * 100, 2)
+
+    ma200 = close_frame.rolling(200).mean().to_numpy()
+    downtrend_days = _streak(packed < ma200)
+    if lookback is not None:
+        # A window's own 200-day MA only exists for its last lookback - 199 bars.
+        downtrend_days = np.minimum(downtrend_days, max(lookback - 199, 0))
+
+    annualized_volatility = np.round(volatility, 3)
+    max_drawdown_pct = np.round(drawdown * 100, 2)
+
+    risk_score = score_risk(~upward, annualized_volatility, max_drawdown_pct)
+    regime = classify_regimes(risk_score).astype(object)
+    recovery = estimate_recovery_probabilities(upward, drawdown * 100, vol_percentile)
+
+    has_data = np.isfinite(packed) & np.isfinite(volatility)
+    regime = np.where(has_data, regime, "NO_DATA")
+
+    index, columns = prices.index, prices.columns
+
+    def frame(packed_values, dtype=None):
+        unpacked = _unpack(np.asarray(packed_values, dtype=dtype), order)
+        return pd.DataFrame(unpacked, index=index, columns=columns)
+
+    mask = frame(has_data, bool)
+
+    return {
+        "trend": frame(np.where(upward, "upward", "downward"), object).where(mask),
+        "annualized_volatility": frame(annualized_volatility, float).where(mask),
+        "max_drawdown_pct": frame(max_drawdown_pct, float).where(mask),
+        "volatility_percentile": frame(vol_percentile, float).where(mask),
+        "downtrend_days": frame(downtrend_days, float).where(mask),
+        "recovery_probability_pct": frame(recovery, float).where(mask),
+        "risk_score": frame(risk_score, float).where(mask),
+        "regime": frame(regime, object),
+    }
+
+
+# -----------------------------------
+# Allocation Backtest
+# -----------------------------------
+def backtest_regimes(prices: pd.DataFrame, lookback: int = None, weights: dict = None) -> dict:
+    """
+    Turns the daily regime into position weights and P&L.
+
+    The weight set from day t's close is held over day t+1, so no trade
+    uses information from the day it earns on. A ticker with no bar on a
+    day (a holiday on its exchange, a halt) keeps its last price and
+    weight, so the return spanning the gap is earned on its next bar.
+    """
+    weights = weights or POSITION_SIZE_WEIGHTS
+    series = regime_time_series(prices, lookback=lookback)
+
+    has_bar = prices.notna()
+    listed = has_bar.cummax() & has_bar[::-1].cummax()[::-1]
+
+    allocation = series["regime"].apply(lambda col: col.map(weights)).astype(float)
+    allocation = allocation.where(has_bar).ffill().where(listed).fillna(0.0)
+    asset_returns = prices.ffill().where(listed).pct_change(fill_method=None).fillna(0.0)
+
+    pnl = allocation.shift(1).fillna(0.0) * asset_returns
+    equity = (1 + pnl).cumprod()
+
+    portfolio_pnl = pnl.sum(axis=1)
+    portfolio = pd.DataFrame({
+        "gross_exposure": allocation.sum(axis=1),
+        "pnl": portfolio_pnl,
+        "equity": (1 + portfolio_pnl).cumprod(),
+    })
+
+    regime_share = {
+        regime: (series["regime"] == regime).mean()
+        for regime in ["CONSTRUCTIVE", "CAUTION", "DEFENSIVE"]
+    }
+
+    stats = pd.DataFrame({
+        "total_return": equity.iloc[-1] - 1,
+        "annualized_volatility": pnl.std() * np.sqrt(252),
+        "max_drawdown": (equity / equity.cummax() - 1).min(),
+        "turnover": allocation.diff().abs().sum(),
+        **{f"share_{regime.lower()}": share for regime, share in regime_share.items()},
+    })
+
+    return {
+        "series": series,
+        "weights": allocation,
+        "pnl": pnl,
+        "equity": equity,
+        "portfolio": portfolio,
+        "stats": stats,
+    }
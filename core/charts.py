@@ -1,75 +1,356 @@
-import matplotlib.pyplot as plt
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import DateFormatter, YearLocator, date2num
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from PIL import Image
+
+from core.context import AnalysisContext
+from core.tracing import span
+
+
+DEFAULT_MAX_POINTS = 1500
+DEFAULT_DPI = 100
+
+# Windows drawn on the standard charts.
+PRICE_MA_WINDOWS = (50, 200)
+VOLATILITY_CHART_WINDOW = 30
+
+_figures = threading.local()
+
+
+# -----------------------------------
+# Rendering Helpers
+# -----------------------------------
+def _figure(figsize) -> Figure:
+    """
+    Returns a cleared, reusable Agg figure for this thread.
+    Avoids pyplot's global state and the cost of building a new figure
+    and canvas for every chart.
+    """
+    cache = getattr(_figures, "by_size", None)
+    if cache is None:
+        cache = _figures.by_size = {}
+
+    fig = cache.get(figsize)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        cache[figsize] = fig
+    else:
+        fig.clear()
+    return fig
+
+
+def figure_to_png(fig: Figure, dpi: int = DEFAULT_DPI) -> bytes:
+    """
+    Encodes the figure as an opaque RGB PNG. Dropping the alpha channel
+    lets the report writer embed the compressed data without decoding it.
+    """
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    image = Image.frombuffer("RGBA", fig.canvas.get_width_height(), fig.canvas.buffer_rgba()).convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format="png", compress_level=6)
+    return buffer.getvalue()
+
+
+def decimate(values, max_points: int = DEFAULT_MAX_POINTS) -> np.ndarray:
+    """
+    Indices of a min/max-per-bucket subsample of `values`.
+
+    Keeping both extremes of every bucket preserves the visual envelope
+    of a long series (peaks, troughs, drawdown lows) with a fraction of
+    the points.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = values
+    rows = padded.reshape(buckets, size)
+
+    starts = np.arange(buckets) * size
+    lows = starts + np.argmin(np.where(np.isnan(rows), np.inf, rows), axis=1)
+    highs = starts + np.argmax(np.where(np.isnan(rows), -np.inf, rows), axis=1)
+
+    keep = np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+    return keep[keep < n]
+
+
+def _label(ax, title, xlabel, ylabel):
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+
+# -----------------------------------
+# Chart Renderers
+# -----------------------------------
+def render_price_with_ma(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    ctx = AnalysisContext.coerce(ctx)
+    idx = decimate(ctx.close.to_numpy(), max_points)
+    dates = ctx.dates.to_numpy()[idx]
+
+    fig = _figure((10, 5))
+    ax = fig.add_subplot()
+    ax.plot(dates, ctx.close.to_numpy()[idx], label="Close")
+    for window in PRICE_MA_WINDOWS:
+        ax.plot(dates, ctx.moving_average(window).to_numpy()[idx], label=f"MA {window}")
+
+    _label(ax, "Price with Moving Averages", "Date", "Price")
+    ax.legend()
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def render_volume(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    ctx = AnalysisContext.coerce(ctx)
+    volume = ctx.volume.to_numpy()
+    idx = decimate(volume, max_points)
+
+    fig = _figure((10, 4))
+    ax = fig.add_subplot()
+    # One LineCollection instead of one Rectangle patch per bar.
+    ax.vlines(ctx.dates.to_numpy()[idx], 0, volume[idx])
+
+    _label(ax, "Trading Volume", "Date", "Volume")
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def render_rolling_volatility(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    ctx = AnalysisContext.coerce(ctx)
+    rolling_vol = ctx.rolling_volatility(VOLATILITY_CHART_WINDOW).to_numpy()
+    idx = decimate(rolling_vol, max_points)
+
+    fig = _figure((10, 4))
+    ax = fig.add_subplot()
+    ax.plot(ctx.dates.to_numpy()[idx], rolling_vol[idx])
+
+    _label(ax, f"{VOLATILITY_CHART_WINDOW}-Day Rolling Annualized Volatility", "Date", "Volatility")
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def render_drawdown(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    ctx = AnalysisContext.coerce(ctx)
+    drawdown = ctx.drawdown.to_numpy()
+    idx = decimate(drawdown, max_points)
+
+    fig = _figure((10, 4))
+    ax = fig.add_subplot()
+    ax.plot(ctx.dates.to_numpy()[idx], drawdown[idx])
+
+    _label(ax, "Drawdown Curve", "Date", "Drawdown")
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def render_returns_distribution(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    ctx = AnalysisContext.coerce(ctx)
+
+    # Binning uses every return; only the 50 bars are drawn.
+    counts, edges = np.histogram(ctx.daily_returns.to_numpy(), bins=50)
+
+    fig = _figure((8, 4))
+    ax = fig.add_subplot()
+    ax.stairs(counts, edges, fill=True)
+
+    _label(ax, "Daily Returns Distribution", "Daily Return", "Frequency")
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+CHART_RENDERERS = {
+    "price_ma": render_price_with_ma,
+    "volume": render_volume,
+    "volatility": render_rolling_volatility,
+    "drawdown": render_drawdown,
+    "returns_dist": render_returns_distribution,
+}
+
+
+def render_chart(ctx, name: str, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> bytes:
+    """Renders one of the CHART_RENDERERS into PNG bytes."""
+    ctx = AnalysisContext.coerce(ctx)
+    with span("chart.render", chart=name, ticker=ctx.ticker, rows=len(ctx.hist)) as stage:
+        png = CHART_RENDERERS[name](ctx, max_points, dpi)
+        stage.set(bytes=len(png))
+    return png
+
+
+def render_charts(ctx, max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> dict:
+    """Renders every report chart for one ticker into PNG bytes, in report order."""
+    ctx = AnalysisContext.coerce(ctx)
+    return {name: render_chart(ctx, name, max_points, dpi) for name in CHART_RENDERERS}
+
+
+# -----------------------------------
+# Portfolio Charts
+# -----------------------------------
+SMALL_MULTIPLE_POINTS = 300
+
+
+def render_small_multiples(contexts: dict, labels: dict = None, columns: int = 4, rows: int = 3,
+                           max_points: int = SMALL_MULTIPLE_POINTS, dpi: int = DEFAULT_DPI) -> list:
+    """
+    Price panels for many tickers, `columns` x `rows` per image, with
+    prices rebased to 100 and the 200-day average dashed. Returns one PNG
+    per page, so a whole book costs a few figures rather than a chart
+    set per ticker. `labels` adds a note to panel titles (e.g. regime).
+    """
+    labels = labels or {}
+    tickers = list(contexts)
+    per_page = columns * rows
+    pages = []
+
+    # The grid is built once and its lines are re-pointed for every page;
+    # creating axes and their ticks dominates the cost of a small panel.
+    fig = _figure((10, 2.5 * rows))
+    fig.subplots_adjust(left=0.05, right=0.98, bottom=0.06, top=0.94, wspace=0.25, hspace=0.45)
+    panels = []
+    for ax in fig.subplots(rows, columns, squeeze=False).ravel():
+        close_line, = ax.plot([], [], linewidth=0.8)
+        ma_line, = ax.plot([], [], linewidth=0.6, linestyle="--")
+        note = ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes, fontsize=7)
+        ax.tick_params(labelsize=6)
+        ax.xaxis.set_major_formatter(DateFormatter("%Y"))
+        ax.yaxis.set_major_locator(MaxNLocator(4))
+        panels.append((ax, close_line, ma_line, note))
+
+    for page_start in range(0, len(tickers), per_page):
+        page = tickers[page_start:page_start + per_page]
+
+        for i, (ax, close_line, ma_line, note) in enumerate(panels):
+            ax.set_visible(i < len(page))
+            if i >= len(page):
+                continue
+
+            ticker = page[i]
+            ctx = AnalysisContext.coerce(contexts[ticker], ticker)
+            ax.set_title(f"{ticker}  {labels[ticker]}" if ticker in labels else ticker, fontsize=8)
+            note.set_visible(ctx.empty)
+            if ctx.empty:
+                close_line.set_data([], [])
+                ma_line.set_data([], [])
+                ax.set_xticks([])
+                ax.set_yticks([])
+                continue
+
+            close = ctx.close.to_numpy()
+            idx = decimate(close, max_points)
+            dates = date2num(ctx.dates.to_numpy()[idx])
+            scale = 100 / close[0]
+            close_line.set_data(dates, close[idx] * scale)
+            ma_line.set_data(dates, ctx.ma_200.to_numpy()[idx] * scale)
+
+            ax.xaxis.set_major_locator(YearLocator(base=max(len(close) // 252 // 3, 1)))
+            ax.yaxis.set_major_locator(MaxNLocator(4))
+            ax.relim()
+            ax.autoscale_view()
+
+        pages.append(figure_to_png(fig, dpi))
+
+    return pages
+
+
+def render_correlation_heatmap(correlation, dpi: int = DEFAULT_DPI) -> bytes:
+    """Renders the correlation matrix as a PNG heatmap; pairs without enough overlap are grey."""
+    labels = list(correlation.columns)
+    fontsize = max(4, min(9, 300 // max(len(labels), 1)))
+
+    fig = _figure((8, 7))
+    ax = fig.add_subplot()
+    ax.set_facecolor("0.85")
+    image = ax.imshow(np.ma.masked_invalid(correlation.to_numpy(dtype=float)), cmap="RdBu_r", vmin=-1, vmax=1)
+    ax.set_xticks(range(len(labels)), labels, rotation=90, fontsize=fontsize)
+    ax.set_yticks(range(len(labels)), labels, fontsize=fontsize)
+    fig.colorbar(image, ax=ax, shrink=0.8)
+
+    ax.set_title("Daily Return Correlation")
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def render_portfolio_performance(nav, drawdown, max_points: int = DEFAULT_MAX_POINTS,
+                                 dpi: int = DEFAULT_DPI) -> bytes:
+    """Growth of 1 and drawdown of the weighted book."""
+    nav_values = nav.to_numpy()
+    idx = decimate(nav_values, max_points)
+    dates = nav.index.to_numpy()[idx]
+
+    fig = _figure((10, 6))
+    top, bottom = fig.subplots(2, 1, sharex=True, height_ratios=[2, 1])
+    top.plot(dates, nav_values[idx])
+    _label(top, "Portfolio Growth of 1", "", "Value")
+
+    dd_values = drawdown.to_numpy()
+    dd_idx = decimate(dd_values, max_points)
+    bottom.fill_between(drawdown.index.to_numpy()[dd_idx], dd_values[dd_idx], 0, alpha=0.6)
+    _label(bottom, "Portfolio Drawdown", "Date", "Drawdown")
+
+    fig.tight_layout()
+    return figure_to_png(fig, dpi)
+
+
+def _render_charts_worker(ticker, hist, max_points, dpi):
+    return ticker, render_charts(AnalysisContext(ticker, hist), max_points, dpi)
+
+
+def render_charts_many(histories: dict, max_workers: int = None,
+                       max_points: int = DEFAULT_MAX_POINTS, dpi: int = DEFAULT_DPI) -> dict:
+    """
+    Renders the chart set for many tickers across a process pool.
+    `histories` maps ticker to a history frame or AnalysisContext.
+    """
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_render_charts_worker, ticker, AnalysisContext.coerce(obj, ticker).hist, max_points, dpi)
+            for ticker, obj in histories.items()
+        ]
+        for future in futures:
+            ticker, charts = future.result()
+            results[ticker] = charts
+
+    return results
+
+
+# -----------------------------------
+# File Output
+# -----------------------------------
+def _write(png: bytes, output_path):
+    with open(output_path, "wb") as f:
+        f.write(png)
+
+
+def plot_price_with_ma(ctx, output_path):
+    _write(render_price_with_ma(ctx), output_path)
+
+
+def plot_volume(ctx, output_path):
+    _write(render_volume(ctx), output_path)
+
+
+def plot_rolling_volatility(ctx, output_path):
+    _write(render_rolling_volatility(ctx), output_path)
+
+
+def plot_drawdown(ctx, output_path):
+    _write(render_drawdown(ctx), output_path)
 
 
-def plot_price_with_ma(hist, output_path):
-    hist = hist.copy()
-    hist["ma_50"] = hist["close"].rolling(50).mean()
-    hist["ma_200"] = hist["close"].rolling(200).mean()
-
-    plt.figure(figsize=(10, 5))
-    plt.plot(hist["date"], hist["close"], label="Close")
-    plt.plot(hist["date"], hist["ma_50"], label="MA 50")
-    plt.plot(hist["date"], hist["ma_200"], label="MA 200")
-
-    plt.title("Price with Moving Averages")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-
-
-def plot_volume(hist, output_path):
-    plt.figure(figsize=(10, 4))
-    plt.bar(hist["date"], hist["volume"])
-    plt.title("Trading Volume")
-    plt.xlabel("Date")
-    plt.ylabel("Volume")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-
-
-def plot_rolling_volatility(hist, output_path):
-    hist = hist.copy()
-    returns = hist["close"].pct_change()
-    rolling_vol = returns.rolling(30).std() * np.sqrt(252)
-
-    plt.figure(figsize=(10, 4))
-    plt.plot(hist["date"], rolling_vol)
-    plt.title("30-Day Rolling Annualized Volatility")
-    plt.xlabel("Date")
-    plt.ylabel("Volatility")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-
-
-def plot_drawdown(hist, output_path):
-    hist = hist.copy()
-    cumulative_max = hist["close"].cummax()
-    drawdown = hist["close"] / cumulative_max - 1
-
-    plt.figure(figsize=(10, 4))
-    plt.plot(hist["date"], drawdown)
-    plt.title("Drawdown Curve")
-    plt.xlabel("Date")
-    plt.ylabel("Drawdown")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
-
-
-def plot_returns_distribution(hist, output_path):
-    returns = hist["close"].pct_change().dropna()
-
-    plt.figure(figsize=(8, 4))
-    plt.hist(returns, bins=50)
-    plt.title("Daily Returns Distribution")
-    plt.xlabel("Daily Return")
-    plt.ylabel("Frequency")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
+def plot_returns_distribution(ctx, output_path):
+    _write(render_returns_distribution(ctx), output_path)
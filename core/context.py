@@ -0,0 +1,83 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from core.data import get_price_cache
+
+
+class AnalysisContext:
+    """
+    One ticker's history plus lazily memoized derived series.
+
+    A single context is loaded per run and handed to the analytics,
+    the chart plotters, the agent orchestrator and the viewer, so the
+    history is fetched once and returns, moving averages, rolling
+    volatilities and drawdowns are each computed once.
+    """
+
+    def __init__(self, ticker: str, hist: pd.DataFrame):
+        self.ticker = ticker
+        self.hist = hist
+        self.summary = None
+        self._moving_averages = {}
+        self._rolling_volatility = {}
+
+    @classmethod
+    def load(cls, ticker: str, period: str = "5y", refresh: bool = False) -> "AnalysisContext":
+        return cls(ticker, get_price_cache().get(ticker, period=period, refresh=refresh))
+
+    @classmethod
+    def coerce(cls, obj, ticker: str = None) -> "AnalysisContext":
+        """Accepts either a context or a raw history frame."""
+        if isinstance(obj, cls):
+            return obj
+        return cls(ticker, obj)
+
+    @property
+    def empty(self) -> bool:
+        return self.hist.empty
+
+    @property
+    def dates(self) -> pd.Series:
+        return self.hist["date"]
+
+    @property
+    def close(self) -> pd.Series:
+        return self.hist["close"]
+
+    @property
+    def volume(self) -> pd.Series:
+        return self.hist["volume"]
+
+    @cached_property
+    def returns(self) -> pd.Series:
+        """Simple returns aligned to the history (first value is NaN)."""
+        return self.close.pct_change()
+
+    @cached_property
+    def daily_returns(self) -> pd.Series:
+        return self.returns.dropna()
+
+    @cached_property
+    def drawdown(self) -> pd.Series:
+        return self.close / self.close.cummax() - 1
+
+    def moving_average(self, window: int) -> pd.Series:
+        if window not in self._moving_averages:
+            self._moving_averages[window] = self.close.rolling(window).mean()
+        return self._moving_averages[window]
+
+    def rolling_volatility(self, window: int) -> pd.Series:
+        """Annualized rolling standard deviation of returns."""
+        if window not in self._rolling_volatility:
+            self._rolling_volatility[window] = self.returns.rolling(window).std() * np.sqrt(252)
+        return self._rolling_volatility[window]
+
+    @property
+    def ma_50(self) -> pd.Series:
+        return self.moving_average(50)
+
+    @property
+    def ma_200(self) -> pd.Series:
+        return self.moving_average(200)
@@ -0,0 +1,338 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from core.tracing import frame_bytes, span
+
+
+DEFAULT_CACHE_DIR = os.environ.get("FINANCE_CACHE_DIR", os.path.join(".cache", "prices"))
+DEFAULT_TTL_SECONDS = int(os.environ.get("FINANCE_CACHE_TTL", 6 * 60 * 60))
+DEFAULT_FETCH_WORKERS = 8
+
+# Periods ordered by the span they cover, so a cached "5y" frame can serve "1y".
+PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"]
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "3y": pd.DateOffset(years=3),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def temp_path(path: Path) -> Path:
+    """
+    A hidden sibling of `path` for write-then-rename, unique per process,
+    thread and call, so concurrent writers never share a temp file.
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def normalize_history(hist: pd.DataFrame) -> pd.DataFrame:
+    """
+    Brings a provider frame into the shape the analytics expect:
+    a lowercase "date" column plus lowercase OHLCV columns.
+    """
+    if hist is None or hist.empty:
+        return pd.DataFrame()
+
+    if not {"date", "Date", "datetime", "Datetime"}.intersection(hist.columns):
+        hist = hist.reset_index()
+    hist = hist.rename(columns=str.lower)
+    # Intraday frames index bars by "Datetime".
+    if "date" not in hist.columns:
+        hist = hist.rename(columns={"datetime": "date"})
+    return hist.sort_values("date").reset_index(drop=True)
+
+
+def period_covers(cached_period: str, requested_period: str) -> bool:
+    if cached_period not in PERIOD_ORDER or requested_period not in PERIOD_ORDER:
+        return cached_period == requested_period
+    return PERIOD_ORDER.index(cached_period) >= PERIOD_ORDER.index(requested_period)
+
+
+def covering_period(periods) -> str:
+    """The shortest fetchable period (PERIOD_ORDER) spanning every one of `periods`."""
+    periods = ["1y" if p == "ytd" else p for p in periods]
+    if any(p not in PERIOD_OFFSETS for p in periods):
+        return "max"
+
+    anchor = pd.Timestamp("2000-01-01")
+    earliest = min((anchor - PERIOD_OFFSETS[p] for p in periods), default=anchor)
+    for period in PERIOD_ORDER:
+        if period in PERIOD_OFFSETS and anchor - PERIOD_OFFSETS[period] <= earliest:
+            return period
+    return "max"
+
+
+def period_cutoff(last: pd.Timestamp, period: str):
+    """First date inside a trailing `period` ending at `last`; None for the whole history."""
+    if period == "ytd":
+        return pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz)
+    if period in PERIOD_OFFSETS:
+        return last - PERIOD_OFFSETS[period]
+    return None
+
+
+def slice_period(hist: pd.DataFrame, period: str) -> pd.DataFrame:
+    if hist.empty:
+        return hist
+
+    cutoff = period_cutoff(hist["date"].iloc[-1], period)
+    if cutoff is None:
+        return hist
+
+    return hist[hist["date"] >= cutoff].reset_index(drop=True)
+
+
+# -----------------------------------
+# Providers
+# -----------------------------------
+class PriceProvider:
+    """
+    Source of OHLCV bars, daily unless an intraday `interval` (e.g.
+    "5m", "1h") is asked for. Implementations return a normalized frame
+    (see normalize_history) or an empty frame when nothing is available.
+    """
+
+    name = "base"
+
+    def history(self, ticker: str, period: str = "5y", start=None, interval: str = "1d") -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    name = "yfinance"
+
+    def history(self, ticker: str, period: str = "5y", start=None, interval: str = "1d") -> pd.DataFrame:
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+
+        if start is not None:
+            start = pd.Timestamp(start)
+            # Intraday top-ups resume from the last bar, not the last day.
+            hist = stock.history(start=start if interval != "1d" else start.strftime("%Y-%m-%d"),
+                                 interval=interval)
+        else:
+            hist = stock.history(period=period, interval=interval)
+
+        return normalize_history(hist)
+
+
+class FixtureProvider(PriceProvider):
+    """
+    Offline provider backed by in-memory frames or a directory of
+    <TICKER>.csv / <TICKER>.parquet files. Intraday bars are found under
+    "<TICKER>.<interval>" (e.g. AAPL.5m.parquet). Used for tests and
+    air-gapped runs.
+    """
+
+    name = "fixture"
+
+    def __init__(self, source):
+        self.source = source
+
+    def _load(self, ticker: str, interval: str = "1d") -> pd.DataFrame:
+        key = ticker if interval == "1d" else f"{ticker}.{interval}"
+
+        if isinstance(self.source, dict):
+            hist = self.source.get(key)
+            return normalize_history(hist.copy()) if hist is not None else pd.DataFrame()
+
+        base = Path(self.source)
+        parquet_path = base / f"{key}.parquet"
+        csv_path = base / f"{key}.csv"
+
+        if parquet_path.exists():
+            return normalize_history(pd.read_parquet(parquet_path))
+        if csv_path.exists():
+            hist = pd.read_csv(csv_path)
+            hist = hist.rename(columns=str.lower)
+            hist["date"] = pd.to_datetime(hist["date"] if "date" in hist else hist["datetime"], utc=True)
+            return normalize_history(hist.drop(columns="datetime", errors="ignore"))
+        return pd.DataFrame()
+
+    def history(self, ticker: str, period: str = "5y", start=None, interval: str = "1d") -> pd.DataFrame:
+        hist = self._load(ticker, interval)
+
+        if hist.empty:
+            return hist
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tz is None and hist["date"].dt.tz is not None:
+                start = start.tz_localize(hist["date"].dt.tz)
+            return hist[hist["date"] >= start].reset_index(drop=True)
+        return slice_period(hist, period)
+
+
+# -----------------------------------
+# On-disk Cache
+# -----------------------------------
+class PriceCache:
+    """
+    Columnar (Parquet) OHLCV cache keyed by ticker.
+
+    Fresh entries (younger than ttl_seconds) are served from disk. Stale
+    entries are topped up with only the bars since the last cached date.
+    Entries are refetched in full when the requested period is longer
+    than the one cached.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, provider: PriceProvider = None,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.provider = provider or YFinanceProvider()
+        self.ttl_seconds = ttl_seconds
+
+    def _paths(self, ticker: str):
+        key = ticker.upper().replace("/", "_")
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def _read(self, ticker: str):
+        data_path, meta_path = self._paths(ticker)
+
+        if not data_path.exists() or not meta_path.exists():
+            return None, None
+
+        try:
+            meta = json.loads(meta_path.read_text())
+            hist = pd.read_parquet(data_path)
+        except (OSError, ValueError):
+            return None, None
+
+        return hist, meta
+
+    def _write(self, ticker: str, hist: pd.DataFrame, period: str):
+        data_path, meta_path = self._paths(ticker)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so concurrent readers never see a partial file.
+        tmp_data = temp_path(data_path)
+        hist.to_parquet(tmp_data, index=False)
+        os.replace(tmp_data, data_path)
+
+        meta = {
+            "ticker": ticker,
+            "period": period,
+            "provider": self.provider.name,
+            "fetched_at": time.time(),
+            "last_date": str(hist["date"].iloc[-1]),
+            "rows": len(hist),
+        }
+        tmp_meta = temp_path(meta_path)
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, meta_path)
+
+    def is_fresh(self, meta: dict, max_age: float = None) -> bool:
+        max_age = self.ttl_seconds if max_age is None else max_age
+        return time.time() - meta.get("fetched_at", 0) < max_age
+
+    def get(self, ticker: str, period: str = "5y", refresh: bool = False, max_age: float = None) -> pd.DataFrame:
+        """
+        `max_age` overrides ttl_seconds for this call: older entries are
+        topped up with the latest bars (0 always tops up).
+        """
+        with span("data.fetch", ticker=ticker, period=period) as stage:
+            hist, status = self._get(ticker, period, refresh, max_age)
+            stage.set(cache=status, rows=len(hist), bytes=frame_bytes(hist))
+            return hist
+
+    def _get(self, ticker: str, period: str, refresh: bool, max_age: float = None):
+        cached, meta = (None, None) if refresh else self._read(ticker)
+
+        if cached is None or not period_covers(meta.get("period"), period):
+            hist = self.provider.history(ticker, period=period)
+            if hist.empty:
+                return pd.DataFrame(), "empty"
+            self._write(ticker, hist, period)
+            return slice_period(hist, period), "miss"
+
+        if self.is_fresh(meta, max_age):
+            return slice_period(cached, period), "hit"
+
+        # Stale: download from the last cached bar onwards. The last bar is
+        # requested again because it may have been a partial intraday bar.
+        last_date = cached["date"].iloc[-1]
+        new_bars = self.provider.history(ticker, period=period, start=last_date)
+
+        if not new_bars.empty:
+            new_bars = new_bars[new_bars["date"] >= last_date]
+            cached = pd.concat([cached[cached["date"] < last_date], new_bars], ignore_index=True)
+
+        self._write(ticker, cached, meta["period"])
+        return slice_period(cached, period), "refreshed"
+
+    def invalidate(self, ticker: str):
+        for path in self._paths(ticker):
+            if path.exists():
+                path.unlink()
+
+
+_default_cache = None
+
+
+def get_price_cache() -> PriceCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PriceCache()
+    return _default_cache
+
+
+def set_price_cache(cache: PriceCache):
+    """Installs the process-wide cache, e.g. one backed by a FixtureProvider."""
+    global _default_cache
+    _default_cache = cache
+
+
+def close_matrix(histories: dict) -> pd.DataFrame:
+    """
+    Dates x tickers close-price matrix from already loaded histories.
+    Dates are normalized to calendar days so listings on different
+    exchanges align; missing bars are left as NaN.
+    """
+    columns = {}
+
+    for ticker, hist in histories.items():
+        if hist.empty:
+            columns[ticker] = pd.Series(dtype=float)
+            continue
+        dates = hist["date"]
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        columns[ticker] = pd.Series(hist["close"].to_numpy(), index=dates.dt.normalize())
+
+    return pd.DataFrame(columns).sort_index()
+
+
+def load_histories(tickers, period: str = "5y", refresh: bool = False, cache: PriceCache = None,
+                   max_workers: int = DEFAULT_FETCH_WORKERS) -> dict:
+    """{ticker: history} for `tickers`, fetched concurrently through the cache."""
+    cache = cache or get_price_cache()
+    tickers = list(dict.fromkeys(tickers))
+
+    def fetch(ticker):
+        return ticker, cache.get(ticker, period=period, refresh=refresh)
+
+    with span("data.load_histories", tickers=len(tickers)):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(pool.map(fetch, tickers))
+
+
+def load_close_matrix(tickers, period: str = "5y", cache: PriceCache = None,
+                      max_workers: int = DEFAULT_FETCH_WORKERS) -> pd.DataFrame:
+    """Builds the close_matrix of `tickers` from the cache."""
+    return close_matrix(load_histories(tickers, period, cache=cache, max_workers=max_workers))
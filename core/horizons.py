@@ -0,0 +1,205 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from core.analytics import (
+    TREND_MA_WINDOW,
+    VOLATILITY_PERCENTILE_WINDOW,
+    classify_risk_regime,
+    estimate_recovery_probability,
+    suggest_position_size,
+)
+from core.context import AnalysisContext
+from core.data import covering_period, get_price_cache, period_cutoff
+from core.tracing import span
+
+
+DEFAULT_HORIZONS = ("1y", "3y", "5y", "10y")
+DEFAULT_VOLATILITY_WINDOWS = (20, 60, 120)
+DEFAULT_MA_WINDOWS = (50, 200)
+
+# A history starting this soon after a horizon's cutoff still covers it.
+COVERAGE_SLACK = pd.Timedelta(days=7)
+
+
+class HorizonEngine:
+    """
+    Running sums over one history, from which the metrics of any
+    trailing horizon and any rolling window are read off directly.
+
+    Each horizon is measured as if its slice were the whole history
+    (windows never reach back before the horizon starts), so a horizon's
+    summary matches build_analysis_summary on that slice. Rolling means
+    and volatilities come from prefix sums, so an extra window costs one
+    vector difference rather than another rolling pass.
+    """
+
+    def __init__(self, hist: pd.DataFrame):
+        self.dates = hist["date"].reset_index(drop=True)
+        self.close = hist["close"].to_numpy(dtype=np.float64)
+        n = len(self.close)
+
+        returns = np.full(n, np.nan)
+        returns[1:] = self.close[1:] / self.close[:-1] - 1
+
+        # Centering first keeps the sum-of-squares variance numerically
+        # stable; variance does not depend on the shift.
+        centered = np.nan_to_num(returns - np.nanmean(returns[1:]) if n > 1 else returns)
+        self._return_sums = np.cumsum(centered)
+        self._return_squares = np.cumsum(centered ** 2)
+        self._close_sums = np.concatenate([[0.0], np.cumsum(self.close)])
+
+        self._rolling_volatility = {}
+        self._moving_averages = {}
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def start(self, horizon: str) -> int:
+        """Index of the horizon's first bar (0 when the history is shorter)."""
+        cutoff = period_cutoff(self.dates.iloc[-1], horizon)
+        return 0 if cutoff is None else int(self.dates.searchsorted(cutoff))
+
+    def covers(self, horizon: str) -> bool:
+        """Whether the history reaches back to the horizon's start, give or take a holiday week."""
+        cutoff = period_cutoff(self.dates.iloc[-1], horizon)
+        return cutoff is None or self.dates.iloc[0] <= cutoff + COVERAGE_SLACK
+
+    def _return_stats(self, first, last, count):
+        """Sample variance of the returns over bars first..last (scalars or arrays)."""
+        sums = self._return_sums[last] - self._return_sums[first - 1]
+        squares = self._return_squares[last] - self._return_squares[first - 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.maximum(squares - sums ** 2 / count, 0) / (count - 1)
+
+    def volatility(self, start: int) -> float:
+        """Annualized volatility of the returns after `start`."""
+        count = len(self) - 1 - start
+        if count < 2:
+            return math.nan
+        return float(np.sqrt(self._return_stats(start + 1, len(self) - 1, count)) * np.sqrt(252))
+
+    def rolling_volatility(self, window: int) -> np.ndarray:
+        """Annualized rolling volatility; NaN until a full window of returns exists."""
+        if window not in self._rolling_volatility:
+            values = np.full(len(self), np.nan)
+            if len(self) > window:
+                ends = np.arange(window, len(self))
+                values[window:] = np.sqrt(self._return_stats(ends - window + 1, ends, window)) * np.sqrt(252)
+            self._rolling_volatility[window] = values
+        return self._rolling_volatility[window]
+
+    def moving_average(self, window: int) -> np.ndarray:
+        if window not in self._moving_averages:
+            values = np.full(len(self), np.nan)
+            if len(self) >= window:
+                values[window - 1:] = (self._close_sums[window:] - self._close_sums[:-window]) / window
+            self._moving_averages[window] = values
+        return self._moving_averages[window]
+
+    def volatility_percentile(self, start: int, window: int) -> float:
+        """Percentile of the latest rolling volatility among the horizon's own windows."""
+        values = self.rolling_volatility(window)[start + window:]
+        if not len(values):
+            return math.nan
+        last = values[-1]
+        less = np.count_nonzero(values < last)
+        equal = np.count_nonzero(values == last)
+        return round(float((less + (equal + 1) / 2) / len(values) * 100), 2)
+
+    def downtrend_days(self, start: int, window: int) -> int:
+        """Bars the close has been below its moving average, counted within the horizon."""
+        below = self.close < self.moving_average(window)
+        trailing = int(np.argmax(~below[::-1])) if not below.all() else len(self)
+        return max(min(trailing, len(self) - (start + window - 1)), 0)
+
+    def max_drawdown(self, start: int) -> float:
+        close = self.close[start:]
+        return float((close / np.maximum.accumulate(close) - 1).min())
+
+
+def _horizon_summary(engine: HorizonEngine, ticker: str, horizon: str, volatility_windows, ma_windows) -> dict:
+    start = engine.start(horizon)
+    trend = "upward" if engine.close[-1] > engine.close[start] else "downward"
+    drawdown = engine.max_drawdown(start)
+
+    percentiles = {window: engine.volatility_percentile(start, window) for window in volatility_windows}
+    downtrends = {window: engine.downtrend_days(start, window) for window in ma_windows}
+    vol_percentile = percentiles[VOLATILITY_PERCENTILE_WINDOW]
+
+    summary = {
+        "ticker": ticker,
+        "data_available": True,
+        "horizon": horizon,
+        "covers_horizon": engine.covers(horizon),
+        "time_period": f"{engine.dates.iloc[start].date()} to {engine.dates.iloc[-1].date()}",
+        "trend": trend,
+        "annualized_volatility": round(engine.volatility(start), 3),
+        "volatility_percentile": vol_percentile,
+        "max_drawdown_pct": round(drawdown * 100, 2),
+        "downtrend_days": downtrends[TREND_MA_WINDOW],
+        "recovery_probability_pct": estimate_recovery_probability(trend, drawdown * 100, vol_percentile),
+        "observations": len(engine) - start,
+    }
+    summary.update(classify_risk_regime(summary))
+    summary["position_size_suggestion"] = suggest_position_size(summary["regime"])
+
+    summary["volatility_percentiles"] = {f"{w}d": v for w, v in percentiles.items()}
+    summary["rolling_volatility"] = {
+        f"{w}d": round(float(engine.rolling_volatility(w)[-1]), 3) for w in volatility_windows
+    }
+    summary["downtrend_days_by_ma"] = {f"{w}d": days for w, days in downtrends.items()}
+    return summary
+
+
+def build_horizon_summary(ticker: str, context: AnalysisContext = None, horizons=DEFAULT_HORIZONS,
+                          volatility_windows=DEFAULT_VOLATILITY_WINDOWS, ma_windows=DEFAULT_MA_WINDOWS,
+                          refresh: bool = False) -> dict:
+    """
+    Summaries and regimes for several trailing horizons from one history.
+
+    Without a context, the shortest period covering every horizon is
+    loaded once. Each entry of "horizons" is a build_analysis_summary-
+    shaped dict (usable as a committee summary) plus per-window
+    volatility percentiles, current rolling volatilities and downtrend
+    days. Horizons longer than the available history use all of it and
+    report covers_horizon False.
+    """
+    if context is None:
+        hist = get_price_cache().get(ticker, period=covering_period(horizons), refresh=refresh)
+    else:
+        hist = context.hist
+
+    if hist.empty:
+        return {
+            "ticker": ticker,
+            "data_available": False,
+            "message": "No historical market data available for this ticker.",
+        }
+
+    # The headline fields always use the standard windows.
+    volatility_windows = sorted({*volatility_windows, VOLATILITY_PERCENTILE_WINDOW})
+    ma_windows = sorted({*ma_windows, TREND_MA_WINDOW})
+
+    with span("analytics.horizons", ticker=ticker, rows=len(hist), horizons=len(horizons),
+              windows=len(volatility_windows) + len(ma_windows)):
+        engine = HorizonEngine(hist)
+        summaries = {h: _horizon_summary(engine, ticker, h, volatility_windows, ma_windows) for h in horizons}
+
+    return {
+        "ticker": ticker,
+        "data_available": True,
+        "as_of": str(engine.dates.iloc[-1].date()),
+        "windows": {"volatility": volatility_windows, "moving_average": ma_windows},
+        "regimes": {h: summary["regime"] for h, summary in summaries.items()},
+        "horizons": summaries,
+    }
+
+
+def horizon_table(multi: dict) -> pd.DataFrame:
+    """One row per horizon with the headline metrics, for side-by-side display."""
+    columns = ["regime", "risk_score", "trend", "annualized_volatility", "volatility_percentile",
+               "max_drawdown_pct", "downtrend_days", "recovery_probability_pct", "observations"]
+    rows = {h: {column: summary[column] for column in columns} for h, summary in multi["horizons"].items()}
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("horizon")
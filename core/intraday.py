@@ -0,0 +1,445 @@
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.analytics import (
+    TREND_MA_WINDOW,
+    VOLATILITY_PERCENTILE_WINDOW,
+    classify_risk_regime,
+    estimate_recovery_probability,
+    suggest_position_size,
+)
+from core.data import YFinanceProvider, period_cutoff, temp_path
+from core.kernels import TRADING_DAYS_PER_YEAR, close_stats
+from core.tracing import span
+
+
+DEFAULT_INTRADAY_DIR = os.environ.get("FINANCE_INTRADAY_DIR", os.path.join(".cache", "intraday"))
+DEFAULT_INTRADAY_TTL_SECONDS = int(os.environ.get("FINANCE_INTRADAY_TTL", 5 * 60))
+DEFAULT_EXCHANGE_TZ = "America/New_York"
+
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "1d": 24 * 60 * 60,
+}
+
+# Regular US equity session; an hour of it holds seven hourly bars (the last partial).
+SESSION_SECONDS = 6.5 * 60 * 60
+
+# The longest history the provider serves per interval; the store keeps what it has fetched before.
+INTRADAY_FETCH_PERIODS = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "1h": "730d",
+}
+
+# Prices and volume as float32, time as int64 epoch seconds: 24 bytes a bar.
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Replaced chunks stay on disk this long after the manifest drops them,
+# so a read that loaded the previous manifest can still open them.
+RETIRED_CHUNK_SECONDS = 60
+
+
+def periods_per_year(interval: str) -> int:
+    """Bars in a trading year at `interval`: 252 sessions of regular-hours bars."""
+    seconds = INTERVAL_SECONDS[interval]
+    if interval == "1d":
+        return TRADING_DAYS_PER_YEAR
+    return TRADING_DAYS_PER_YEAR * math.ceil(SESSION_SECONDS / seconds)
+
+
+def annualization_factor(interval: str) -> float:
+    """Multiplier taking a per-bar return volatility at `interval` to an annual one."""
+    return math.sqrt(periods_per_year(interval))
+
+
+def _local_days(timestamps: np.ndarray, tz: str) -> np.ndarray:
+    """Calendar day in the exchange time zone, as days since the epoch."""
+    local = pd.DatetimeIndex(timestamps.astype("datetime64[s]")).tz_localize("UTC").tz_convert(tz)
+    return local.tz_localize(None).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+# -----------------------------------
+# Bars
+# -----------------------------------
+class IntradayBars:
+    """
+    Bars as parallel arrays: `timestamps` (int64 epoch seconds of each
+    bar's start) and float32 `columns`, a subset of BAR_COLUMNS.
+    """
+
+    __slots__ = ("timestamps", "columns", "interval", "tz")
+
+    def __init__(self, timestamps: np.ndarray, columns: dict, interval: str, tz: str = DEFAULT_EXCHANGE_TZ):
+        self.timestamps = timestamps
+        self.columns = columns
+        self.interval = interval
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, hist: pd.DataFrame, interval: str, tz: str = DEFAULT_EXCHANGE_TZ) -> "IntradayBars":
+        """From a normalized history; naive dates are taken as UTC."""
+        if hist.empty:
+            return cls(np.empty(0, np.int64), {c: np.empty(0, np.float32) for c in BAR_COLUMNS}, interval, tz)
+
+        dates = pd.DatetimeIndex(hist["date"])
+        if dates.tz is None:
+            dates = dates.tz_localize("UTC")
+        seconds = dates.as_unit("s").asi8
+        order = np.argsort(seconds, kind="stable")
+        timestamps = seconds[order]
+        columns = {c: hist[c].to_numpy(dtype=np.float32)[order] for c in BAR_COLUMNS if c in hist}
+        return cls(timestamps, columns, interval, tz)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.columns["close"]
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def take(self, index) -> "IntradayBars":
+        return IntradayBars(self.timestamps[index], {c: v[index] for c, v in self.columns.items()},
+                            self.interval, self.tz)
+
+    def to_frame(self) -> pd.DataFrame:
+        """A normalized history frame with dates in the exchange time zone."""
+        dates = pd.DatetimeIndex(self.timestamps.astype("datetime64[s]")).tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame({"date": dates, **self.columns})
+
+
+def concat_bars(parts, interval: str, tz: str, columns) -> IntradayBars:
+    if not parts:
+        return IntradayBars(np.empty(0, np.int64), {c: np.empty(0, np.float32) for c in columns}, interval, tz)
+    return IntradayBars(np.concatenate([p.timestamps for p in parts]),
+                        {c: np.concatenate([p.columns[c] for p in parts]) for c in columns}, interval, tz)
+
+
+def resample(bars: IntradayBars, interval: str) -> IntradayBars:
+    """
+    Aggregates bars to a coarser `interval`: open first, high max, low
+    min, close last, volume summed. Daily buckets are exchange-local
+    sessions; shorter buckets are anchored at each session's first bar,
+    so hourly bars start at the open (9:30, 10:30, ...) as providers
+    label them. Each bar is stamped with its bucket's start.
+    """
+    seconds = INTERVAL_SECONDS[interval]
+    if seconds < INTERVAL_SECONDS[bars.interval]:
+        raise ValueError(f"cannot resample {bars.interval} bars to the finer interval {interval}")
+    if interval == bars.interval or not len(bars):
+        return IntradayBars(bars.timestamps, bars.columns, interval, bars.tz)
+
+    timestamps = bars.timestamps
+    days = _local_days(timestamps, bars.tz)
+    day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+
+    if interval == "1d":
+        # Stamped at local midnight, as daily providers date their bars.
+        starts = day_starts
+        labels = pd.DatetimeIndex(days[starts].astype("datetime64[D]")).tz_localize(bars.tz).as_unit("s").asi8
+    else:
+        session_open = np.repeat(timestamps[day_starts], np.diff(np.r_[day_starts, len(timestamps)]))
+        slots = (timestamps - session_open) // seconds
+        starts = np.flatnonzero(np.r_[True, (days[1:] != days[:-1]) | (slots[1:] != slots[:-1])])
+        labels = session_open[starts] + slots[starts] * seconds
+
+    ends = np.r_[starts[1:], len(timestamps)] - 1
+    reducers = {
+        "open": lambda v: v[starts],
+        "high": lambda v: np.maximum.reduceat(v, starts),
+        "low": lambda v: np.minimum.reduceat(v, starts),
+        "close": lambda v: v[ends],
+        "volume": lambda v: np.add.reduceat(v, starts, dtype=np.float64).astype(np.float32),
+    }
+    columns = {c: reducers[c](values) for c, values in bars.columns.items()}
+    return IntradayBars(labels, columns, interval, bars.tz)
+
+
+# -----------------------------------
+# Chunked Store
+# -----------------------------------
+class IntradayStore:
+    """
+    Intraday bars on disk as one chunk per exchange-local month, each
+    column a separate .npy file opened as a memory map. A read touches
+    only the months and columns it asks for, and resampled reads
+    aggregate month by month, so five years of minute bars reduce to
+    daily bars without ever being held in memory whole.
+
+    Writes merge into the affected months (new bars replace stored ones
+    at the same time) and publish them by swapping the series manifest,
+    so readers see a month either before or after a write. The manifest
+    is read, changed and saved under one lock, and replaced months are
+    deleted only RETIRED_CHUNK_SECONDS after they leave it.
+    """
+
+    def __init__(self, root: str = DEFAULT_INTRADAY_DIR, provider=None,
+                 ttl_seconds: int = DEFAULT_INTRADAY_TTL_SECONDS, tz: str = DEFAULT_EXCHANGE_TZ):
+        self.root = Path(root)
+        self.provider = provider or YFinanceProvider()
+        self.ttl_seconds = ttl_seconds
+        self.tz = tz
+        self._lock = threading.Lock()
+
+    def _dir(self, ticker: str, interval: str) -> Path:
+        return self.root / ticker.upper().replace("/", "_") / interval
+
+    def _manifest(self, ticker: str, interval: str) -> dict:
+        path = self._dir(ticker, interval) / "manifest.json"
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {"ticker": ticker, "interval": interval, "tz": self.tz, "chunks": {}}
+
+    def _save_manifest(self, ticker: str, interval: str, manifest: dict):
+        path = self._dir(ticker, interval) / "manifest.json"
+        tmp = temp_path(path)
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, path)
+
+    def _open_chunk(self, directory: Path, columns, interval: str, tz: str) -> IntradayBars:
+        timestamps = np.load(directory / "timestamp.npy", mmap_mode="r")
+        return IntradayBars(timestamps, {c: np.load(directory / f"{c}.npy", mmap_mode="r") for c in columns},
+                            interval, tz)
+
+    # -----------------------------------
+    # Writes
+    # -----------------------------------
+    def write(self, ticker: str, interval: str, bars) -> int:
+        """Merges bars (IntradayBars or a normalized frame) into the store; returns the bars written."""
+        return self._write(ticker, interval, bars)
+
+    def _write(self, ticker: str, interval: str, bars, fetched_at: float = None) -> int:
+        """write(), also stamping the manifest's fetched_at in the same update when given."""
+        if isinstance(bars, pd.DataFrame):
+            bars = IntradayBars.from_frame(bars, interval, self.tz)
+        if not len(bars) and fetched_at is None:
+            return 0
+
+        directory = self._dir(ticker, interval)
+        months = _local_days(bars.timestamps, self.tz).astype("datetime64[D]").astype("datetime64[M]")
+
+        with self._lock, span("data.intraday.write", ticker=ticker, interval=interval, rows=len(bars)):
+            manifest = self._manifest(ticker, interval)
+            if not len(bars) and not manifest["chunks"]:
+                return 0
+            directory.mkdir(parents=True, exist_ok=True)
+            now = time.time()
+            retired = manifest.get("retired", [])
+
+            for month in np.unique(months):
+                key = str(month)
+                part = bars.take(months == month)
+                previous = manifest["chunks"].get(key)
+                if previous is not None:
+                    stored = self._open_chunk(directory / previous["dir"], BAR_COLUMNS, interval, self.tz)
+                    part = _merge(stored, part)
+                    retired.append({"dir": previous["dir"], "at": now})
+
+                name = f"{key}.{uuid.uuid4().hex[:8]}"
+                tmp = directory / f".{name}.tmp"
+                tmp.mkdir()
+                np.save(tmp / "timestamp.npy", part.timestamps.astype(np.int64))
+                for column in BAR_COLUMNS:
+                    values = part.columns.get(column)
+                    if values is None:
+                        values = np.full(len(part), np.nan, np.float32)
+                    np.save(tmp / f"{column}.npy", np.asarray(values, dtype=np.float32))
+                os.replace(tmp, directory / name)
+
+                manifest["chunks"][key] = {"dir": name, "rows": len(part),
+                                           "start": int(part.timestamps[0]), "end": int(part.timestamps[-1])}
+
+            manifest["chunks"] = dict(sorted(manifest["chunks"].items()))
+            if fetched_at is not None:
+                manifest["fetched_at"] = fetched_at
+            expired = [entry for entry in retired if now - entry["at"] >= RETIRED_CHUNK_SECONDS]
+            manifest["retired"] = [entry for entry in retired if now - entry["at"] < RETIRED_CHUNK_SECONDS]
+            self._save_manifest(ticker, interval, manifest)
+            for entry in expired:
+                shutil.rmtree(directory / entry["dir"], ignore_errors=True)
+
+        return len(bars)
+
+    def update(self, ticker: str, interval: str, refresh: bool = False) -> str:
+        """
+        Tops the series up from the provider once it is older than the
+        TTL, from the last stored bar onwards. Returns "hit", "refreshed",
+        "miss" or "empty".
+        """
+        manifest = self._manifest(ticker, interval)
+        if manifest["chunks"] and not refresh and time.time() - manifest.get("fetched_at", 0) < self.ttl_seconds:
+            return "hit"
+
+        with span("data.intraday.fetch", ticker=ticker, interval=interval) as stage:
+            period = INTRADAY_FETCH_PERIODS.get(interval, "max")
+            if manifest["chunks"] and not refresh:
+                last = max(chunk["end"] for chunk in manifest["chunks"].values())
+                # The last bar is fetched again because it may still have been forming.
+                new_bars = self.provider.history(ticker, period=period, start=pd.Timestamp(last, unit="s", tz="UTC"),
+                                                 interval=interval)
+                status = "refreshed"
+            else:
+                new_bars = self.provider.history(ticker, period=period, interval=interval)
+                status = "miss"
+
+            # The fetch time is saved with the bars, in one manifest update.
+            rows = self._write(ticker, interval, new_bars, fetched_at=time.time())
+            stage.set(cache=status, rows=rows)
+
+        if not self._manifest(ticker, interval)["chunks"]:
+            return "empty"
+        return status
+
+    # -----------------------------------
+    # Reads
+    # -----------------------------------
+    def load(self, ticker: str, interval: str, period: str = None, start=None, end=None,
+             columns=("close",), resample_to: str = None) -> IntradayBars:
+        """
+        Stored bars in [start, end], or the trailing `period`, with only
+        the requested columns. With `resample_to`, each month is
+        aggregated as it is read.
+        """
+        manifest = self._manifest(ticker, interval)
+        chunks = list(manifest["chunks"].values())
+        tz = manifest.get("tz", self.tz)
+        columns = list(columns)
+        target = resample_to or interval
+
+        if chunks and period is not None:
+            cutoff = period_cutoff(pd.Timestamp(chunks[-1]["end"], unit="s", tz=tz), period)
+            if cutoff is not None:
+                start = cutoff if start is None else max(pd.Timestamp(start), cutoff)
+        first = -np.inf if start is None else pd.Timestamp(start).timestamp()
+        last = np.inf if end is None else pd.Timestamp(end).timestamp()
+
+        parts = []
+        with span("data.intraday.load", ticker=ticker, interval=interval, resample=target) as stage:
+            for chunk in chunks:
+                if chunk["end"] < first or chunk["start"] > last:
+                    continue
+                bars = self._open_chunk(self._dir(ticker, interval) / chunk["dir"], columns, interval, tz)
+                lo = np.searchsorted(bars.timestamps, first, side="left")
+                hi = np.searchsorted(bars.timestamps, last, side="right")
+                part = resample(bars.take(slice(lo, hi)), target)
+                # Copy out of the memory map so the chunk file can be replaced later.
+                parts.append(IntradayBars(np.array(part.timestamps), {c: np.array(v) for c, v in part.columns.items()},
+                                          target, tz))
+
+            bars = concat_bars(parts, target, tz, columns)
+            stage.set(chunks=len(parts), rows=len(bars), bytes=bars.nbytes)
+        return bars
+
+    def history(self, ticker: str, interval: str, period: str = None, refresh: bool = False,
+                resample_to: str = None) -> pd.DataFrame:
+        """Updated bars as a normalized frame, for callers that want pandas."""
+        self.update(ticker, interval, refresh=refresh)
+        return self.load(ticker, interval, period=period, columns=BAR_COLUMNS, resample_to=resample_to).to_frame()
+
+    def chunks(self, ticker: str, interval: str) -> dict:
+        return self._manifest(ticker, interval)["chunks"]
+
+
+def _merge(stored: IntradayBars, new: IntradayBars) -> IntradayBars:
+    """Union of two bar sets, sorted by time; at equal times the new bar wins."""
+    timestamps = np.concatenate([stored.timestamps, new.timestamps])
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    keep = order[np.r_[timestamps[1:] != timestamps[:-1], True]]
+
+    columns = {}
+    for column in BAR_COLUMNS:
+        values = [bars.columns.get(column) for bars in (stored, new)]
+        values = [v if v is not None else np.full(len(b), np.nan, np.float32) for v, b in zip(values, (stored, new))]
+        columns[column] = np.concatenate(values)[keep]
+    return IntradayBars(np.concatenate([stored.timestamps, new.timestamps])[keep], columns, new.interval, new.tz)
+
+
+_default_store = None
+
+
+def get_intraday_store() -> IntradayStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = IntradayStore()
+    return _default_store
+
+
+def set_intraday_store(store: IntradayStore):
+    """Installs the process-wide store, e.g. one backed by a FixtureProvider."""
+    global _default_store
+    _default_store = store
+
+
+# -----------------------------------
+# Intraday Regime
+# -----------------------------------
+def build_intraday_summary(ticker: str, interval: str = "5m", resample_to: str = None, period: str = None,
+                           store: IntradayStore = None, refresh: bool = False,
+                           vol_window: int = VOLATILITY_PERCENTILE_WINDOW, ma_window: int = TREND_MA_WINDOW) -> dict:
+    """
+    The regime model on intraday bars, optionally resampled first.
+    Volatility is annualized for the bar interval analysed
+    (periods_per_year), so the regime thresholds keep their meaning;
+    the percentile window and moving average are counted in bars. The
+    result has build_analysis_summary's fields plus "interval" and
+    "periods_per_year".
+    """
+    store = store or get_intraday_store()
+    store.update(ticker, interval, refresh=refresh)
+    bars = store.load(ticker, interval, period=period, columns=("close",), resample_to=resample_to)
+    target = bars.interval
+
+    if not len(bars):
+        return {
+            "ticker": ticker,
+            "data_available": False,
+            "message": "No intraday market data available for this ticker.",
+        }
+
+    with span("analytics.intraday", ticker=ticker, interval=target, rows=len(bars)):
+        close = bars.close
+        stats = close_stats(close, vol_window, ma_window, periods_per_year=periods_per_year(target))
+        trend = "upward" if close[-1] > close[0] else "downward"
+
+    dates = bars.take([0, -1]).to_frame()["date"]
+    vol_percentile = round(stats["volatility_percentile"], 2)
+    summary = {
+        "ticker": ticker,
+        "data_available": True,
+        "interval": target,
+        "periods_per_year": periods_per_year(target),
+        "time_period": " to ".join(d.strftime("%Y-%m-%d %H:%M") for d in dates),
+        "trend": trend,
+        "annualized_volatility": round(stats["volatility"], 3),
+        "volatility_percentile": vol_percentile,
+        "max_drawdown_pct": round(stats["max_drawdown"] * 100, 2),
+        "downtrend_days": stats["downtrend_days"],
+        "recovery_probability_pct": estimate_recovery_probability(trend, stats["max_drawdown"] * 100, vol_percentile),
+        "observations": len(bars),
+    }
+    summary.update(classify_risk_regime(summary))
+    summary["position_size_suggestion"] = suggest_position_size(summary["regime"])
+    return summary
@@ -0,0 +1,157 @@
+import importlib.util
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+
+TRADING_DAYS_PER_YEAR = 252
+
+# "numba" when it is installed, else "numpy"; FINANCE_KERNELS=numpy forces the fallback.
+KERNEL_BACKEND = os.environ.get(
+    "FINANCE_KERNELS", "numba" if importlib.util.find_spec("numba") is not None else "numpy"
+)
+
+# Bars per block when the below-MA streak is searched backwards.
+STREAK_BLOCK = 256
+
+
+def _backend(backend: str = None) -> str:
+    backend = backend or KERNEL_BACKEND
+    if backend not in ("numba", "numpy"):
+        raise ValueError(f"unknown kernel backend {backend!r}")
+    return backend
+
+
+def _as_array(values) -> np.ndarray:
+    """Contiguous float64 values with missing bars skipped."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+
+# -----------------------------------
+# NumPy Kernels
+# -----------------------------------
+def _rolling_variance_numpy(returns: np.ndarray, window: int) -> np.ndarray:
+    # Each window is summed on its own, so no error builds up along long histories.
+    ones = np.ones(window)
+    sums = np.convolve(returns, ones, "valid")
+    squares = np.convolve(returns * returns, ones, "valid")
+    return np.maximum(squares - sums * sums / window, 0) / (window - 1)
+
+
+def _percentile_of_last_numpy(values: np.ndarray) -> float:
+    if not len(values):
+        return math.nan
+    last = values[-1]
+    less = np.count_nonzero(values < last)
+    equal = np.count_nonzero(values == last)
+    return (less + (equal + 1) / 2) / len(values) * 100
+
+
+def _below_ma_streak_numpy(close: np.ndarray, window: int) -> int:
+    # Only the tail is needed, so averages are built a block at a time from the end.
+    streak = 0
+    end = len(close)
+    block = STREAK_BLOCK
+    while end >= window:
+        start = max(end - block, window - 1)
+        averages = np.convolve(close[start - window + 1:end], np.ones(window), "valid") / window
+        below = close[start:end] < averages
+        run = len(below) if below.all() else int(np.argmax(~below[::-1]))
+        streak += run
+        if run < len(below):
+            break
+        end = start
+        block *= 4
+    return streak
+
+
+def _close_stats_numpy(close: np.ndarray, vol_window: int, ma_window: int, annualization: float):
+    returns = close[1:] / close[:-1] - 1
+    volatility = returns.std(ddof=1) if len(returns) > 1 else math.nan
+    max_drawdown = (close / np.maximum.accumulate(close) - 1).min()
+
+    variances = _rolling_variance_numpy(returns, vol_window) if len(returns) >= vol_window else returns[:0]
+    percentile = _percentile_of_last_numpy(np.sqrt(variances) * annualization)
+    return volatility, max_drawdown, percentile, _below_ma_streak_numpy(close, ma_window)
+
+
+@lru_cache(maxsize=None)
+def _numba_kernels():
+    """Imported on first use, so importing the analytics does not load Numba."""
+    from core import kernels_numba
+
+    return kernels_numba
+
+
+# -----------------------------------
+# Public Kernels
+# -----------------------------------
+def rolling_volatility(returns, window: int, backend: str = None,
+                       periods_per_year: float = TRADING_DAYS_PER_YEAR) -> np.ndarray:
+    """
+    Annualized sample volatility of every full `window` of returns,
+    one value per window (len(returns) - window + 1 of them).
+    """
+    returns = _as_array(returns)
+    if len(returns) < window:
+        return returns[:0]
+    if _backend(backend) == "numba":
+        variances = _numba_kernels().rolling_variance(returns, window)
+    else:
+        variances = _rolling_variance_numpy(returns, window)
+    return np.sqrt(variances) * math.sqrt(periods_per_year)
+
+
+def percentile_of_last(values, backend: str = None) -> float:
+    """
+    Percentile rank (ties averaged) of the last value among all values,
+    as rank(pct=True) would give it, by counting rather than sorting.
+    Missing values are skipped; NaN when the last one is missing.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not len(values) or np.isnan(values[-1]):
+        return math.nan
+    values = values[~np.isnan(values)]
+    if _backend(backend) == "numba":
+        return float(_numba_kernels().percentile_of_last(values))
+    return float(_percentile_of_last_numpy(values))
+
+
+def below_ma_streak(close, window: int, backend: str = None) -> int:
+    """Bars, counted back from the last, that closed below their `window`-bar moving average."""
+    close = _as_array(close)
+    if _backend(backend) == "numba":
+        return int(_numba_kernels().below_ma_streak(close, window))
+    return _below_ma_streak_numpy(close, window)
+
+
+def close_stats(close, vol_window: int, ma_window: int, backend: str = None,
+                periods_per_year: float = TRADING_DAYS_PER_YEAR) -> dict:
+    """
+    The summary's price statistics from one close array in a fused pass:
+    volatility of simple returns annualized over `periods_per_year`
+    bars, maximum drawdown (a fraction), the percentile of the latest
+    `vol_window` rolling volatility among all of them, and the below-MA
+    streak. Windows are counted in bars.
+    """
+    close = _as_array(close)
+    if not len(close):
+        return {"volatility": math.nan, "max_drawdown": math.nan, "volatility_percentile": math.nan,
+                "downtrend_days": 0}
+
+    annualization = math.sqrt(periods_per_year)
+    if _backend(backend) == "numba":
+        stats = _numba_kernels().close_stats(close, vol_window, ma_window, annualization)
+    else:
+        stats = _close_stats_numpy(close, vol_window, ma_window, annualization)
+
+    volatility, max_drawdown, percentile, streak = stats
+    return {
+        "volatility": float(volatility) * annualization,
+        "max_drawdown": float(max_drawdown),
+        "volatility_percentile": float(percentile),
+        "downtrend_days": int(streak),
+    }
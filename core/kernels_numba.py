@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+from numba import njit
+
+
+# Compiled kernels behind core.kernels; see there for what each computes.
+
+
+@njit(cache=True)
+def rolling_variance(returns, window):
+    count = returns.shape[0] - window + 1
+    out = np.empty(max(count, 0))
+    total = 0.0
+    squares = 0.0
+    for k in range(count):
+        # Re-summed from scratch once per window length, which bounds the
+        # rounding the running sums accumulate.
+        if k % window == 0:
+            total = 0.0
+            squares = 0.0
+            for j in range(k, k + window):
+                total += returns[j]
+                squares += returns[j] * returns[j]
+        else:
+            old = returns[k - 1]
+            new = returns[k + window - 1]
+            total += new - old
+            squares += new * new - old * old
+        out[k] = max(squares - total * total / window, 0.0) / (window - 1)
+    return out
+
+
+@njit(cache=True)
+def percentile_of_last(values):
+    n = values.shape[0]
+    if n == 0:
+        return np.nan
+    last = values[n - 1]
+    less = 0
+    equal = 0
+    for value in values:
+        if value < last:
+            less += 1
+        elif value == last:
+            equal += 1
+    return (less + (equal + 1) / 2) / n * 100
+
+
+@njit(cache=True)
+def below_ma_streak(close, window):
+    streak = 0
+    for i in range(close.shape[0] - 1, window - 2, -1):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += close[j]
+        if not close[i] < total / window:
+            break
+        streak += 1
+    return streak
+
+
+@njit(cache=True)
+def close_stats(close, vol_window, ma_window, annualization):
+    n = close.shape[0]
+    returns = np.empty(max(n - 1, 0))
+
+    # One pass for returns, their sum and the running-max drawdown.
+    peak = close[0]
+    max_drawdown = 0.0
+    total = 0.0
+    for i in range(n):
+        price = close[i]
+        if price > peak:
+            peak = price
+        drawdown = price / peak - 1
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+        if i > 0:
+            returns[i - 1] = price / close[i - 1] - 1
+            total += returns[i - 1]
+
+    volatility = np.nan
+    if n > 2:
+        mean = total / (n - 1)
+        squares = 0.0
+        for value in returns:
+            squares += (value - mean) * (value - mean)
+        volatility = math.sqrt(squares / (n - 2))
+
+    percentile = np.nan
+    if returns.shape[0] >= vol_window:
+        percentile = percentile_of_last(np.sqrt(rolling_variance(returns, vol_window)) * annualization)
+
+    return volatility, max_drawdown, percentile, below_ma_streak(close, ma_window)
@@ -0,0 +1,309 @@
+import struct
+import zlib
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+try:
+    from fpdf.fonts import CORE_FONTS, CORE_FONTS_CHARWIDTHS
+except ImportError:  # fpdf.fonts is private and may move between fpdf2 releases
+    CORE_FONTS_CHARWIDTHS = None
+    CORE_FONTS = {
+        family + style: name
+        for family, names in {
+            "courier": ("Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique"),
+            "helvetica": ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"),
+            "times": ("Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic"),
+        }.items()
+        for style, name in zip(("", "B", "I", "BI"), names)
+    }
+    CORE_FONTS.update(symbol="Symbol", zapfdingbats="ZapfDingbats")
+
+
+MM = 72 / 25.4
+A4 = (210.0, 297.0)
+
+FONT_STYLES = {"": "", "B": "B", "I": "I", "BI": "BI", "IB": "BI"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_COLOR_SPACES = {0: ("DeviceGray", 1), 2: ("DeviceRGB", 3)}
+
+
+@lru_cache(maxsize=None)
+def font_widths(font_key: str) -> tuple:
+    """Glyph widths (1/1000 em) of a core font, indexed by latin-1 code."""
+    if CORE_FONTS_CHARWIDTHS is None:
+        return _measured_widths(font_key)
+    widths = CORE_FONTS_CHARWIDTHS[font_key]
+    return tuple(widths[chr(code)] for code in range(256))
+
+
+def _measured_widths(font_key: str) -> tuple:
+    """The same widths through FPDF's public API: at 1000 pt, 1 pt is 1/1000 em."""
+    from fpdf import FPDF
+
+    family = font_key.rstrip("BI")
+    pdf = FPDF(unit="pt")
+    pdf.set_font(family, font_key[len(family):], size=1000)
+    return tuple(round(pdf.get_string_width(chr(code))) for code in range(256))
+
+
+def _png_passthrough(data: bytes):
+    """
+    (width, height, color space, channels, IDAT bytes) for an 8-bit,
+    non-interlaced grey or RGB PNG, whose compressed data PDF can embed
+    as-is with the PNG predictor. None for anything else.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+
+    header = None
+    chunks = []
+    position = len(PNG_SIGNATURE)
+
+    while position + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        position += 12 + length
+
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            chunks.append(body)
+        elif kind == b"IEND":
+            break
+
+    if header is None:
+        return None
+    width, height, depth, color, _, _, interlace = header
+    if depth != 8 or interlace or color not in PNG_COLOR_SPACES:
+        return None
+
+    color_space, channels = PNG_COLOR_SPACES[color]
+    return width, height, color_space, channels, b"".join(chunks)
+
+
+def _flatten_image(data: bytes):
+    with Image.open(BytesIO(data)) as img:
+        if img.mode in ("RGBA", "LA", "P", "PA"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        return img.width, img.height, "DeviceRGB", zlib.compress(img.tobytes(), 6)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").replace("\r", "")
+
+
+class StreamingPDF:
+    """
+    Minimal PDF writer that emits each object as soon as it is final.
+
+    Images are written when added and each page's content stream when the
+    next page starts, so memory holds one page of drawing operators
+    rather than the whole document. Only the page list and the xref
+    offsets are kept until close(). Coordinates are in millimetres from
+    the top-left corner, as in FPDF.
+    """
+
+    def __init__(self, output, page_size=A4):
+        self.output = output
+        self.page_width, self.page_height = page_size
+
+        self._offsets = {}
+        self._position = 0
+        self._next_id = 3  # 1 = catalog, 2 = page tree, both written last.
+        self._page_ids = []
+        self._fonts = {}
+        self._images = 0
+
+        self._content = None
+        self._page_fonts = None
+        self._page_images = None
+        self._font = None
+        self.font_size = 12.0
+        self.closed = False
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    # ----------------------------
+    # Object Output
+    # ----------------------------
+
+    def _write(self, data: bytes):
+        self.output.write(data)
+        self._position += len(data)
+
+    def _reserve(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _object(self, obj_id: int, body: bytes, stream: bytes = None):
+        self._offsets[obj_id] = self._position
+        self._write(f"{obj_id} 0 obj\n".encode())
+        self._write(body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    # ----------------------------
+    # Pages
+    # ----------------------------
+
+    def add_page(self):
+        self._finish_page()
+        self._content = []
+        self._page_fonts = {}
+        self._page_images = {}
+
+    def _finish_page(self):
+        if self._content is None:
+            return
+
+        content = zlib.compress("\n".join(self._content).encode("latin-1"))
+        content_id = self._reserve()
+        self._object(content_id, f"<< /Length {len(content)} /Filter /FlateDecode >>".encode(), content)
+
+        fonts = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id in self._page_fonts.items())
+        images = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id in self._page_images.items())
+        page_id = self._reserve()
+        self._object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_width * MM:.2f} {self.page_height * MM:.2f}] "
+            f"/Resources << /Font << {fonts} >> /XObject << {images} >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+
+        self._page_ids.append(page_id)
+        self._content = None
+
+    @property
+    def bytes_written(self) -> int:
+        return self._position
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids) + (self._content is not None)
+
+    # ----------------------------
+    # Fonts and Text
+    # ----------------------------
+
+    def set_font(self, family: str = "helvetica", style: str = "", size: float = 12):
+        key = family.lower() + FONT_STYLES[style.upper()]
+        if key not in self._fonts:
+            obj_id = self._reserve()
+            self._object(obj_id, (
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{CORE_FONTS[key]} "
+                f"/Encoding /WinAnsiEncoding >>"
+            ).encode())
+            self._fonts[key] = (f"F{len(self._fonts) + 1}", obj_id)
+
+        self._font = key
+        self.font_size = float(size)
+
+    def string_width(self, text: str) -> float:
+        """Width of latin-1 text in millimetres at the current font and size."""
+        widths = font_widths(self._font)
+        return sum(map(widths.__getitem__, text.encode("latin-1"))) * self.font_size / 1000 / MM
+
+    def text(self, x: float, y: float, text: str):
+        """Draws text with its baseline at (x, y)."""
+        name, obj_id = self._fonts[self._font]
+        self._page_fonts[name] = obj_id
+        self._content.append(
+            f"BT /{name} {self.font_size:.2f} Tf {x * MM:.2f} {(self.page_height - y) * MM:.2f} Td "
+            f"({_escape(text)}) Tj ET"
+        )
+
+    # ----------------------------
+    # Graphics
+    # ----------------------------
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.2):
+        h = self.page_height
+        self._content.append(
+            f"{width * MM:.2f} w {x1 * MM:.2f} {(h - y1) * MM:.2f} m {x2 * MM:.2f} {(h - y2) * MM:.2f} l S"
+        )
+
+    def rect(self, x: float, y: float, w: float, h: float, fill_gray: float = None):
+        op = "f" if fill_gray is not None else "S"
+        gray = f"{fill_gray:.3f} g " if fill_gray is not None else ""
+        self._content.append(
+            f"q {gray}{x * MM:.2f} {(self.page_height - y - h) * MM:.2f} {w * MM:.2f} {h * MM:.2f} re {op} Q"
+        )
+
+    def add_image(self, image) -> tuple:
+        """
+        Writes an image XObject immediately and returns a reference
+        (name, object id, px_width, px_height) for place_image.
+        Accepts PNG/JPEG bytes, a file-like object or a path.
+
+        Opaque 8-bit PNGs are embedded without decoding; other images
+        are flattened onto white and recompressed.
+        """
+        if isinstance(image, (bytes, bytearray)):
+            data = bytes(image)
+        elif hasattr(image, "read"):
+            data = image.read()
+        else:
+            with open(image, "rb") as f:
+                data = f.read()
+
+        passthrough = _png_passthrough(data)
+
+        if passthrough is not None:
+            width, height, color_space, channels, stream = passthrough
+            params = (
+                f"/DecodeParms << /Predictor 15 /Colors {channels} /BitsPerComponent 8 /Columns {width} >> "
+            )
+        else:
+            width, height, color_space, stream = _flatten_image(data)
+            params = ""
+
+        obj_id = self._reserve()
+        self._object(obj_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /{color_space} /BitsPerComponent 8 /Filter /FlateDecode {params}"
+            f"/Length {len(stream)} >>"
+        ).encode(), stream)
+
+        self._images += 1
+        return f"Im{self._images}", obj_id, width, height
+
+    def place_image(self, image_ref: tuple, x: float, y: float, w: float, h: float):
+        name, obj_id, _, _ = image_ref
+        self._page_images[name] = obj_id
+        self._content.append(
+            f"q {w * MM:.2f} 0 0 {h * MM:.2f} {x * MM:.2f} {(self.page_height - y - h) * MM:.2f} cm /{name} Do Q"
+        )
+
+    # ----------------------------
+    # Document
+    # ----------------------------
+
+    def close(self):
+        if self.closed:
+            return
+
+        self._finish_page()
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_position = self._position
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self._offsets.get(obj_id, 0):010d} 00000 n \n")
+        self._write("".join(lines).encode())
+        self._write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n".encode())
+
+        self.closed = True
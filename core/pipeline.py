@@ -0,0 +1,185 @@
+import atexit
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from core.tracing import span
+
+
+DEFAULT_PIPELINE_WORKERS = 8
+DEFAULT_PIPELINE_PROCESSES = int(os.environ.get("FINANCE_PIPELINE_PROCESSES", DEFAULT_PIPELINE_WORKERS))
+
+THREAD = "thread"
+PROCESS = "process"
+
+# Reserved dependency: a stage that lists it receives the run's
+# threading.Event, set when another stage fails so it can stop early.
+CANCEL = "cancel"
+
+
+class Stage:
+    """One named step: `func` is called with its dependencies' outputs as keyword arguments."""
+
+    __slots__ = ("name", "func", "deps", "kind")
+
+    def __init__(self, name: str, func, deps=(), kind: str = THREAD):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.kind = kind
+
+
+def _same(a, b) -> bool:
+    """Whether an input is unchanged; only plain values are compared by equality."""
+    return a is b or (isinstance(a, (str, bytes, int, float, bool, tuple)) and type(a) is type(b) and a == b)
+
+
+class Pipeline:
+    """
+    A dependency graph of stages run by a small scheduler.
+
+    Stages are declared in dependency order and start as soon as their
+    inputs exist, so independent branches overlap: thread stages on a
+    pool, process stages on a process pool (their function and inputs
+    must pickle). Outputs are memoized in the results dict each run
+    returns. Passing that dict back re-runs only what is missing,
+    invalidated or downstream of an input that changed.
+
+    Process stages share one pool across runs and pipelines
+    (get_process_pool) unless `processes` is given.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_PIPELINE_WORKERS, processes: ProcessPoolExecutor = None):
+        self.max_workers = max_workers
+        self.processes = processes
+        self.stages = {}
+
+    def add(self, name: str, func, deps=(), kind: str = THREAD) -> "Pipeline":
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        if kind not in (THREAD, PROCESS):
+            raise ValueError(f"unknown stage kind {kind!r}")
+        if name == CANCEL or (kind == PROCESS and CANCEL in deps):
+            raise ValueError(f"{CANCEL!r} is provided to thread stages by the scheduler")
+        # Declaring dependencies first keeps the graph acyclic.
+        if any(name in stage.deps for stage in self.stages.values()):
+            raise ValueError(f"stage {name!r} must be added before the stages that depend on it")
+        self.stages[name] = Stage(name, func, deps, kind)
+        return self
+
+    def downstream(self, names) -> set:
+        """The given names plus every stage that depends on them, directly or not."""
+        affected = set(names)
+        for stage in self.stages.values():
+            if affected.intersection(stage.deps):
+                affected.add(stage.name)
+        return affected
+
+    def upstream(self, targets=None) -> list:
+        """Stages needed for `targets` (all by default), in declaration order."""
+        needed = set(self.stages if targets is None else targets)
+        for stage in reversed(list(self.stages.values())):
+            if stage.name in needed:
+                needed.update(stage.deps)
+        return [name for name in self.stages if name in needed]
+
+    # -----------------------------------
+    # Scheduling
+    # -----------------------------------
+    def run(self, inputs: dict = None, results: dict = None, targets=None, invalidate=(),
+            on_stage=None) -> dict:
+        """
+        Runs every stage `targets` need that `results` lacks and returns
+        the updated results. Inputs that differ from those in `results`
+        invalidate their downstream stages, as do the names in
+        `invalidate`. `on_stage(name, value)` is called as each stage
+        finishes. A failing stage cancels the stages not yet started,
+        signals CANCEL to those running, waits for them to return and
+        re-raises.
+        """
+        results = dict(results or {})
+        inputs = inputs or {}
+        changed = [name for name, value in inputs.items() if name not in results or not _same(value, results[name])]
+        for name in self.downstream([*changed, *invalidate]) - set(inputs):
+            results.pop(name, None)
+        results.update(inputs)
+
+        todo = [name for name in self.upstream(targets) if name not in results]
+        for name in todo:
+            missing = [dep for dep in self.stages[name].deps
+                       if dep not in self.stages and dep not in results and dep != CANCEL]
+            if missing:
+                raise ValueError(f"stage {name!r} needs {', '.join(missing)}, which nothing provides")
+
+        with span("pipeline.run", stages=len(todo), reused=len(self.upstream(targets)) - len(todo)):
+            threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+            processes = None
+            if any(self.stages[name].kind == PROCESS for name in todo):
+                processes = self.processes or get_process_pool()
+            cancel = threading.Event()
+            results[CANCEL] = cancel
+
+            pending = {}
+            try:
+                while todo or pending:
+                    for name in [n for n in todo if all(dep in results for dep in self.stages[n].deps)]:
+                        todo.remove(name)
+                        stage = self.stages[name]
+                        kwargs = {dep: results[dep] for dep in stage.deps}
+                        # Stage spans nest under the caller's span in the trace.
+                        worker = contextvars.copy_context()
+                        pending[threads.submit(worker.run, self._call, stage, kwargs, processes, cancel)] = name
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = pending.pop(future)
+                        results[name] = future.result()
+                        if on_stage is not None:
+                            on_stage(name, results[name])
+            finally:
+                del results[CANCEL]
+                if pending:
+                    # A stage failed: stop the others before re-raising, so
+                    # no work (or model call) outlives the run.
+                    cancel.set()
+                    for future in pending:
+                        future.cancel()
+                threads.shutdown(wait=True, cancel_futures=True)
+
+        return results
+
+    @staticmethod
+    def _call(stage: Stage, kwargs: dict, processes, cancel: threading.Event):
+        with span("pipeline.stage", stage=stage.name, kind=stage.kind) as current:
+            if cancel.is_set():
+                current.set(cancelled=True)
+                raise RuntimeError(f"stage {stage.name!r} cancelled")
+            if stage.kind == PROCESS:
+                return processes.submit(stage.func, **kwargs).result()
+            return stage.func(**kwargs)
+
+
+_process_pool = None
+_process_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    The process pool shared by every pipeline's process stages, started
+    on first use with FINANCE_PIPELINE_PROCESSES workers, so worker
+    start-up and imports are paid once per process, not once per run.
+    """
+    global _process_pool
+    with _process_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=DEFAULT_PIPELINE_PROCESSES)
+            atexit.register(_process_pool.shutdown, cancel_futures=True)
+        return _process_pool
+
+
+def set_process_pool(pool: ProcessPoolExecutor):
+    """Installs the shared process pool, e.g. one sized for a batch."""
+    global _process_pool
+    with _process_lock:
+        _process_pool = pool
@@ -0,0 +1,198 @@
+import math
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from core.context import AnalysisContext
+from core.data import DEFAULT_FETCH_WORKERS, close_matrix, load_histories
+from core.screening import REGIMES, screen_summaries, screen_universe
+from core.tracing import span
+
+
+DEFAULT_IO_WORKERS = DEFAULT_FETCH_WORKERS
+
+# Pairs with fewer overlapping daily returns get no correlation.
+MIN_OVERLAP = 60
+
+NO_DATA = "NO_DATA"
+
+
+def normalize_weights(weights) -> pd.Series:
+    """
+    Weights as a Series summing to 1, in the order given.
+    Accepts a {ticker: weight} mapping or Series, or (ticker, weight) pairs;
+    repeated tickers are summed.
+    """
+    pairs = weights.items() if hasattr(weights, "items") else weights
+    totals = {}
+
+    for ticker, weight in pairs:
+        weight = float(weight)
+        if not math.isfinite(weight) or weight < 0:
+            raise ValueError(f"weight for {ticker} must be a non-negative number, got {weight}")
+        totals[ticker] = totals.get(ticker, 0.0) + weight
+
+    total = sum(totals.values())
+    if not totals or total <= 0:
+        raise ValueError("a portfolio needs at least one positive weight")
+
+    return pd.Series(totals, dtype=float) / total
+
+
+class PortfolioContext:
+    """
+    A book of tickers and weights sharing one data load.
+
+    Each holding keeps its own AnalysisContext (for appendices and
+    committee runs); the cross-sectional series are derived once from
+    the aligned close matrix and memoized like AnalysisContext's.
+    """
+
+    def __init__(self, contexts: dict, weights):
+        self.weights = normalize_weights(weights)
+        self.contexts = {ticker: contexts[ticker] for ticker in self.weights.index}
+
+    @classmethod
+    def load(cls, weights, period: str = "5y", refresh: bool = False, cache=None,
+             max_workers: int = DEFAULT_IO_WORKERS) -> "PortfolioContext":
+        """Fetches every holding once, concurrently, through the price cache."""
+        weights = normalize_weights(weights)
+
+        with span("portfolio.load", tickers=len(weights)):
+            histories = load_histories(weights.index, period, refresh, cache, max_workers)
+
+        return cls({ticker: AnalysisContext(ticker, hist) for ticker, hist in histories.items()}, weights)
+
+    @property
+    def tickers(self) -> list:
+        return list(self.weights.index)
+
+    @cached_property
+    def prices(self) -> pd.DataFrame:
+        return close_matrix({ticker: ctx.hist for ticker, ctx in self.contexts.items()})
+
+    @cached_property
+    def screen(self) -> pd.DataFrame:
+        """screen_universe rows for every holding, computed in one pass."""
+        with span("portfolio.screen", tickers=len(self.weights), rows=len(self.prices)):
+            return screen_universe(self.prices)
+
+    @cached_property
+    def summaries(self) -> dict:
+        """
+        build_analysis_summary-shaped dicts per holding. They are also set
+        on each holding's context, so later per-ticker work (committee
+        runs, appendices) reuses them instead of recomputing.
+        """
+        summaries = screen_summaries(self.screen)
+        for ticker, summary in summaries.items():
+            if summary["data_available"]:
+                self.contexts[ticker].summary = summary
+        return summaries
+
+    @cached_property
+    def returns(self) -> pd.DataFrame:
+        """
+        Daily returns per holding on the aligned calendar. Each return is
+        measured from the holding's previous own bar, as its summary is,
+        and is NaN on dates the holding did not trade.
+        """
+        previous = self.prices.ffill().shift(1)
+        return (self.prices / previous - 1).where(self.prices.notna())
+
+    @cached_property
+    def correlation(self) -> pd.DataFrame:
+        return self.returns.corr(min_periods=MIN_OVERLAP)
+
+    @cached_property
+    def portfolio_returns(self) -> pd.Series:
+        """
+        Daily returns of the book rebalanced to its weights. On each date
+        the weights are renormalized over the holdings that traded.
+        """
+        returns = self.returns.to_numpy()
+        traded = ~np.isnan(returns)
+        weights = np.where(traded, self.weights.to_numpy(), 0.0)
+        exposure = weights.sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            daily = (np.where(traded, returns, 0.0) * weights).sum(axis=1) / exposure
+
+        series = pd.Series(daily, index=self.returns.index)
+        return series[exposure > 0]
+
+    @cached_property
+    def nav(self) -> pd.Series:
+        return (1 + self.portfolio_returns).cumprod()
+
+    @cached_property
+    def drawdown(self) -> pd.Series:
+        return self.nav / self.nav.cummax() - 1
+
+
+# -----------------------------------
+# Cross-sectional Analytics
+# -----------------------------------
+def portfolio_risk(portfolio: PortfolioContext) -> dict:
+    returns = portfolio.portfolio_returns
+    if len(returns) < 2:
+        return {"data_available": False}
+
+    volatility = returns.std() * np.sqrt(252)
+    holding_vol = portfolio.returns.std() * np.sqrt(252)
+    weighted_vol = float((holding_vol * portfolio.weights).sum())
+
+    corr = portfolio.correlation.to_numpy()
+    off_diagonal = corr[~np.eye(len(corr), dtype=bool)]
+
+    return {
+        "data_available": True,
+        "time_period": f"{returns.index[0].date()} to {returns.index[-1].date()}",
+        "total_return_pct": round(float(portfolio.nav.iloc[-1] - 1) * 100, 2),
+        "annualized_volatility": round(float(volatility), 3),
+        "max_drawdown_pct": round(float(portfolio.drawdown.min()) * 100, 2),
+        "weighted_average_volatility": round(weighted_vol, 3),
+        # Above 1 when holdings offset each other.
+        "diversification_ratio": round(weighted_vol / float(volatility), 2) if volatility > 0 else None,
+        "average_correlation": round(float(np.nanmean(off_diagonal)), 3) if np.isfinite(off_diagonal).any() else None,
+        "observations": len(returns),
+    }
+
+
+def regime_breakdown(portfolio: PortfolioContext) -> list:
+    """Share of the book's weight in each regime, CONSTRUCTIVE first."""
+    regimes = portfolio.screen["regime"].where(portfolio.screen["data_available"], NO_DATA)
+    rows = []
+
+    for regime in [*REGIMES, NO_DATA]:
+        tickers = [ticker for ticker in portfolio.tickers if regimes[ticker] == regime]
+        if not tickers and regime == NO_DATA:
+            continue
+        rows.append({
+            "regime": str(regime),
+            "holdings": len(tickers),
+            "weight_pct": round(float(portfolio.weights[tickers].sum()) * 100, 2),
+            "tickers": tickers,
+        })
+
+    return rows
+
+
+def build_portfolio_summary(portfolio: PortfolioContext) -> dict:
+    """
+    Per-holding summaries plus the book-level risk, correlation and
+    regime mix, from a single screen over the aligned close matrix.
+    """
+    with span("portfolio.summary", tickers=len(portfolio.weights)):
+        holdings = []
+        for ticker, weight in portfolio.weights.items():
+            holdings.append({**portfolio.summaries[ticker], "weight_pct": round(float(weight) * 100, 2)})
+
+        return {
+            "tickers": portfolio.tickers,
+            "holdings": holdings,
+            "portfolio": portfolio_risk(portfolio),
+            "regime_breakdown": regime_breakdown(portfolio),
+            "correlation": portfolio.correlation.round(3),
+        }
@@ -1,37 +1,76 @@
-from fpdf import FPDF
-import textwrap
+import re
+import tempfile
+from pathlib import Path
+
+from core.pdf_writer import MM, StreamingPDF
+
+
+class _SanitizeTable(dict):
+    """
+    str.translate table mapping Unicode punctuation to latin-1 equivalents
+    and dropping anything else outside latin-1. Code points are resolved
+    on first sight and cached, so each distinct character costs one lookup.
+    """
+
+    def __missing__(self, codepoint):
+        # C1 controls fall outside the WinAnsi glyph set.
+        value = codepoint if codepoint < 0x80 or 0xA0 <= codepoint < 0x100 else None
+        self[codepoint] = value
+        return value
+
+
+SANITIZE_TABLE = _SanitizeTable({
+    0x2018: "'",    # left single quote
+    0x2019: "'",    # right single quote
+    0x201C: '"',    # left double quote
+    0x201D: '"',    # right double quote
+    0x2014: "-",    # em dash
+    0x2013: "-",    # en dash
+    0x2026: "...",  # ellipsis
+})
+
+MARKDOWN_ARTIFACTS = re.compile(r"\*\*|#+")
+
+# Spooled in-memory documents move to a temp file past this size.
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
 
 
 def sanitize_text(text: str) -> str:
     """
     Converts Unicode characters into latin-1 safe equivalents
-    so FPDF does not crash.
+    so the PDF core fonts can render them.
     """
+    return str(text).translate(SANITIZE_TABLE)
 
-    replacements = {
-        "\u2018": "'",   # left single quote
-        "\u2019": "'",   # right single quote
-        "\u201c": '"',   # left double quote
-        "\u201d": '"',   # right double quote
-        "\u2014": "-",   # em dash
-        "\u2013": "-",   # en dash
-        "\u2026": "...", # ellipsis
-    }
 
-    for key, value in replacements.items():
-        text = text.replace(key, value)
+class ReportBuilder:
+    """
+    Lays out the research packet and streams it out page by page.
+
+    `output` may be a path or a binary file-like object; pages are
+    written to it as soon as they are full. Without one the document is
+    spooled in memory (spilling to a temp file when large) and returned
+    by to_bytes() or written by save(path).
+    """
 
-    # Remove remaining unsupported characters
-    return text.encode("latin-1", "ignore").decode("latin-1")
+    def __init__(self, output=None):
+        self._owns_output = isinstance(output, (str, Path))
 
+        if output is None:
+            self._sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        elif isinstance(output, (str, Path)):
+            self._sink = open(output, "wb")
+        else:
+            self._sink = output
+        self._in_memory = output is None
 
-class ReportBuilder:
-    def __init__(self):
-        self.pdf = FPDF()
-        self.pdf.set_auto_page_break(auto=True, margin=15)
+        self.pdf = StreamingPDF(self._sink)
         self.margin_left = 15
         self.margin_right = 15
+        self.margin_top = 10
+        self.margin_bottom = 15
         self.page_width = 210 - self.margin_left - self.margin_right
+        self.y = None
 
     # ----------------------------
     # Core Layout Helpers
@@ -39,13 +78,85 @@ class ReportBuilder:
 
     def _add_new_page(self):
         self.pdf.add_page()
-        self.pdf.set_left_margin(self.margin_left)
-        self.pdf.set_right_margin(self.margin_right)
+        self.y = self.margin_top
+
+    def _ensure_space(self, height: float):
+        if self.y is None or self.y + height > self.pdf.page_height - self.margin_bottom:
+            self._add_new_page()
+
+    def ln(self, height: float):
+        if self.y is not None:
+            self.y += height
 
     def _add_horizontal_rule(self):
-        y = self.pdf.get_y()
-        self.pdf.line(self.margin_left, y, 210 - self.margin_right, y)
-        self.pdf.ln(5)
+        self.pdf.line(self.margin_left, self.y, 210 - self.margin_right, self.y)
+        self.ln(5)
+
+    def set_font(self, style: str = "", size: float = 11):
+        self.pdf.set_font("helvetica", style, size)
+
+    def _text_line(self, text: str, height: float, x: float = None):
+        """One line of text vertically centred in a row of `height` mm."""
+        self._ensure_space(height)
+        if text:
+            baseline = self.y + height / 2 + 0.3 * self.pdf.font_size / MM
+            self.pdf.text(self.margin_left if x is None else x, baseline, text)
+        self.y += height
+
+    def wrap(self, text: str, width: float = None) -> list:
+        """
+        Greedy word wrap measured with the current font's glyph widths,
+        so each line fills the available width exactly once. Words wider
+        than a line are split by character.
+        """
+        width = width or self.page_width
+        space = self.pdf.string_width(" ")
+        lines = []
+
+        for paragraph in text.split("\n"):
+            words = paragraph.split()
+            if not words:
+                lines.append("")
+                continue
+
+            line, line_width = [], 0.0
+            for word in words:
+                word_width = self.pdf.string_width(word)
+
+                while word_width > width:
+                    if line:
+                        lines.append(" ".join(line))
+                        line, line_width = [], 0.0
+                    cut = self._fit(word, width)
+                    lines.append(word[:cut])
+                    word = word[cut:]
+                    word_width = self.pdf.string_width(word)
+
+                if not word:
+                    continue
+                if line and line_width + space + word_width > width:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+                line_width += word_width + (space if line else 0.0)
+                line.append(word)
+
+            if line:
+                lines.append(" ".join(line))
+
+        return lines
+
+    def _fit(self, word: str, width: float) -> int:
+        """Number of leading characters of `word` that fit in `width`."""
+        used = 0.0
+        for i, char in enumerate(word):
+            used += self.pdf.string_width(char)
+            if used > width:
+                return max(i, 1)
+        return len(word)
+
+    def _paragraphs(self, text: str, height: float, width: float = None, x: float = None):
+        for line in self.wrap(sanitize_text(text), width):
+            self._text_line(line, height, x)
 
     # ----------------------------
     # Public Methods
@@ -53,70 +164,147 @@ class ReportBuilder:
 
     def add_title(self, title: str):
         self._add_new_page()
-        self.pdf.set_font("Arial", "B", 18)
-        self.pdf.cell(0, 10, sanitize_text(title), ln=True)
-        self.pdf.ln(4)
+        self.set_font("B", 18)
+        self._text_line(sanitize_text(title), 10)
+        self.ln(4)
         self._add_horizontal_rule()
 
+    def add_heading(self, header: str, size: float = 14, keep_with: float = 0):
+        """`keep_with` mm of following content start on the heading's page."""
+        self._ensure_space(8 + keep_with)
+        self.ln(6)
+        self.set_font("B", size)
+        self._paragraphs(header, 8)
+        self.ln(2)
+
     def add_section(self, header: str, body: str):
-        self.pdf.ln(6)
-        self.pdf.set_font("Arial", "B", 14)
-        self.pdf.multi_cell(0, 8, sanitize_text(header))
-        self.pdf.ln(2)
+        self.add_heading(header)
+
+        self.set_font("", 11)
+        self._paragraphs(self._clean(body), 6)
+        self.ln(4)
 
-        self.pdf.set_font("Arial", "", 11)
+    def add_image(self, image, width: int = 170):
+        """
+        Embeds an image given as a file path, PNG bytes or a file-like object.
+        """
+        ref = self.pdf.add_image(image)
+        _, _, px_width, px_height = ref
+        height = width * px_height / px_width
+
+        self._ensure_space(4 + height)
+        self.ln(4)
+        self.pdf.place_image(ref, self.margin_left, self.y, width, height)
+        self.y += height
+        self.ln(6)
+
+    def add_table(self, headers: list, rows: list, widths: list = None, align: str = None,
+                  font_size: float = 8, row_height: float = 5):
+        """
+        Grid of single-line cells. `widths` are in mm (default: equal
+        shares of the page width); `align` has one "L" or "R" per column
+        (default: numbers right-aligned). Cells too wide for their column
+        are truncated, and the header row repeats after page breaks.
+        """
+        widths = widths or [self.page_width / len(headers)] * len(headers)
+        if align is None:
+            sample = rows[0] if rows else headers
+            align = "".join("R" if isinstance(value, (int, float)) else "L" for value in sample)
 
-        wrapped_text = self._clean_and_wrap(body)
+        def draw_header():
+            self.pdf.rect(self.margin_left, self.y, sum(widths), row_height, fill_gray=0.88)
+            self.set_font("B", font_size)
+            self._table_row(headers, widths, align, row_height)
 
-        for line in wrapped_text:
-            self.pdf.multi_cell(0, 6, sanitize_text(line))
+        self._ensure_space(2 * row_height)
+        self.ln(2)
+        draw_header()
 
-        self.pdf.ln(4)
+        for row in rows:
+            if self.y + row_height > self.pdf.page_height - self.margin_bottom:
+                self._add_new_page()
+                draw_header()
+            self.set_font("", font_size)
+            self._table_row(row, widths, align, row_height)
 
-    def add_image(self, image_path: str, width: int = 170):
-        self.pdf.ln(4)
-        self.pdf.image(image_path, w=width)
-        self.pdf.ln(6)
+        self.pdf.line(self.margin_left, self.y, self.margin_left + sum(widths), self.y, width=0.1)
+        self.ln(4)
+
+    def _table_row(self, values, widths, align, height):
+        x = self.margin_left
+        padding = 1.0
+        baseline = self.y + height / 2 + 0.3 * self.pdf.font_size / MM
+
+        for value, width, side in zip(values, widths, align):
+            text = self._truncate(sanitize_text("" if value is None else value), width - 2 * padding)
+            if text:
+                left = x + width - padding - self.pdf.string_width(text) if side == "R" else x + padding
+                self.pdf.text(left, baseline, text)
+            x += width
+
+        self.y += height
+
+    def _truncate(self, text: str, width: float) -> str:
+        if self.pdf.string_width(text) <= width:
+            return text
+        cut = self._fit(text, width - self.pdf.string_width("..."))
+        return text[:cut].rstrip() + "..."
 
     def add_reasoning_log(self, reasoning_steps):
-        self.pdf.ln(6)
-        self.pdf.set_font("Arial", "B", 13)
-        self.pdf.multi_cell(0, 8, "System Reasoning Log")
-        self.pdf.ln(3)
+        self._ensure_space(8)
+        self.ln(6)
+        self.set_font("B", 13)
+        self._text_line("System Reasoning Log", 8)
+        self.ln(3)
 
-        self.pdf.set_font("Arial", "", 10)
+        self.set_font("", 10)
 
         for step in reasoning_steps:
-            self.pdf.multi_cell(0, 6, sanitize_text(f"- {step}"))
-
-        self.pdf.ln(4)
+            self._paragraphs(f"- {step}", 6)
 
-    def save(self, path: str):
-        self.pdf.output(path)
+        self.ln(4)
 
     # ----------------------------
-    # Text Cleaning
+    # Output
     # ----------------------------
 
-    def _clean_and_wrap(self, text: str):
+    def close(self):
+        """Finishes the document; further calls are no-ops."""
+        if self.pdf.closed:
+            return
+        if self.y is None:
+            self._add_new_page()
+        self.pdf.close()
+        self._sink.flush()
+        if self._owns_output:
+            self._sink.close()
+
+    def to_bytes(self) -> bytes:
+        """Finishes an in-memory document and returns the PDF bytes."""
+        if not self._in_memory:
+            raise ValueError("to_bytes() needs a ReportBuilder created without an output")
+        self.close()
+        self._sink.seek(0)
+        return self._sink.read()
+
+    def save(self, path: str = None):
         """
-        Cleans markdown artifacts and wraps long text properly.
+        Finishes the document. An in-memory document is written to `path`;
+        a streamed one is already at its destination.
         """
-        text = str(text)
+        if not self._in_memory:
+            self.close()
+            return
 
-        # Remove markdown artifacts
-        text = text.replace("###", "")
-        text = text.replace("##", "")
-        text = text.replace("**", "")
-        text = text.replace("#", "")
-        text = text.strip()
+        data = self.to_bytes()
+        with open(path, "wb") as f:
+            f.write(data)
 
-        wrapped_lines = []
-        for paragraph in text.split("\n"):
-            if paragraph.strip() == "":
-                wrapped_lines.append("")
-            else:
-                wrapped = textwrap.wrap(paragraph, width=95)
-                wrapped_lines.extend(wrapped)
+    # ----------------------------
+    # Text Cleaning
+    # ----------------------------
 
-        return wrapped_lines
+    @staticmethod
+    def _clean(text: str) -> str:
+        """Strips markdown heading and bold markers."""
+        return MARKDOWN_ARTIFACTS.sub("", str(text)).strip()
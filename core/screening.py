@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from core.analytics import TREND_MA_WINDOW, VOLATILITY_PERCENTILE_WINDOW, suggest_position_size
+
+
+REGIMES = np.array(["CONSTRUCTIVE", "CAUTION", "DEFENSIVE"])
+
+SUMMARY_COLUMNS = [
+    "data_available",
+    "time_period",
+    "trend",
+    "annualized_volatility",
+    "volatility_percentile",
+    "max_drawdown_pct",
+    "downtrend_days",
+    "recovery_probability_pct",
+    "observations",
+    "regime",
+    "risk_score",
+    "position_size_suggestion",
+]
+
+
+# -----------------------------------
+# Vectorized Scoring Rules
+# -----------------------------------
+def score_risk(downward, volatility, drawdown_pct) -> np.ndarray:
+    """Array form of the risk score in classify_risk_regime."""
+    downward = np.asarray(downward, dtype=bool)
+    volatility = np.asarray(volatility, dtype=float)
+    drawdown_pct = np.asarray(drawdown_pct, dtype=float)
+
+    score = np.where(downward, 2, 0)
+    score = score + np.select([volatility >= 0.40, volatility >= 0.30], [2, 1], 0)
+    score = score + np.select(
+        [drawdown_pct <= -60, drawdown_pct <= -40, drawdown_pct <= -25], [3, 2, 1], 0
+    )
+    return score
+
+
+def classify_regimes(risk_score) -> np.ndarray:
+    """Array form of the regime thresholds in classify_risk_regime."""
+    risk_score = np.asarray(risk_score)
+    return REGIMES[np.select([risk_score >= 5, risk_score >= 3], [2, 1], 0)]
+
+
+def estimate_recovery_probabilities(upward, drawdown_pct, vol_percentile) -> np.ndarray:
+    """Array form of estimate_recovery_probability."""
+    score = np.where(np.asarray(upward, dtype=bool), 2, 0)
+    score = score + (np.asarray(drawdown_pct) > -30) + (np.asarray(vol_percentile) < 50)
+    probability = np.maximum(np.minimum(score / 4 * 100, 100), 5)
+    return np.round(probability, 1)
+
+
+# -----------------------------------
+# Matrix Helpers
+# -----------------------------------
+def pack_to_bottom(values: np.ndarray):
+    """
+    Moves each column's observations to the bottom rows, preserving order.
+
+    Tickers that listed late or skip other venues' holidays then line up
+    row-for-row with their own history, so rolling windows see exactly
+    the bars a per-ticker computation would see.
+    """
+    valid = ~np.isnan(values)
+    order = np.argsort(valid, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), valid.sum(axis=0)
+
+
+def _trailing_true_run(mask: np.ndarray) -> np.ndarray:
+    reversed_mask = mask[::-1]
+    run = np.argmax(~reversed_mask, axis=0)
+    return np.where(reversed_mask.all(axis=0), mask.shape[0], run)
+
+
+def _percentile_of_last(series: np.ndarray) -> np.ndarray:
+    """pct-rank (average ties) of each column's last value, as a percentage."""
+    last = series[-1]
+    count = (~np.isnan(series)).sum(axis=0)
+    less = (series < last).sum(axis=0)
+    equal = (series == last).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = (less + (equal + 1) / 2) / count * 100
+    return np.where(np.isnan(last), np.nan, percentile)
+
+
+def _round_each(values, digits: int) -> np.ndarray:
+    # Python's round() so results match the per-ticker summary exactly.
+    return np.array([round(float(v), digits) for v in values])
+
+
+# -----------------------------------
+# Universe Screen
+# -----------------------------------
+def screen_universe(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the build_analysis_summary metrics, risk score, regime and
+    position size for every column of a dates x tickers close matrix.
+
+    Returns one row per ticker. Values match the per-ticker path up to the
+    rounding the summary applies.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    n_rows, n_cols = values.shape
+    packed, counts = pack_to_bottom(values)
+    columns = np.arange(n_cols)
+
+    first = packed[np.minimum(n_rows - counts, n_rows - 1), columns]
+    last = packed[-1]
+    upward = last > first
+
+    returns = packed[1:] / packed[:-1] - 1
+    valid_returns = ~np.isnan(returns)
+    n_returns = valid_returns.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid_returns, returns, 0).sum(axis=0) / n_returns
+        squares = np.where(valid_returns, (mean - returns) ** 2, 0)
+        volatility = np.sqrt(squares.sum(axis=0) / (n_returns - 1)) * np.sqrt(252)
+
+        running_max = np.fmax.accumulate(packed, axis=0)
+        drawdown = np.fmin.reduce(packed / running_max - 1, axis=0) * 100
+
+    returns_frame = pd.DataFrame(returns)
+    rolling_vol = (returns_frame.rolling(VOLATILITY_PERCENTILE_WINDOW).std() * np.sqrt(252)).to_numpy()
+    vol_percentile = _round_each(_percentile_of_last(rolling_vol), 2)
+
+    trend_ma = pd.DataFrame(packed).rolling(TREND_MA_WINDOW).mean().to_numpy()
+    downtrend_days = _trailing_true_run(packed < trend_ma)
+
+    annualized_volatility = _round_each(volatility, 3)
+    max_drawdown_pct = _round_each(drawdown, 2)
+
+    risk_score = score_risk(~upward, annualized_volatility, max_drawdown_pct)
+    regimes = classify_regimes(risk_score)
+    recovery = estimate_recovery_probabilities(upward, drawdown, vol_percentile)
+
+    valid = ~np.isnan(values)
+    first_pos = np.argmax(valid, axis=0)
+    last_pos = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+    dates = pd.DatetimeIndex(prices.index)
+    time_period = [
+        f"{dates[a].date()} to {dates[b].date()}" for a, b in zip(first_pos, last_pos)
+    ]
+
+    frame = pd.DataFrame(
+        {
+            "data_available": counts > 0,
+            "time_period": time_period,
+            "trend": np.where(upward, "upward", "downward"),
+            "annualized_volatility": annualized_volatility,
+            "volatility_percentile": vol_percentile,
+            "max_drawdown_pct": max_drawdown_pct,
+            "downtrend_days": downtrend_days,
+            "recovery_probability_pct": recovery,
+            "observations": counts,
+            "regime": regimes,
+            "risk_score": risk_score,
+            "position_size_suggestion": [suggest_position_size(r) for r in regimes],
+        },
+        index=prices.columns,
+    )
+    frame.index.name = "ticker"
+    return frame
+
+
+def screen_summaries(frame: pd.DataFrame) -> dict:
+    """Turns screen_universe rows back into build_analysis_summary-shaped dicts."""
+    summaries = {}
+
+    for ticker, row in frame.iterrows():
+        if not row["data_available"]:
+            summaries[ticker] = {
+                "ticker": ticker,
+                "data_available": False,
+                "message": "No historical market data available for this ticker.",
+            }
+            continue
+
+        summary = {"ticker": ticker}
+        for column in SUMMARY_COLUMNS:
+            value = row[column]
+            summary[column] = value.item() if isinstance(value, np.generic) else value
+        summaries[ticker] = summary
+
+    return summaries
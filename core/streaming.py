@@ -0,0 +1,402 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import pandas as pd
+
+from core.analytics import (
+    DEFAULT_PERIOD,
+    TREND_MA_WINDOW,
+    VOLATILITY_PERCENTILE_WINDOW,
+    classify_risk_regime,
+    estimate_recovery_probability,
+    suggest_position_size,
+)
+from core.data import period_cutoff, slice_period
+
+
+ANNUALIZATION = math.sqrt(252)
+
+
+# -----------------------------------
+# Running Accumulators
+# -----------------------------------
+class _RunningVariance:
+    """
+    Sample variance of a window that grows at the back and shrinks at the
+    front, with O(1) add/remove.
+
+    Follows the Kahan-compensated Welford updates pandas uses for
+    rolling().std(), so every window value is bit-identical to it.
+    """
+
+    def __init__(self):
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_run = 0
+        self.prev_value = math.nan
+
+    def add(self, value: float):
+        self.nobs += 1
+        if value == self.prev_value:
+            self.same_run += 1
+        else:
+            self.same_run = 1
+        self.prev_value = value
+
+        prev_mean = self.mean - self.comp_add
+        y = value - self.comp_add
+        t = y - self.mean
+        self.comp_add = t + self.mean - y
+        self.mean = self.mean + t / self.nobs
+        self.ssqdm = self.ssqdm + (value - prev_mean) * (value - self.mean)
+
+    def remove(self, value: float):
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean - self.comp_remove
+            y = value - self.comp_remove
+            t = y - self.mean
+            self.comp_remove = t + self.mean - y
+            self.mean = self.mean - t / self.nobs
+            self.ssqdm = self.ssqdm - (value - prev_mean) * (value - self.mean)
+        else:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+
+    @property
+    def std(self) -> float:
+        if self.nobs < 2:
+            return math.nan
+        if self.same_run >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self.ssqdm / (self.nobs - 1), 0.0))
+
+
+class _RollingVariance(_RunningVariance):
+    """Fixed-window sample variance, matching pandas rolling().std()."""
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self.values = deque()
+
+    def push(self, value: float) -> float:
+        """Slides the window forward by one value and returns its std."""
+        if len(self.values) == self.window:
+            self.remove(self.values.popleft())
+        self.values.append(value)
+        self.add(value)
+        return self.std if self.nobs == self.window else math.nan
+
+
+class _RollingMean:
+    """Fixed-window mean with O(1) updates, matching pandas rolling().mean()."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_count = 0
+        self.same_run = 0
+        self.prev_value = math.nan
+
+    def push(self, value: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            y = -old - self.comp_remove
+            t = self.total + y
+            self.comp_remove = t - self.total - y
+            self.total = t
+            if math.copysign(1.0, old) < 0:
+                self.neg_count -= 1
+
+        self.values.append(value)
+        y = value - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_count += 1
+        if value == self.prev_value:
+            self.same_run += 1
+        else:
+            self.same_run = 1
+        self.prev_value = value
+
+        nobs = len(self.values)
+        if nobs < self.window:
+            return math.nan
+
+        result = self.total / nobs
+        if self.same_run >= nobs:
+            result = self.prev_value
+        elif self.neg_count == 0 and result < 0:
+            result = 0.0
+        elif self.neg_count == nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class _OrderStatistics:
+    """
+    Sorted multiset of rolling-vol observations, kept as sorted blocks of
+    BLOCK to 2 * BLOCK values. Insert and remove cost O(log n + BLOCK +
+    n / BLOCK) rather than the O(n) shift of one flat sorted array, and
+    the percentile rank of a value is found by counting, never by
+    re-ranking.
+    """
+
+    BLOCK = 64
+
+    def __init__(self):
+        self.blocks = []
+        self.maxes = []
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if not self.blocks:
+            self.blocks.append([value])
+            self.maxes.append(value)
+            return
+
+        i = min(bisect_left(self.maxes, value), len(self.blocks) - 1)
+        block = self.blocks[i]
+        insort(block, value)
+        self.maxes[i] = block[-1]
+        if len(block) > 2 * self.BLOCK:
+            self.blocks[i:i + 1] = [block[:self.BLOCK], block[self.BLOCK:]]
+            self.maxes[i:i + 1] = [block[self.BLOCK - 1], block[-1]]
+
+    def remove(self, value: float):
+        """Removes one occurrence of a value previously added."""
+        i = bisect_left(self.maxes, value)
+        block = self.blocks[i]
+        del block[bisect_left(block, value)]
+        self.count -= 1
+        if block:
+            self.maxes[i] = block[-1]
+        else:
+            del self.blocks[i], self.maxes[i]
+
+    def _count_below(self, value: float, inclusive: bool) -> int:
+        find = bisect_right if inclusive else bisect_left
+        i = find(self.maxes, value)
+        below = sum(len(block) for block in self.blocks[:i])
+        return below + (find(self.blocks[i], value) if i < len(self.blocks) else 0)
+
+    def percentile(self, value: float) -> float:
+        less = self._count_below(value, inclusive=False)
+        equal = self._count_below(value, inclusive=True) - less
+        return (less + (equal + 1) / 2) / self.count * 100
+
+
+class _DrawdownWindow:
+    """
+    Maximum drawdown of a FIFO window of closes, O(1) amortized per push
+    and pop: a two-stack queue over (peak, trough, drawdown) segments.
+    Two adjacent segments combine as min(both drawdowns, newer trough /
+    older peak - 1). Division is monotonic, so the result is exactly
+    (close / cummax - 1).min() over the window.
+    """
+
+    def __init__(self):
+        self.front = []
+        self.back = []
+        self.back_segment = None
+
+    @staticmethod
+    def _combine(older, newer):
+        return (max(older[0], newer[0]), min(older[1], newer[1]),
+                min(older[2], newer[2], newer[1] / older[0] - 1))
+
+    def push(self, close: float):
+        leaf = (close, close, 0.0)
+        self.back.append(close)
+        self.back_segment = leaf if self.back_segment is None else self._combine(self.back_segment, leaf)
+
+    def pop(self):
+        if not self.front:
+            # front[-1] always covers the whole older segment, oldest bar first.
+            segment = None
+            for close in reversed(self.back):
+                leaf = (close, close, 0.0)
+                segment = leaf if segment is None else self._combine(leaf, segment)
+                self.front.append(segment)
+            self.back = []
+            self.back_segment = None
+        self.front.pop()
+
+    @property
+    def max_drawdown(self) -> float:
+        if not self.front:
+            return self.back_segment[2] if self.back_segment else math.nan
+        if self.back_segment is None:
+            return self.front[-1][2]
+        return self._combine(self.front[-1], self.back_segment)[2]
+
+
+# -----------------------------------
+# Per-ticker Incremental State
+# -----------------------------------
+class IncrementalAnalytics:
+    """
+    Streaming counterpart of build_analysis_summary.
+
+    The state covers the trailing `period` of bars (the slice the price
+    cache hands build_analysis_summary; None keeps every bar). Each bar
+    updates running accumulators in O(1) amortized and evicts the bars
+    that fell out of the period, apart from the O(sqrt n) insert and
+    remove in the vol order statistics. The summary agrees with
+    build_analysis_summary computed over the same bars.
+    """
+
+    def __init__(self, ticker: str, vol_window: int = VOLATILITY_PERCENTILE_WINDOW,
+                 ma_window: int = TREND_MA_WINDOW, period: str = DEFAULT_PERIOD):
+        self.ticker = ticker
+        self.vol_window = vol_window
+        self.ma_window = ma_window
+        self.period = period
+
+        # (date, close) of every bar in the period, with each bar's return
+        # and rolling vol once they exist.
+        self.bars = deque()
+        self.window_returns = deque()
+        self.window_vols = deque()
+
+        self.returns = _RunningVariance()
+        self.rolling_vol = _RollingVariance(vol_window)
+        self.moving_average = _RollingMean(ma_window)
+        self.vol_ranks = _OrderStatistics()
+        self.drawdowns = _DrawdownWindow()
+
+        self.current_vol = math.nan
+        self.below_ma_run = 0
+
+    @classmethod
+    def from_history(cls, ticker: str, hist: pd.DataFrame, **kwargs) -> "IncrementalAnalytics":
+        state = cls(ticker, **kwargs)
+        # Slicing up front leaves the same bars as evicting one at a time,
+        # without a calendar offset per bar.
+        if state.period and not hist.empty:
+            hist = slice_period(hist, state.period)
+        for date, close in zip(hist["date"], hist["close"].to_numpy()):
+            state._push(pd.Timestamp(date), float(close))
+        return state
+
+    @property
+    def observations(self) -> int:
+        return len(self.bars)
+
+    @property
+    def last_date(self):
+        return self.bars[-1][0] if self.bars else None
+
+    @property
+    def last_close(self):
+        return self.bars[-1][1] if self.bars else None
+
+    @property
+    def below_ma_streak(self) -> int:
+        # Bars whose average starts before the period have none in the slice.
+        return max(min(self.below_ma_run, len(self.bars) - self.ma_window + 1), 0)
+
+    def ingest(self, date, close: float):
+        """Folds one bar into the state without building a summary."""
+        date = pd.Timestamp(date)
+        self._push(date, close)
+
+        cutoff = period_cutoff(date, self.period) if self.period else None
+        while cutoff is not None and self.bars[0][0] < cutoff:
+            self._evict()
+
+    def _push(self, date: pd.Timestamp, close: float):
+        if self.bars:
+            daily_return = close / self.bars[-1][1] - 1
+            self.returns.add(daily_return)
+            self.window_returns.append(daily_return)
+
+            vol = self.rolling_vol.push(daily_return)
+            self.current_vol = vol * ANNUALIZATION
+            if not math.isnan(vol):
+                self.vol_ranks.add(self.current_vol)
+                self.window_vols.append(self.current_vol)
+
+        self.bars.append((date, close))
+        self.drawdowns.push(close)
+
+        ma = self.moving_average.push(close)
+        self.below_ma_run = self.below_ma_run + 1 if close < ma else 0
+
+    def _evict(self):
+        """Drops the oldest bar and the return and rolling vol that only it supported."""
+        self.bars.popleft()
+        self.drawdowns.pop()
+        if self.window_returns:
+            self.returns.remove(self.window_returns.popleft())
+
+        valid_vols = max(len(self.window_returns) - self.vol_window + 1, 0)
+        while len(self.window_vols) > valid_vols:
+            self.vol_ranks.remove(self.window_vols.popleft())
+
+    def revise(self, close: float):
+        """
+        Replaces the close of the last bar, e.g. a partial session bar that
+        was fetched again. Rebuilds the state from the retained bars.
+        """
+        bars = list(self.bars)
+        bars[-1] = (bars[-1][0], close)
+        self.__init__(self.ticker, self.vol_window, self.ma_window, self.period)
+        for date, bar_close in bars:
+            self._push(date, bar_close)
+
+    def update(self, date, close: float) -> dict:
+        """Ingests one new bar and returns the refreshed summary."""
+        self.ingest(date, close)
+        return self.summary()
+
+    def volatility_percentile(self) -> float:
+        if math.isnan(self.current_vol) or not self.window_vols:
+            return math.nan
+        return round(self.vol_ranks.percentile(self.current_vol), 2)
+
+    def summary(self) -> dict:
+        if not self.bars:
+            return {
+                "ticker": self.ticker,
+                "data_available": False,
+                "message": "No historical market data available for this ticker.",
+            }
+
+        first_date, first_close = self.bars[0]
+        last_date, last_close = self.bars[-1]
+        trend = "upward" if last_close > first_close else "downward"
+        vol_percentile = self.volatility_percentile()
+        max_drawdown = self.drawdowns.max_drawdown
+
+        summary = {
+            "ticker": self.ticker,
+            "data_available": True,
+            "time_period": f"{first_date.date()} to {last_date.date()}",
+            "trend": trend,
+            "annualized_volatility": round(float(self.returns.std * ANNUALIZATION), 3),
+            "volatility_percentile": vol_percentile,
+            "max_drawdown_pct": round(float(max_drawdown * 100), 2),
+            "downtrend_days": self.below_ma_streak,
+            "recovery_probability_pct": estimate_recovery_probability(
+                trend, max_drawdown * 100, vol_percentile
+            ),
+            "observations": len(self.bars),
+        }
+
+        regime_data = classify_risk_regime(summary)
+        summary.update(regime_data)
+        summary["position_size_suggestion"] = suggest_position_size(regime_data["regime"])
+
+        return summary
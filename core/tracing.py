@@ -0,0 +1,250 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+SUMMED_ATTRIBUTES = ("rows", "bytes", "input_tokens", "output_tokens")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# -----------------------------------
+# Spans
+# -----------------------------------
+class Span:
+    """One timed pipeline stage with free-form attributes."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "started_at",
+                 "duration_seconds", "status", "error")
+
+    def __init__(self, name: str, parent: "Span" = None, **attrs):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.duration_seconds = None
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status,
+            "error": self.error,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            **self.attrs,
+        }
+
+
+def current_span():
+    return _current_span.get()
+
+
+# -----------------------------------
+# Sinks
+# -----------------------------------
+class JsonlSink:
+    """Appends one JSON line per finished span."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def emit(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+class AggregatorSink:
+    """
+    Keeps per-stage latency samples in memory and reports
+    count, p50/p95/p99 and summed rows, bytes and tokens.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+            self.counts = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.totals = defaultdict(lambda: defaultdict(float))
+
+    def emit(self, span: Span):
+        self.record(span.name, span.duration_seconds, span.status, span.attrs)
+
+    def record(self, name: str, duration_seconds: float, status: str = "ok", attrs: dict = None):
+        attrs = attrs or {}
+        with self._lock:
+            self.samples[name].append(duration_seconds)
+            self.counts[name] += 1
+            if status != "ok":
+                self.errors[name] += 1
+            for attr in SUMMED_ATTRIBUTES:
+                value = attrs.get(attr)
+                if isinstance(value, (int, float)):
+                    self.totals[name][attr] += value
+
+    @staticmethod
+    def _percentile(ordered, q: float) -> float:
+        index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+        return round(ordered[index], 6)
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = {}
+            for name, samples in self.samples.items():
+                ordered = sorted(samples)
+                report[name] = {
+                    "count": self.counts[name],
+                    "errors": self.errors[name],
+                    "total_seconds": round(sum(ordered), 6),
+                    "p50_seconds": self._percentile(ordered, 0.50),
+                    "p95_seconds": self._percentile(ordered, 0.95),
+                    "p99_seconds": self._percentile(ordered, 0.99),
+                    "max_seconds": round(ordered[-1], 6),
+                    **{attr: total for attr, total in self.totals[name].items()},
+                }
+            return dict(sorted(report.items(), key=lambda item: -item[1]["total_seconds"]))
+
+
+# -----------------------------------
+# Tracer
+# -----------------------------------
+class Tracer:
+    """
+    Records spans and hands each finished one to every sink.
+
+    Stages named in `profile_stages` also run under cProfile and
+    tracemalloc; the span then carries the top functions by cumulative
+    time and the peak traced allocation. Only one stage is profiled at
+    a time, since both profilers are process-global.
+    """
+
+    def __init__(self, sinks=None, profile_stages=None, profile_limit: int = 25):
+        self.sinks = list(sinks or [])
+        self.profile_stages = set(profile_stages or [])
+        self.profile_limit = profile_limit
+        self._profiling = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    @contextmanager
+    def span(self, name: str, parent: Span = None, **attrs):
+        record = Span(name, parent or _current_span.get(), **attrs)
+        token = _current_span.set(record)
+
+        profiler = None
+        if name in self.profile_stages and self._profiling.acquire(blocking=False):
+            profiler = self._start_profile()
+
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record.status = "error"
+            record.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            record.duration_seconds = round(time.perf_counter() - started, 6)
+            if profiler is not None:
+                self._stop_profile(profiler, record)
+                self._profiling.release()
+            _current_span.reset(token)
+            for sink in self.sinks:
+                sink.emit(record)
+
+    def _start_profile(self):
+        owns_tracemalloc = not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, owns_tracemalloc
+
+    def _stop_profile(self, profiler, record: Span):
+        profiler, owns_tracemalloc = profiler
+        profiler.disable()
+        current, peak = tracemalloc.get_traced_memory()
+        if owns_tracemalloc:
+            tracemalloc.stop()
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.profile_limit)
+        record.set(profile=out.getvalue(), memory_peak_bytes=peak, memory_retained_bytes=current)
+
+
+def _tracer_from_env() -> Tracer:
+    tracer = Tracer(
+        profile_stages=[s.strip() for s in os.environ.get("FINANCE_PROFILE_STAGES", "").split(",") if s.strip()],
+    )
+    if os.environ.get("FINANCE_TRACE_FILE"):
+        tracer.add_sink(JsonlSink(os.environ["FINANCE_TRACE_FILE"]))
+    return tracer
+
+
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = _tracer_from_env()
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def summarize_trace(path: str) -> dict:
+    """Aggregates a JSONL trace file, including spans written by worker processes."""
+    aggregator = AggregatorSink(max_samples=None)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                aggregator.record(record["name"], record["duration_seconds"], record["status"], record)
+    return aggregator.stats()
+
+
+def span(name: str, **attrs):
+    """Opens a span on the process-wide tracer."""
+    return get_tracer().span(name, **attrs)
+
+
+def frame_bytes(frame) -> int:
+    return int(frame.memory_usage(index=True).sum()) if frame is not None else 0
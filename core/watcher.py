@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from core.data import get_price_cache
+from core.streaming import IncrementalAnalytics
+
+
+TRACKED_REGIMES = {"CONSTRUCTIVE", "CAUTION", "DEFENSIVE"}
+
+
+class RegimeWatcher:
+    """
+    Keeps the current regime and risk score for a watchlist in memory and
+    emits an event whenever a ticker moves between CONSTRUCTIVE, CAUTION
+    and DEFENSIVE.
+
+    Each refresh cycle only folds in bars dated after a ticker's last
+    ingested bar, so tickers without new data cost one cheap check. A
+    last bar that comes back with a different close (it was partial)
+    replaces the ingested one. Pull mode reads through the price cache,
+    topping up entries older than `max_age` seconds.
+    `memo_fn(ticker, summary)` (e.g. a committee memo) runs in the
+    background for transitions only. Every event is passed to the
+    `on_transition` callbacks.
+    """
+
+    def __init__(self, tickers, period: str = "5y", cache=None, memo_fn=None,
+                 on_transition=None, max_workers: int = 16, history_size: int = 100,
+                 max_age: float = 0):
+        self.tickers = list(tickers)
+        self.period = period
+        self.max_age = max_age
+        self.cache = cache or get_price_cache()
+        self.memo_fn = memo_fn
+        self.on_transition = list(on_transition or [])
+        self.max_workers = max_workers
+
+        self.states = {}
+        self.regimes = {}
+        self.cycles = deque(maxlen=history_size)
+        self.totals = {"cycles": 0, "bars": 0, "events": 0, "memos": 0}
+
+        self._memo_pool = ThreadPoolExecutor(max_workers=4) if memo_fn else None
+        self._stop = threading.Event()
+
+    # ----------------------------
+    # State
+    # ----------------------------
+
+    def _seed_one(self, ticker: str):
+        hist = self.cache.get(ticker, period=self.period)
+        if hist.empty:
+            return ticker, None
+        return ticker, IncrementalAnalytics.from_history(ticker, hist, period=self.period)
+
+    def seed(self):
+        """Builds the incremental state for every ticker from cached history."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for ticker, state in pool.map(self._seed_one, self.tickers):
+                if state is None:
+                    continue
+                self.states[ticker] = state
+                summary = state.summary()
+                self.regimes[ticker] = (summary["regime"], summary["risk_score"])
+
+    def _fetch_new_bars(self, ticker: str):
+        state = self.states.get(ticker)
+        if state is None:
+            return ticker, []
+
+        hist = self.cache.get(ticker, period=self.period, max_age=self.max_age)
+        if hist.empty:
+            return ticker, []
+
+        # The last ingested bar is returned too, so a corrected close replaces it.
+        fresh = hist[hist["date"] >= state.last_date]
+        return ticker, list(zip(fresh["date"], fresh["close"].astype(float)))
+
+    # ----------------------------
+    # Refresh Cycle
+    # ----------------------------
+
+    def refresh(self, updates: dict = None) -> list:
+        """
+        Runs one cycle and returns the transition events.
+
+        `updates` maps ticker -> [(date, close), ...] for push-style feeds.
+        Without it, new bars are pulled through the price cache.
+        """
+        started_at = time.time()
+        started = time.perf_counter()
+
+        if updates is None:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                updates = dict(pool.map(self._fetch_new_bars, list(self.states)))
+
+        events = []
+        bars = 0
+        revised = 0
+        updated = 0
+
+        for ticker, new_bars in updates.items():
+            state = self.states.get(ticker)
+            if state is None or not new_bars:
+                continue
+
+            changed = False
+            for date, close in new_bars:
+                date, close = pd.Timestamp(date), float(close)
+                if date < state.last_date:
+                    continue
+                if date == state.last_date:
+                    if close != state.last_close:
+                        state.revise(close)
+                        revised += 1
+                        changed = True
+                    continue
+                state.ingest(date, close)
+                bars += 1
+                changed = True
+
+            if not changed:
+                continue
+
+            updated += 1
+            summary = state.summary()
+            previous_regime, previous_score = self.regimes.get(ticker, (None, None))
+            self.regimes[ticker] = (summary["regime"], summary["risk_score"])
+
+            if previous_regime in TRACKED_REGIMES and summary["regime"] != previous_regime:
+                events.append(self._emit(ticker, previous_regime, previous_score, summary))
+
+        latency = time.perf_counter() - started
+        cycle = {
+            "started_at": started_at,
+            "tickers_tracked": len(self.states),
+            "tickers_updated": updated,
+            "bars_ingested": bars,
+            "bars_revised": revised,
+            "events": len(events),
+            "latency_seconds": round(latency, 6),
+            "bars_per_second": round(bars / latency, 1) if latency > 0 else None,
+        }
+        self.cycles.append(cycle)
+        self.totals["cycles"] += 1
+        self.totals["bars"] += bars
+        self.totals["events"] += len(events)
+
+        return events
+
+    def _emit(self, ticker: str, previous_regime: str, previous_score, summary: dict) -> dict:
+        event = {
+            "ticker": ticker,
+            "date": str(pd.Timestamp(self.states[ticker].last_date).date()),
+            "from_regime": previous_regime,
+            "to_regime": summary["regime"],
+            "from_risk_score": previous_score,
+            "to_risk_score": summary["risk_score"],
+            "summary": summary,
+            "memo": None,
+        }
+
+        if self._memo_pool is not None:
+            event["memo"] = self._memo_pool.submit(self.memo_fn, ticker, summary)
+            self.totals["memos"] += 1
+
+        for callback in self.on_transition:
+            callback(event)
+
+        return event
+
+    # ----------------------------
+    # Service Loop
+    # ----------------------------
+
+    def run_forever(self, interval_seconds: float = 60.0):
+        if not self.states:
+            self.seed()
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(interval_seconds)
+
+    def stop(self):
+        self._stop.set()
+        if self._memo_pool is not None:
+            self._memo_pool.shutdown(wait=False)
+
+    def metrics(self) -> dict:
+        latencies = sorted(c["latency_seconds"] for c in self.cycles)
+        return {
+            **self.totals,
+            "tickers_tracked": len(self.states),
+            "last_cycle": self.cycles[-1] if self.cycles else None,
+            "p50_cycle_latency_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "max_cycle_latency_seconds": latencies[-1] if latencies else None,
+        }
@@ -1,48 +1,283 @@
-import os
-from agents.finance_agent_team import run_financial_intelligence
-from core.analytics import fetch_history
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
 from core.charts import (
-    plot_price_with_ma,
-    plot_volume,
-    plot_rolling_volatility,
-    plot_drawdown,
-    plot_returns_distribution,
+    CHART_RENDERERS,
+    render_chart,
+    render_charts,
+    render_correlation_heatmap,
+    render_portfolio_performance,
+    render_small_multiples,
 )
+from core.portfolio import DEFAULT_IO_WORKERS, PortfolioContext, build_portfolio_summary
+from core.pipeline import CANCEL, THREAD, Pipeline
 from core.reports import ReportBuilder
+from core.tracing import span
+
+
+HOLDING_COLUMNS = [
+    ("Ticker", "ticker", 18),
+    ("Weight %", "weight_pct", 16),
+    ("Regime", "regime", 26),
+    ("Risk", "risk_score", 10),
+    ("Trend", "trend", 18),
+    ("Vol", "annualized_volatility", 14),
+    ("Drawdown %", "max_drawdown_pct", 20),
+    ("Vol Pctl", "volatility_percentile", 16),
+    ("Down Days", "downtrend_days", 16),
+    ("Recov. %", "recovery_probability_pct", 16),
+]
+
+SUMMARY_LABELS = [
+    ("Time period", "time_period"),
+    ("Trend", "trend"),
+    ("Annualized volatility", "annualized_volatility"),
+    ("Volatility percentile", "volatility_percentile"),
+    ("Max drawdown %", "max_drawdown_pct"),
+    ("Downtrend days", "downtrend_days"),
+    ("Recovery probability %", "recovery_probability_pct"),
+    ("Risk score", "risk_score"),
+    ("Regime", "regime"),
+    ("Observations", "observations"),
+]
 
 
-def generate_report(ticker: str, output_path: str):
+def build_report_pdf(ticker: str, context: AnalysisContext, result: dict, output=None,
+                     label: str = None, charts: dict = None):
+    """
+    Lays out the research packet. Pages stream to `output` (a path or a
+    binary file-like object) as they fill; with no output the PDF bytes
+    are returned.
+    """
 
-    result = run_financial_intelligence(ticker)
     summary = result["analysis_summary"]
     narrative = result["agent_narrative"]
     reasoning_log = result["reasoning_log"]
 
-    rb = ReportBuilder()
-    rb.add_title(f"Financial Intelligence Report: {ticker}")
+    title = f"Financial Intelligence Report: {ticker}"
+    if label:
+        title += f" ({label})"
+
+    if summary.get("data_available", False) and charts is None:
+        charts = render_charts(context)
+
+    with span("pdf.layout", ticker=ticker) as stage:
+        rb = ReportBuilder(output)
+        rb.add_title(title)
+
+        rb.add_section("Executive Summary", narrative)
+
+        if summary.get("data_available", False):
+            for png in charts.values():
+                rb.add_image(png)
+            stage.set(images=len(charts), bytes=sum(len(png) for png in charts.values()))
+
+        else:
+            rb.add_section("Data Availability", summary.get("message"))
+
+        rb.add_reasoning_log(reasoning_log)
+
+    return _finish(rb, output, ticker=ticker)
+
+
+def _finish(rb: ReportBuilder, output, **attrs):
+    with span("pdf.write", **attrs) as stage:
+        if output is None:
+            data = rb.to_bytes()
+            stage.set(bytes=len(data))
+            return data
+        rb.close()
+        stage.set(bytes=rb.pdf.bytes_written)
+
+
+# -----------------------------------
+# Report Pipeline
+# -----------------------------------
+def _load_context(ticker: str) -> AnalysisContext:
+    return AnalysisContext.load(ticker)
+
+
+def _summarize(ticker: str, context: AnalysisContext) -> dict:
+    return build_analysis_summary(ticker, context=context)
+
+
+def _debate(ticker: str, context: AnalysisContext, summary: dict, cancel, **options) -> dict:
+    from agents.finance_agent_team import run_financial_intelligence
+
+    return run_financial_intelligence(ticker, context=context, cancel=cancel, **options)
+
+
+def _chart(name: str, context: AnalysisContext, summary: dict):
+    if not summary.get("data_available", False):
+        return None
+    return render_chart(context, name)
+
+
+def _layout(ticker: str, context: AnalysisContext, result: dict, output, label: str, **charts):
+    charts = {name: charts[f"chart.{name}"] for name in CHART_RENDERERS}
+    return build_report_pdf(ticker, context, result, output, label=label, charts=charts)
+
+
+def report_pipeline(chart_kind: str = THREAD, **debate_options) -> Pipeline:
+    """
+    The single-ticker report as a stage graph: context, then summary,
+    then the committee debate ("result") alongside one stage per chart,
+    then the PDF. Charts need only the history, so they render while
+    the committee debates (validation runs inside the debate stage), and
+    a failed chart stops the debate's model calls. Inputs are
+    "ticker", "output" and "label"; supplying "context" or "result"
+    skips those stages. `chart_kind="process"` renders charts on a
+    process pool. `debate_options` go to run_financial_intelligence.
+    """
+    chart_stages = [f"chart.{name}" for name in CHART_RENDERERS]
+
+    pipeline = Pipeline()
+    pipeline.add("context", _load_context, deps=["ticker"])
+    pipeline.add("summary", _summarize, deps=["ticker", "context"])
+    pipeline.add("result", partial(_debate, **debate_options), deps=["ticker", "context", "summary", CANCEL])
+    for name, stage in zip(CHART_RENDERERS, chart_stages):
+        pipeline.add(stage, partial(_chart, name), deps=["context", "summary"], kind=chart_kind)
+    pipeline.add("pdf", _layout, deps=["ticker", "context", "result", "output", "label", *chart_stages])
+    return pipeline
+
+
+def generate_report(ticker: str, output=None, context: AnalysisContext = None, result: dict = None,
+                    label: str = None):
+
+    inputs = {"ticker": ticker, "output": output, "label": label}
+    if context is not None:
+        inputs["context"] = context
+    if result is not None:
+        inputs["result"] = result
+
+    return report_pipeline().run(inputs)["pdf"]
+
+
+# -----------------------------------
+# Portfolio Packet
+# -----------------------------------
+def render_portfolio_charts(portfolio: PortfolioContext, summary: dict) -> dict:
+    """Book-level charts plus one small-multiples image per page of holdings."""
+    regimes = {row["ticker"]: row.get("regime", "NO_DATA") for row in summary["holdings"]}
+    charts = {}
+
+    with span("chart.render", chart="portfolio_performance", tickers=len(regimes)):
+        if summary["portfolio"]["data_available"]:
+            charts["performance"] = render_portfolio_performance(portfolio.nav, portfolio.drawdown)
+
+    with span("chart.render", chart="correlation", tickers=len(regimes)):
+        if len(regimes) > 1:
+            charts["correlation"] = render_correlation_heatmap(summary["correlation"])
+
+    with span("chart.render", chart="small_multiples", tickers=len(regimes)) as stage:
+        charts["small_multiples"] = render_small_multiples(portfolio.contexts, regimes)
+        stage.set(images=len(charts["small_multiples"]))
+
+    return charts
+
+
+def _portfolio_overview(risk: dict, holdings: int) -> str:
+    if not risk["data_available"]:
+        return "Not enough overlapping history to measure the portfolio."
+    return (
+        f"{holdings} holdings over {risk['time_period']} ({risk['observations']} trading days), "
+        f"rebalanced daily to target weights. Total return {risk['total_return_pct']}%, "
+        f"annualized volatility {risk['annualized_volatility']}, "
+        f"maximum drawdown {risk['max_drawdown_pct']}%. "
+        f"Weighted average holding volatility is {risk['weighted_average_volatility']} "
+        f"(diversification ratio {risk['diversification_ratio']}); "
+        f"average pairwise correlation is {risk['average_correlation']}."
+    )
+
+
+def build_portfolio_pdf(portfolio: PortfolioContext, output=None, title: str = None,
+                        summary: dict = None, charts: dict = None, results: dict = None):
+    """
+    One packet for a whole book: shared summary tables, book-level
+    charts, small multiples and a short appendix per holding. `results`
+    optionally maps tickers to run_financial_intelligence results, whose
+    memos are added to the appendices.
+    """
+    summary = summary or build_portfolio_summary(portfolio)
+    charts = charts or render_portfolio_charts(portfolio, summary)
+    results = results or {}
+    holdings = summary["holdings"]
+
+    with span("pdf.layout", tickers=len(holdings)) as stage:
+        rb = ReportBuilder(output)
+        rb.add_title(title or f"Portfolio Research Packet: {len(holdings)} Holdings")
+
+        rb.add_section("Portfolio Overview", _portfolio_overview(summary["portfolio"], len(holdings)))
+
+        rb.add_heading("Regime Breakdown by Weight")
+        rb.add_table(
+            ["Regime", "Holdings", "Weight %", "Tickers"],
+            [[row["regime"], row["holdings"], row["weight_pct"], ", ".join(row["tickers"])]
+             for row in summary["regime_breakdown"]],
+            widths=[30, 20, 20, 110], align="LRRL",
+        )
+
+        rb.add_heading("Holdings")
+        rb.add_table(
+            [header for header, _, _ in HOLDING_COLUMNS],
+            [[row.get(key) for _, key, _ in HOLDING_COLUMNS] for row in holdings],
+            widths=[width for _, _, width in HOLDING_COLUMNS], align="LRLRLRRRRR",
+        )
+
+        for name in ("performance", "correlation"):
+            if name in charts:
+                rb.add_image(charts[name])
+
+        # A 10 x 7.5 in grid page placed 170 mm wide.
+        rb.add_heading("Price Small Multiples (rebased to 100, dashed: 200-day average)", keep_with=132)
+        for png in charts["small_multiples"]:
+            rb.add_image(png)
+
+        for row in holdings:
+            ticker = row["ticker"]
+            if not row["data_available"]:
+                rb.add_heading(f"Appendix: {ticker}")
+                rb.add_section("Data Availability", row.get("message"))
+                continue
+
+            metrics = [[label, row.get(key)] for label, key in SUMMARY_LABELS] + [["Weight %", row["weight_pct"]]]
+            rb.add_heading(f"Appendix: {ticker}", keep_with=5 * (len(metrics) + 2))
+            rb.add_table(["Metric", "Value"], metrics, widths=[60, 60], align="LR")
+            rb.add_section("Position Sizing", row["position_size_suggestion"])
+            if ticker in results:
+                rb.add_section("Committee Memo", results[ticker]["agent_narrative"])
+
+        stage.set(images=len(charts["small_multiples"]) + len(charts) - 1)
+
+    return _finish(rb, output, tickers=len(holdings))
 
-    rb.add_section("Executive Summary", narrative)
 
-    if summary.get("data_available", False):
+def generate_portfolio_report(weights, output=None, period: str = "5y", title: str = None,
+                              with_committee: bool = False):
+    """
+    Loads every holding once and lays out the portfolio packet.
+    `with_committee` also runs the investment committee per holding,
+    concurrently, reusing the summaries the screen already produced.
+    """
+    portfolio = PortfolioContext.load(weights, period=period)
+    summary = build_portfolio_summary(portfolio)
 
-        hist = fetch_history(ticker)
+    results = None
+    if with_committee:
+        from agents.finance_agent_team import run_financial_intelligence
 
-        chart_functions = {
-            "price_ma.png": plot_price_with_ma,
-            "volume.png": plot_volume,
-            "volatility.png": plot_rolling_volatility,
-            "drawdown.png": plot_drawdown,
-            "returns_dist.png": plot_returns_distribution,
-        }
+        tickers = [row["ticker"] for row in summary["holdings"] if row["data_available"]]
+        with ThreadPoolExecutor(max_workers=DEFAULT_IO_WORKERS) as pool:
+            memos = pool.map(lambda t: run_financial_intelligence(t, context=portfolio.contexts[t]), tickers)
+            results = dict(zip(tickers, memos))
 
-        for filename, func in chart_functions.items():
-            func(hist, filename)
-            rb.add_image(filename)
-            os.remove(filename)
+    return build_portfolio_pdf(portfolio, output, title=title, summary=summary, results=results)
 
-    else:
-        rb.add_section("Data Availability", summary.get("message"))
 
-    rb.add_reasoning_log(reasoning_log)
+def run(companies, **options):
+    """Generates reports for (ticker, label) pairs; see batch.run_batch for options."""
+    from batch import run_batch
 
-    rb.save(output_path)
+    return run_batch(companies, **options)
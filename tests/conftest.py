@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.synthetic import synthetic_universe
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    """
+    Process-wide caches and stores pointed at tmp_path, prices served from
+    a synthetic fixture universe and a MockChat committee without backoff.
+    Everything is restored when the test ends.
+    """
+    import agents.finance_agent_team as team
+    import agents.narrative_cache as narrative_cache
+    import agents.session_store as session_store
+    import core.archive as archive
+    import core.data as data
+    from agents.mock_model import mock_model_factory
+
+    universe = synthetic_universe(4, 3)
+    provider = data.FixtureProvider(universe)
+    committee = team.InvestmentCommittee(mock_model_factory(), backoff=0, rate_limit_backoff=0)
+
+    monkeypatch.setattr(data, "_default_cache", data.PriceCache(tmp_path / "prices", provider))
+    monkeypatch.setattr(narrative_cache, "_default_cache", narrative_cache.NarrativeCache(tmp_path / "narratives"))
+    monkeypatch.setattr(session_store, "_default_store", session_store.SessionStore(tmp_path / "sessions.db"))
+    monkeypatch.setattr(archive, "_default_archive", archive.ResultArchive(tmp_path / "archive"))
+    monkeypatch.setattr(team, "_committee", committee)
+
+    yield SimpleNamespace(tickers=list(universe), universe=universe, provider=provider, committee=committee,
+                          root=tmp_path)
+    session_store._default_store.close()
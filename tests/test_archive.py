@@ -0,0 +1,209 @@
+import json
+import shutil
+import threading
+
+import numpy as np
+import pytest
+
+import batch
+import core.archive as archive_module
+from benchmarks.synthetic import synthetic_history
+from core.archive import (
+    METRIC_COLUMNS,
+    ResultArchive,
+    compare_runs,
+    get_result_archive,
+    regime_transitions,
+)
+from core.context import AnalysisContext
+from core.data import normalize_history
+
+
+def _result(ticker: str, regime: str = "CAUTION", score: float = 90.0) -> dict:
+    return {
+        "analysis_summary": {"ticker": ticker, "time_period": "2020-01-02 to 2024-12-31", "regime": regime,
+                             "risk_score": 4, "trend": "downward", "annualized_volatility": 0.41,
+                             "max_drawdown_pct": -38.2, "observations": 1260},
+        "agent_narrative": f"Memo for {ticker} in {regime}.",
+        "consistency_score": score,
+        "validation": {"fabricated_numbers_detected": False, "regime_conflict": False,
+                       "allocation_conflict": False, "validation_notes": []},
+        "observability": {"runtime_seconds": 1.5, "narrative_cache": "miss",
+                          "token_usage": {"input_tokens": 900, "output_tokens": 300}},
+    }
+
+
+@pytest.fixture(scope="module")
+def context():
+    return AnalysisContext("SYN", normalize_history(synthetic_history("SYN", 1, seed=3)))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ResultArchive(tmp_path / "archive")
+
+
+def _parts(archive: ResultArchive) -> dict:
+    return {d.name: sorted(p.name for p in d.iterdir()) for d in (archive.runs_dir, archive.series_dir)}
+
+
+# -----------------------------------
+# Append and Read
+# -----------------------------------
+def test_runs_round_trip(archive, context):
+    run_ids = archive.append([("SYN", "Synthetic", _result("SYN"), context), ("ALT", None, _result("ALT"), None)])
+    runs = archive.runs()
+
+    assert list(runs["run_id"]) == run_ids and list(runs.columns) == METRIC_COLUMNS
+    row = runs.iloc[0]
+    assert (row["ticker"], row["label"], row["regime"], row["input_tokens"]) == ("SYN", "Synthetic", "CAUTION", 900)
+    assert str(row["as_of"].date()) == "2024-12-31"
+    assert archive.runs(columns=["ticker", "narrative"])["narrative"].tolist() == ["Memo for SYN in CAUTION.",
+                                                                                  "Memo for ALT in CAUTION."]
+    assert archive.runs(tickers=["ALT"])["run_id"].tolist() == run_ids[1:]
+    assert archive.runs(since="2100-01-01").empty
+
+
+def test_series_match_the_context(archive, context):
+    run_id, = archive.append([("SYN", None, _result("SYN"), context)])
+    series = archive.series(run_ids=[run_id])
+
+    assert len(series) == len(context.hist)
+    np.testing.assert_allclose(series["close"], context.close)
+    np.testing.assert_allclose(series["drawdown"], context.drawdown)
+    assert archive.series(tickers=["NONE"]).empty
+
+
+def test_empty_archive(archive):
+    assert archive.runs().empty and list(archive.runs().columns) == METRIC_COLUMNS
+    assert archive.series().empty and archive.append([]) == []
+
+
+def test_version_mismatch_is_refused(archive):
+    archive.manifest_path.write_text(json.dumps({"version": 99}))
+    with pytest.raises(ValueError, match="version 99"):
+        ResultArchive(archive.root)
+
+
+def test_concurrent_appends_keep_every_batch(archive, context):
+    def append(worker):
+        for i in range(5):
+            archive.append([(f"T{worker}", None, _result(f"T{worker}"), context)])
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(archive.runs()) == 20 and len(archive.series()) == 20 * len(context.hist)
+    assert not list(archive.root.rglob("*.tmp"))
+
+
+# -----------------------------------
+# Compaction
+# -----------------------------------
+def test_compact_merges_parts_without_losing_rows(archive, context):
+    for ticker in ("A", "B", "C"):
+        archive.append([(ticker, None, _result(ticker), context)])
+    before, series = archive.runs(), archive.series()
+
+    assert archive.compact() == {"runs": 3, "series": 3}
+    assert {name: len(parts) for name, parts in _parts(archive).items()} == {"runs": 1, "series": 1}
+    assert archive.runs().equals(before) and archive.series().equals(series)
+    assert archive.compact() == {"runs": 1, "series": 1}
+
+
+def test_reads_during_compaction_never_count_rows_twice(archive, context, monkeypatch):
+    for ticker in ("A", "B"):
+        archive.append([(ticker, None, _result(ticker), context)])
+    seen = []
+
+    # Read between each step of compaction: recording the merge, writing
+    # the merged part and deleting the old parts.
+    real_write = archive_module._write_atomic
+
+    def write_and_read(path, write):
+        real_write(path, write)
+        seen.append((len(archive.runs()), len(archive.series())))
+
+    monkeypatch.setattr(archive_module, "_write_atomic", write_and_read)
+    archive.compact()
+
+    assert len(seen) == 4 and set(seen) == {(2, 2 * len(context.hist))}
+
+
+def test_interrupted_compaction_is_finished_next_time(archive, context, tmp_path):
+    for ticker in ("A", "B"):
+        archive.append([(ticker, None, _result(ticker), context)])
+    old = _parts(archive)
+    saved = {name: tmp_path / name for name in old}
+    for name, parts in old.items():
+        saved[name].mkdir()
+        for part in parts:
+            shutil.copy(archive.root / name / part, saved[name] / part)
+
+    archive.compact()
+    # Put the old parts back, as if the process died before deleting them.
+    for name, parts in old.items():
+        for part in parts:
+            shutil.copy(saved[name] / part, archive.root / name / part)
+
+    assert len(archive.runs()) == 2
+    archive.compact()
+    assert {name: len(parts) for name, parts in _parts(archive).items()} == {"runs": 1, "series": 1}
+    assert json.loads(archive.manifest_path.read_text())["compacted"] == {}
+
+
+def test_reads_retry_when_a_part_disappears():
+    calls = []
+
+    def scan():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FileNotFoundError("part-1.parquet")
+        return "table"
+
+    assert archive_module._read_parts(scan) == "table" and len(calls) == 2
+
+
+# -----------------------------------
+# Queries
+# -----------------------------------
+def test_regime_transitions_and_comparison(archive):
+    for regime, score in (("CAUTION", 90.0), ("CAUTION", 80.0), ("DEFENSIVE", 70.0)):
+        archive.append([("SYN", None, _result("SYN", regime, score), None)])
+    archive.append([("ALT", None, _result("ALT", "DEFENSIVE"), None)])
+    runs = archive.runs()
+
+    transitions = regime_transitions(runs)
+    assert transitions[["ticker", "previous_regime", "regime"]].values.tolist() == [["SYN", "CAUTION", "DEFENSIVE"]]
+    table = compare_runs(runs)
+    assert table.loc["CAUTION", "mean_consistency"] == 85.0 and table.loc["DEFENSIVE", "tickers"] == 2
+    assert archive.latest()["regime"].tolist() == ["DEFENSIVE", "DEFENSIVE"]
+
+
+# -----------------------------------
+# Batches
+# -----------------------------------
+def test_batch_archives_its_debates(offline, tmp_path):
+    companies = [(ticker, "Synthetic") for ticker in offline.tickers[:2]]
+    manifest = batch.run_batch(companies, output_dir=tmp_path / "reports", retries=0, render_workers=1)
+
+    assert manifest["archive_error"] is None
+    runs = get_result_archive().runs()
+    assert sorted(runs["ticker"]) == sorted(offline.tickers[:2])
+    assert len(get_result_archive().series()) > 0
+
+
+def test_batch_keeps_its_manifest_when_archiving_fails(offline, tmp_path, monkeypatch):
+    def broken(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(get_result_archive(), "append", broken)
+    manifest = batch.run_batch([(offline.tickers[0], "Synthetic")], output_dir=tmp_path / "reports",
+                               retries=0, render_workers=1)
+
+    assert manifest["succeeded"] == 1 and manifest["archive_error"] == "OSError: disk full"
+    with open(tmp_path / "reports" / "batch_manifest.json") as f:
+        assert json.load(f)["archive_error"] == "OSError: disk full"
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_close_matrix
+from core.analytics import build_analysis_summary
+from core.backtest import _rolling_max_drawdown, backtest_regimes, regime_time_series
+from core.context import AnalysisContext
+
+
+FLAT_WEIGHTS = {"CONSTRUCTIVE": 0.5, "CAUTION": 0.5, "DEFENSIVE": 0.5}
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return synthetic_close_matrix(3, 3)
+
+
+def _close_frame(close: pd.Series) -> pd.DataFrame:
+    close = close.dropna()
+    return pd.DataFrame({"date": close.index, "close": close.to_numpy()})
+
+
+# -----------------------------------
+# Regime Time Series
+# -----------------------------------
+def test_rolling_max_drawdown_matches_direct_scan():
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.02, (400, 2)), axis=0))
+    result = _rolling_max_drawdown(close, 50)
+
+    for row in (0, 49, 50, 173, 399):
+        window = pd.DataFrame(close[max(row - 49, 0):row + 1])
+        assert np.array_equal(result[row], (window / window.cummax() - 1).min().to_numpy())
+
+
+def test_trailing_window_matches_summary(prices):
+    lookback = 400
+    series = regime_time_series(prices, lookback=lookback)
+    ticker = prices.columns[0]
+
+    for row in (lookback - 1, 555, len(prices) - 1):
+        window = _close_frame(prices[ticker].iloc[row - lookback + 1:row + 1])
+        summary = build_analysis_summary(ticker, AnalysisContext(ticker, window))
+        for field in ("annualized_volatility", "max_drawdown_pct", "volatility_percentile",
+                      "downtrend_days", "risk_score", "regime"):
+            assert series[field][ticker].iloc[row] == summary[field], field
+
+
+def test_series_use_only_past_bars(prices):
+    full = regime_time_series(prices)
+    truncated = regime_time_series(prices.iloc[:500])
+    for field, frame in truncated.items():
+        pd.testing.assert_frame_equal(frame, full[field].iloc[:500], check_dtype=False)
+
+
+# -----------------------------------
+# Allocation Backtest
+# -----------------------------------
+def test_weights_are_applied_the_next_day(prices):
+    result = backtest_regimes(prices)
+    returns = prices.pct_change(fill_method=None).fillna(0.0)
+    expected = result["weights"].shift(1).fillna(0.0) * returns
+    pd.testing.assert_frame_equal(result["pnl"], expected)
+
+
+def test_calendar_gaps_do_not_change_equity(prices):
+    clean = prices.iloc[:, 0].copy()
+    gap_days = list(range(300, 700, 41))
+    # Flat on the gap days, so dropping those bars removes no information.
+    for day in gap_days:
+        clean.iloc[day] = clean.iloc[day - 1]
+    gapped = clean.copy()
+    gapped.iloc[gap_days] = np.nan
+
+    result = backtest_regimes(pd.DataFrame({"CLEAN": clean, "GAPPED": gapped}), weights=FLAT_WEIGHTS)
+    equity = result["equity"]
+    assert np.allclose(equity["CLEAN"], equity["GAPPED"], rtol=1e-12)
+    assert result["weights"]["GAPPED"].iloc[gap_days].eq(0.5).all()
+
+
+def test_return_spanning_a_gap_is_earned(prices):
+    gapped = prices.iloc[:, :1].copy()
+    gapped.iloc[400, 0] = np.nan
+    result = backtest_regimes(gapped, weights=FLAT_WEIGHTS)
+
+    close = gapped.iloc[:, 0]
+    assert result["pnl"].iloc[400, 0] == 0.0
+    assert result["pnl"].iloc[401, 0] == pytest.approx(0.5 * (close.iloc[401] / close.iloc[399] - 1))
+
+
+def test_no_exposure_before_listing_or_after_delisting(prices):
+    window = prices.iloc[:, :2].copy()
+    window.iloc[:200, 0] = np.nan
+    window.iloc[-100:, 1] = np.nan
+    weights = backtest_regimes(window, weights=FLAT_WEIGHTS)["weights"]
+
+    assert weights.iloc[:200, 0].eq(0.0).all() and weights.iloc[-100:, 1].eq(0.0).all()
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import batch
+from batch import report_filename, run_batch, with_retries
+
+
+def test_with_retries_counts_attempts():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("try again")
+        return "ok"
+
+    assert with_retries(flaky, retries=2, backoff=0) == ("ok", 3)
+
+    calls.clear()
+    with pytest.raises(ConnectionError):
+        with_retries(flaky, retries=1, backoff=0)
+    assert len(calls) == 2
+
+
+def test_report_filename_is_filesystem_safe():
+    assert report_filename("AAPL", "Apple Inc.") == "AAPL_Apple_Inc_institutional_report.pdf"
+    assert report_filename("AAPL", "///") == "AAPL_institutional_report.pdf"
+
+
+def test_run_batch_writes_reports_and_manifest(offline, tmp_path):
+    companies = [(ticker, f"Company {i}") for i, ticker in enumerate(offline.tickers[:2])]
+    manifest = run_batch(companies, output_dir=tmp_path / "reports", retries=0, render_workers=2)
+
+    assert manifest["succeeded"] == 2 and manifest["failed"] == 0
+    for entry in manifest["reports"]:
+        assert entry["status"] == "ok"
+        with open(entry["output_path"], "rb") as f:
+            assert f.read(5) == b"%PDF-"
+        assert {"fetch_seconds", "debate_seconds", "render_seconds"} <= set(entry["timings"])
+
+    with open(tmp_path / "reports" / "batch_manifest.json") as f:
+        assert json.load(f)["succeeded"] == 2
+
+
+def test_run_batch_isolates_failing_tickers(offline, tmp_path, monkeypatch):
+    real_analyze = batch._analyze
+
+    def analyze(key, ticker, *args):
+        if ticker == offline.tickers[0]:
+            raise RuntimeError("provider down")
+        return real_analyze(key, ticker, *args)
+
+    monkeypatch.setattr(batch, "_analyze", analyze)
+    companies = [(ticker, "Synthetic") for ticker in offline.tickers[:2]]
+    manifest = run_batch(companies, output_dir=tmp_path / "reports", retries=0, render_workers=1)
+
+    failed, ok = manifest["reports"]
+    assert failed["status"] == "failed" and "provider down" in failed["error"]
+    assert ok["status"] == "ok"
@@ -0,0 +1,110 @@
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.harness import BenchmarkRun, compare, load_results, measure, save_results
+from benchmarks.run import main
+from benchmarks.synthetic import (
+    synthetic_close_matrix,
+    synthetic_history,
+    synthetic_intraday,
+    synthetic_narrative,
+)
+
+
+# -----------------------------------
+# Synthetic Data
+# -----------------------------------
+def test_synthetic_history_is_deterministic_and_well_formed():
+    hist = synthetic_history("SYN", 2)
+
+    pd.testing.assert_frame_equal(hist, synthetic_history("SYN", 2))
+    assert not hist.equals(synthetic_history("OTHER", 2))
+    assert not hist.equals(synthetic_history("SYN", 2, seed=1))
+    assert len(hist) == 504 and hist.index[-1] == pd.Timestamp("2024-12-31")
+    assert (hist["High"] >= hist[["Open", "Close"]].max(axis=1)).all()
+    assert (hist["Low"] <= hist[["Open", "Close"]].min(axis=1)).all()
+
+
+def test_synthetic_intraday_covers_the_regular_session():
+    bars = synthetic_intraday("SYN", years=0.01, minutes=5)
+    times = bars.index.strftime("%H:%M")
+    assert str(bars.index.tz) == "America/New_York"
+    assert times.min() == "09:30" and times.max() == "15:55" and len(bars) == 3 * 78
+
+
+def test_close_matrix_and_narrative():
+    matrix = synthetic_close_matrix(3, 1)
+    assert matrix.shape == (252, 3) and not matrix.isna().any().any()
+
+    summary = {"annualized_volatility": 0.312, "max_drawdown_pct": -27.5}
+    narrative = synthetic_narrative(summary, paragraphs=3)
+    assert narrative.count("0.312") == 3 and narrative.count("\n\n") == 2
+
+
+# -----------------------------------
+# Harness
+# -----------------------------------
+def test_measure_runs_setup_per_sample_outside_the_timing():
+    calls = []
+    result = measure(lambda x: calls.append(x), setup=lambda: (len(calls),), repeat=4, warmup=2)
+
+    assert calls == list(range(6))
+    assert result["repeat"] == 4 and result["min_seconds"] <= result["median_seconds"] <= result["max_seconds"]
+
+
+def test_run_records_throughput():
+    run = BenchmarkRun("quick", repeat=2, verbose=False)
+    run.case("noop", lambda: None, items=100, rows=5)
+
+    result = run.to_dict()["results"]["noop"]
+    assert result["params"] == {"rows": 5} and result["items"] == 100
+
+
+def _run(**medians) -> dict:
+    return {"results": {name: {"median_seconds": seconds} for name, seconds in medians.items()}}
+
+
+def test_compare_flags_regressions_above_threshold_and_noise():
+    rows = {row["case"]: row for row in compare(
+        _run(slow=0.013, noisy=0.0002, fast=0.005, new=1.0),
+        _run(slow=0.010, noisy=0.0001, fast=0.010),
+        threshold=0.2,
+    )}
+
+    assert set(rows) == {"slow", "noisy", "fast"}
+    assert rows["slow"]["regression"] and rows["slow"]["ratio"] == 1.3
+    assert not rows["noisy"]["regression"]  # 2x, but within the timer noise floor
+    assert rows["fast"]["improvement"] and not rows["fast"]["regression"]
+
+
+def test_baselines_round_trip(tmp_path):
+    path = save_results(_run(case=0.5), str(tmp_path / "nested" / "main.json"))
+    assert load_results(str(path)) == _run(case=0.5)
+
+
+def test_main_exits_nonzero_on_regression(tmp_path, capsys):
+    output = tmp_path / "run.json"
+    argv = ["--suite", "validation", "--repeat", "1"]
+    assert main(argv + ["--output", str(output)]) == 0
+
+    run = json.loads(output.read_text())
+    assert set(run["results"]) == {
+        "validation.validate_narrative.1p", "validation.stream_guard.1p",
+        "validation.validate_narrative.10p", "validation.stream_guard.10p",
+    }
+
+    slower = {**run, "results": {k: {"median_seconds": 100.0} for k in run["results"]}}
+    faster = {**run, "results": {k: {"median_seconds": 1e-9} for k in run["results"]}}
+    (tmp_path / "slower.json").write_text(json.dumps(slower))
+    (tmp_path / "faster.json").write_text(json.dumps(faster))
+
+    assert main(argv + ["--compare", str(tmp_path / "slower.json")]) == 0
+    assert main(argv + ["--compare", str(tmp_path / "faster.json")]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_unknown_suite_is_rejected():
+    with pytest.raises(SystemExit):
+        main(["--suite", "nope"])
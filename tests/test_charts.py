@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks.synthetic import synthetic_history
+from core.charts import (
+    CHART_RENDERERS,
+    decimate,
+    plot_drawdown,
+    render_chart,
+    render_charts,
+    render_charts_many,
+    render_small_multiples,
+)
+from core.context import AnalysisContext
+from core.data import normalize_history
+
+
+@pytest.fixture(scope="module")
+def context():
+    return AnalysisContext("SYN", normalize_history(synthetic_history("SYN", 5)))
+
+
+def _image(png: bytes) -> Image.Image:
+    image = Image.open(BytesIO(png))
+    image.load()
+    return image
+
+
+def test_decimate_keeps_extremes_and_endpoints():
+    values = np.sin(np.linspace(0, 40, 10000)) + np.linspace(0, 1, 10000)
+    values[5123] = 10.0
+    values[777] = -10.0
+    idx = decimate(values, 500)
+
+    assert len(idx) <= 502 and np.all(np.diff(idx) > 0)
+    assert {0, 9999, 5123, 777} <= set(idx)
+    assert values[idx].max() == values.max() and values[idx].min() == values.min()
+    assert np.array_equal(decimate(values[:100], 500), np.arange(100))
+
+
+def test_render_charts_returns_rgb_pngs_in_report_order(context):
+    charts = render_charts(context)
+
+    assert list(charts) == list(CHART_RENDERERS)
+    for png in charts.values():
+        image = _image(png)
+        assert image.format == "PNG" and image.mode == "RGB"
+        assert min(image.size) > 0
+
+
+def test_reused_figures_render_identically(context):
+    first = render_chart(context, "drawdown")
+    render_chart(context, "price_ma")
+    assert render_chart(context, "drawdown") == first
+
+
+def test_threads_render_independently(context):
+    expected = render_chart(context, "volatility")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: render_chart(context, "volatility"), range(8)))
+    assert all(png == expected for png in results)
+
+
+def test_render_charts_many_matches_single_process(context):
+    charts = render_charts_many({"SYN": context}, max_workers=1)
+    assert charts["SYN"] == render_charts(context)
+
+
+def test_small_multiples_paginate():
+    contexts = {f"T{i}": normalize_history(synthetic_history(f"T{i}", 1)) for i in range(5)}
+    contexts["EMPTY"] = normalize_history(None)
+    pages = render_small_multiples(contexts, columns=2, rows=2)
+    assert len(pages) == 2 and all(_image(page).format == "PNG" for page in pages)
+
+
+def test_plot_writes_file(context, tmp_path):
+    path = tmp_path / "drawdown.png"
+    plot_drawdown(context, path)
+    assert path.read_bytes() == render_chart(context, "drawdown")
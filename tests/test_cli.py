@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import cli
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import get_price_cache, load_histories
+from tests.test_data import RecordingProvider
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["agno", "openai", "matplotlib", "fpdf"]
+
+
+def _loaded_after(statement: str) -> list:
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    return output.split(",") if output else []
+
+
+def _analytics(capsys, *argv) -> list:
+    cli.run_analytics(list(argv))
+    return json.loads(capsys.readouterr().out)
+
+
+# -----------------------------------
+# Lazy Imports
+# -----------------------------------
+@pytest.mark.parametrize("statement", [
+    "import cli",
+    "import core.analytics",
+    "import core.data, core.screening, core.horizons, core.context, core.intraday",
+])
+def test_analytics_paths_skip_llm_and_charting_stacks(statement):
+    assert _loaded_after(statement) == []
+
+
+def test_committee_module_does_not_load_the_openai_client():
+    assert "openai" not in _loaded_after("import agents.finance_agent_team")
+
+
+# -----------------------------------
+# Analytics Command
+# -----------------------------------
+def test_analytics_matches_per_ticker_summaries(offline, capsys):
+    tickers = offline.tickers[:3]
+    output = _analytics(capsys, *(t.lower() for t in tickers), tickers[0])
+
+    assert [row["ticker"] for row in output] == tickers
+    for ticker, row in zip(tickers, output):
+        hist = get_price_cache().get(ticker)
+        expected = build_analysis_summary(ticker, AnalysisContext(ticker, hist))
+        assert row == json.loads(json.dumps(expected))
+
+
+def test_load_histories_fetches_each_ticker_once(offline, tmp_path):
+    from core.data import PriceCache
+
+    cache = PriceCache(tmp_path / "prices", RecordingProvider(offline.universe))
+    tickers = offline.tickers
+    histories = load_histories(tickers + tickers[:2], cache=cache, max_workers=3)
+
+    assert list(histories) == tickers
+    assert sorted(ticker for ticker, _, _ in cache.provider.calls) == sorted(tickers)
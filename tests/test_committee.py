@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pytest
+
+import agents.finance_agent_team as team
+from agents.finance_agent_team import (
+    AGENT_SPECS,
+    InvestmentCommittee,
+    get_committee,
+    run_financial_intelligence,
+    set_committee,
+)
+from agents.mock_model import MockChat, mock_model_factory
+
+
+SUMMARY = {
+    "ticker": "SYN",
+    "data_available": True,
+    "time_period": "2020-01-01 to 2024-12-31",
+    "trend": "downward",
+    "annualized_volatility": 0.412,
+    "volatility_percentile": 71.5,
+    "max_drawdown_pct": -38.2,
+    "downtrend_days": 45,
+    "recovery_probability_pct": 25.0,
+    "observations": 1260,
+    "regime": "CAUTION",
+    "risk_score": 4,
+    "position_size_suggestion": "1%–3% tactical allocation with strict stop-loss",
+}
+
+NAMES = [spec["name"] for spec in AGENT_SPECS.values()]
+
+
+@dataclass
+class CountingChat(MockChat):
+    """MockChat that records the most calls it saw in flight at once, across instances."""
+
+    tracker: dict = field(default=None)
+
+    async def ainvoke(self, messages, assistant_message, **kwargs):
+        with self.tracker["lock"]:
+            self.tracker["active"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        try:
+            return await super().ainvoke(messages, assistant_message, **kwargs)
+        finally:
+            with self.tracker["lock"]:
+                self.tracker["active"] -= 1
+
+
+def _committee(**options) -> InvestmentCommittee:
+    model_options = {k: options.pop(k) for k in ("latency", "rate_limit_failures", "reply") if k in options}
+    return InvestmentCommittee(mock_model_factory(**model_options), backoff=0, rate_limit_backoff=0, **options)
+
+
+def test_debate_runs_every_agent_once():
+    turns = []
+    debate = _committee().debate(SUMMARY, on_turn=lambda name, turn: turns.append(name))
+
+    assert set(debate["turns"]) == set(NAMES)
+    assert all(turn["attempts"] == 1 for turn in debate["turns"].values())
+    assert turns[-1] == AGENT_SPECS["chair"]["name"] and sorted(turns) == sorted(NAMES)
+    assert debate["narrative"]
+
+
+def test_analysts_run_concurrently():
+    committee = _committee(latency=0.2)
+    committee.debate(SUMMARY)  # warm up the loop and clients
+
+    started = time.perf_counter()
+    committee.debate(SUMMARY)
+    # Three analysts in parallel, then the chair: two latencies, not four.
+    assert time.perf_counter() - started < 0.6
+
+
+@pytest.mark.parametrize("limit", [1, 2])
+def test_concurrency_is_bounded(limit):
+    tracker = {"active": 0, "peak": 0, "lock": threading.Lock()}
+    committee = InvestmentCommittee(lambda: CountingChat(latency=0.05, tracker=tracker), max_concurrency=limit)
+
+    committee.debate(SUMMARY)
+    assert tracker["peak"] == limit
+
+
+def test_rate_limited_calls_are_retried():
+    debate = _committee(rate_limit_failures=2).debate(SUMMARY)
+    assert all(turn["attempts"] == 3 for turn in debate["turns"].values())
+
+
+def test_retries_are_bounded():
+    with pytest.raises(RuntimeError, match="failed after 2 attempts"):
+        _committee(rate_limit_failures=5, retries=1).debate(SUMMARY)
+
+
+def test_rate_limits_back_off_longer(monkeypatch):
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+
+    committee = InvestmentCommittee(mock_model_factory(), backoff=1.0, rate_limit_backoff=5.0)
+    monkeypatch.setattr(team.random, "random", lambda: 0.0)
+    monkeypatch.setattr(team.asyncio, "sleep", sleep)
+
+    asyncio.run(committee._backoff(0, "Mock rate limit exceeded"))
+    asyncio.run(committee._backoff(2, "connection reset"))
+    asyncio.run(committee._backoff(1, "HTTP 429"))
+    assert waits == [5.0, 4.0, 10.0]
+
+
+def test_streamed_memo_arrives_in_chunks():
+    events = []
+    debate = _committee(reply="Constructive memo. " * 10).debate(SUMMARY, on_event=events.append)
+
+    chunks = [event["text"] for event in events if event["type"] == "chunk"]
+    assert len(chunks) > 1 and "".join(chunks) == debate["narrative"]
+
+
+def test_set_committee_is_shared(offline):
+    committee = _committee()
+    set_committee(committee)
+    assert get_committee() is committee
+
+    result = run_financial_intelligence(offline.tickers[0], use_cache=False)
+    assert result["observability"]["narrative_cache"] == "bypass"
+    assert committee.agents["chair"].model.calls == 1
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import PriceCache, normalize_history, set_price_cache
+from tests.test_data import RecordingProvider, _history
+
+
+def test_load_fetches_history_once(tmp_path):
+    provider = RecordingProvider({"AAA": _history(800)})
+    set_price_cache(PriceCache(tmp_path, provider, ttl_seconds=3600))
+    try:
+        context = AnalysisContext.load("AAA")
+        summary = build_analysis_summary("AAA", context=context)
+        context.ma_200, context.rolling_volatility(60), context.drawdown
+    finally:
+        set_price_cache(None)
+
+    assert len(provider.calls) == 1
+    assert summary["observations"] == len(context.hist)
+
+
+def test_derived_series_are_memoized():
+    context = AnalysisContext("AAA", normalize_history(_history(300)))
+
+    assert context.returns is context.returns
+    assert context.drawdown is context.drawdown
+    assert context.moving_average(50) is context.ma_50
+    assert context.rolling_volatility(60) is context.rolling_volatility(60)
+
+
+def test_derived_series_match_pandas():
+    hist = normalize_history(_history(300))
+    context = AnalysisContext("AAA", hist)
+
+    pd.testing.assert_series_equal(context.ma_200, hist["close"].rolling(200).mean())
+    pd.testing.assert_series_equal(context.rolling_volatility(20),
+                                   hist["close"].pct_change().rolling(20).std() * np.sqrt(252))
+    assert context.daily_returns.notna().all()
+
+
+def test_summary_is_memoized_on_context():
+    context = AnalysisContext("AAA", normalize_history(_history(300)))
+    assert build_analysis_summary("AAA", context=context) is build_analysis_summary("AAA", context=context)
+
+
+def test_coerce_wraps_frames_and_passes_contexts():
+    hist = normalize_history(_history(10))
+    context = AnalysisContext.coerce(hist, "AAA")
+    assert context.ticker == "AAA" and context.hist is hist
+    assert AnalysisContext.coerce(context) is context
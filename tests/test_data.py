@@ -0,0 +1,162 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data import (
+    FixtureProvider,
+    PriceCache,
+    close_matrix,
+    normalize_history,
+    period_covers,
+    slice_period,
+)
+
+
+def _history(days: int = 600, end: str = "2024-12-31", seed: int = 0) -> pd.DataFrame:
+    dates = pd.bdate_range(end=end, periods=days)
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, days)))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": np.full(days, 1e6)}, index=pd.Index(dates, name="Date"))
+
+
+class RecordingProvider(FixtureProvider):
+    """FixtureProvider that records every history call."""
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def history(self, ticker, period="5y", start=None, interval="1d"):
+        with self._lock:
+            self.calls.append((ticker, period, start))
+        return super().history(ticker, period=period, start=start, interval=interval)
+
+
+# -----------------------------------
+# Helpers
+# -----------------------------------
+def test_normalize_history_lowercases_and_sorts():
+    hist = normalize_history(_history(5).iloc[::-1])
+    assert list(hist.columns) == ["date", "open", "high", "low", "close", "volume"]
+    assert hist["date"].is_monotonic_increasing
+
+
+def test_normalize_history_accepts_intraday_index():
+    frame = _history(5).rename_axis("Datetime")
+    assert "date" in normalize_history(frame).columns
+
+
+def test_period_covers_and_slice():
+    assert period_covers("5y", "1y")
+    assert not period_covers("1y", "5y")
+
+    hist = normalize_history(_history(600))
+    one_year = slice_period(hist, "1y")
+    assert one_year["date"].iloc[0] >= hist["date"].iloc[-1] - pd.DateOffset(years=1)
+    assert one_year["date"].iloc[-1] == hist["date"].iloc[-1]
+
+
+def test_close_matrix_leaves_gaps_as_nan():
+    a = normalize_history(_history(10))
+    b = a.drop(index=[3]).reset_index(drop=True)
+    matrix = close_matrix({"A": a, "B": b})
+    assert matrix.shape == (10, 2)
+    assert matrix["B"].isna().sum() == 1
+
+
+# -----------------------------------
+# Price Cache
+# -----------------------------------
+def test_cache_serves_fresh_entries_from_disk(tmp_path):
+    provider = RecordingProvider({"AAA": _history()})
+    cache = PriceCache(tmp_path, provider, ttl_seconds=3600)
+
+    first = cache.get("AAA", period="1y")
+    second = cache.get("AAA", period="1y")
+
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_shorter_period_is_sliced_longer_refetched(tmp_path):
+    provider = RecordingProvider({"AAA": _history()})
+    cache = PriceCache(tmp_path, provider, ttl_seconds=3600)
+
+    cache.get("AAA", period="2y")
+    assert len(cache.get("AAA", period="1y")) < len(cache.get("AAA", period="2y"))
+    assert len(provider.calls) == 1
+
+    cache.get("AAA", period="5y")
+    assert provider.calls[-1][1] == "5y" and provider.calls[-1][2] is None
+
+
+def test_stale_entry_fetches_only_new_bars(tmp_path):
+    full = _history()
+    source = {"AAA": full.iloc[:-5]}
+    provider = RecordingProvider(source)
+    cache = PriceCache(tmp_path, provider, ttl_seconds=0)
+    cache.get("AAA", period="5y")
+
+    # The provider now has five more bars and a corrected last bar.
+    updated = full.copy()
+    updated.iloc[-6, updated.columns.get_loc("Close")] = 1.0
+    source["AAA"] = updated
+
+    hist = cache.get("AAA", period="5y")
+    start = provider.calls[-1][2]
+    assert start == normalize_history(full.iloc[:-5])["date"].iloc[-1]
+    assert len(hist) == len(full)
+    assert hist["close"].iloc[-6] == 1.0
+    assert hist["date"].is_unique
+
+
+def test_refresh_bypasses_fresh_entry(tmp_path):
+    provider = RecordingProvider({"AAA": _history()})
+    cache = PriceCache(tmp_path, provider, ttl_seconds=3600)
+
+    cache.get("AAA")
+    cache.get("AAA", refresh=True)
+    assert len(provider.calls) == 2 and provider.calls[-1][2] is None
+
+
+def test_empty_provider_result_is_not_cached(tmp_path):
+    cache = PriceCache(tmp_path, RecordingProvider({}), ttl_seconds=3600)
+    assert cache.get("NONE").empty
+    assert not list(tmp_path.glob("*"))
+
+
+def test_concurrent_refreshes_of_one_ticker(tmp_path):
+    cache = PriceCache(tmp_path, FixtureProvider({"AAA": _history()}), ttl_seconds=0)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda _: cache.get("AAA", refresh=True), range(64)))
+
+    assert all(len(frame) == len(frames[0]) for frame in frames)
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(cache.get("AAA")) == len(frames[0])
+
+
+def test_invalidate_removes_entry(tmp_path):
+    provider = RecordingProvider({"AAA": _history()})
+    cache = PriceCache(tmp_path, provider, ttl_seconds=3600)
+    cache.get("AAA")
+    cache.invalidate("AAA")
+    cache.get("AAA")
+    assert len(provider.calls) == 2
+
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_fixture_provider_reads_directory(tmp_path, suffix):
+    frame = _history(20)
+    if suffix == "csv":
+        frame.to_csv(tmp_path / "AAA.csv")
+    else:
+        frame.reset_index().to_parquet(tmp_path / "AAA.parquet")
+
+    hist = FixtureProvider(tmp_path).history("AAA", period="max")
+    assert len(hist) == 20
+    np.testing.assert_allclose(hist["close"], frame["Close"])
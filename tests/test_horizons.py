@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cli
+from benchmarks.synthetic import synthetic_history
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import PriceCache, covering_period, normalize_history, slice_period
+from core.horizons import build_horizon_summary, horizon_table
+from tests.test_data import RecordingProvider
+
+
+HEADLINE_FIELDS = ["trend", "annualized_volatility", "volatility_percentile", "max_drawdown_pct",
+                   "downtrend_days", "recovery_probability_pct", "observations", "regime", "risk_score",
+                   "position_size_suggestion", "time_period"]
+
+
+@pytest.fixture(scope="module")
+def hist():
+    return normalize_history(synthetic_history("SYN", 8, seed=5))
+
+
+@pytest.fixture(scope="module")
+def multi(hist):
+    return build_horizon_summary("SYN", AnalysisContext("SYN", hist), ["6mo", "1y", "3y", "5y", "10y"],
+                                 volatility_windows=(20, 60, 120), ma_windows=(50, 200))
+
+
+def _reference_percentile(close: pd.Series, window: int) -> float:
+    rolling = (close.pct_change().rolling(window).std() * np.sqrt(252)).dropna()
+    last = rolling.iloc[-1]
+    return round(float(((rolling < last).sum() + ((rolling == last).sum() + 1) / 2) / len(rolling) * 100), 2)
+
+
+def _reference_downtrend(close: pd.Series, window: int) -> int:
+    below = (close < close.rolling(window).mean()).to_numpy()
+    return len(below) - int(np.flatnonzero(~below)[-1]) - 1 if not below.all() else len(below)
+
+
+# -----------------------------------
+# Parity
+# -----------------------------------
+@pytest.mark.parametrize("horizon", ["6mo", "1y", "3y", "5y"])
+def test_horizon_matches_summary_of_its_slice(hist, multi, horizon):
+    window = slice_period(hist, horizon)
+    expected = build_analysis_summary("SYN", AnalysisContext("SYN", window))
+    summary = multi["horizons"][horizon]
+
+    assert {f: summary[f] for f in HEADLINE_FIELDS} == pytest.approx({f: expected[f] for f in HEADLINE_FIELDS})
+    assert summary["covers_horizon"]
+
+
+@pytest.mark.parametrize("horizon", ["1y", "5y"])
+def test_window_metrics_match_pandas(hist, multi, horizon):
+    close = slice_period(hist, horizon)["close"].reset_index(drop=True)
+    summary = multi["horizons"][horizon]
+
+    for window in (20, 60, 120):
+        assert summary["volatility_percentiles"][f"{window}d"] == pytest.approx(
+            _reference_percentile(close, window), abs=0.01)
+        assert summary["rolling_volatility"][f"{window}d"] == round(
+            float(close.pct_change().iloc[-window:].std() * np.sqrt(252)), 3)
+    for window in (50, 200):
+        assert summary["downtrend_days_by_ma"][f"{window}d"] == min(
+            _reference_downtrend(close, window), len(close) - window + 1)
+
+
+# -----------------------------------
+# Coverage and Loading
+# -----------------------------------
+def test_longer_horizons_use_the_whole_history(hist, multi):
+    ten = multi["horizons"]["10y"]
+    assert not ten["covers_horizon"] and ten["observations"] == len(hist)
+    assert multi["regimes"] == {h: s["regime"] for h, s in multi["horizons"].items()}
+    assert multi["windows"] == {"volatility": [20, 60, 120], "moving_average": [50, 200]}
+
+
+def test_history_is_loaded_once(tmp_path, monkeypatch):
+    import core.horizons as horizons
+
+    universe = {"SYN": synthetic_history("SYN", 12, seed=5)}
+    cache = PriceCache(tmp_path, RecordingProvider(universe))
+    monkeypatch.setattr(horizons, "get_price_cache", lambda: cache)
+
+    multi = build_horizon_summary("SYN", horizons=["1y", "3y", "10y"])
+    assert [(ticker, period) for ticker, period, _ in cache.provider.calls] == [("SYN", "10y")]
+    assert covering_period(["1y", "3y", "10y"]) == "10y"
+    assert all(summary["covers_horizon"] for summary in multi["horizons"].values())
+
+
+def test_empty_history():
+    empty = build_horizon_summary("NONE", AnalysisContext("NONE", normalize_history(pd.DataFrame())))
+    assert empty["data_available"] is False
+
+
+def test_horizon_table(multi):
+    table = horizon_table(multi)
+    assert list(table.index) == ["6mo", "1y", "3y", "5y", "10y"]
+    assert table.loc["3y", "regime"] == multi["horizons"]["3y"]["regime"]
+
+
+def test_cli_horizons(offline, capsys):
+    ticker = offline.tickers[0]
+    cli.run_analytics([ticker, "--horizons", "1y, 3y"])
+    output, = json.loads(capsys.readouterr().out)
+
+    hist = offline.universe[ticker]
+    expected = build_horizon_summary(ticker, AnalysisContext(ticker, normalize_history(hist)), ["1y", "3y"])
+    assert output == json.loads(json.dumps(expected))
@@ -0,0 +1,159 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.intraday as intraday
+from benchmarks.synthetic import synthetic_intraday
+from core.data import FixtureProvider, normalize_history
+from core.intraday import BAR_COLUMNS, IntradayBars, IntradayStore, _merge, build_intraday_summary, resample
+
+
+AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+@pytest.fixture(scope="module")
+def minutes():
+    return normalize_history(synthetic_intraday("SYN", years=0.1, minutes=1, seed=2))
+
+
+@pytest.fixture
+def store(tmp_path, minutes):
+    return IntradayStore(tmp_path / "intraday", provider=FixtureProvider({"SYN.1m": minutes}))
+
+
+def _frame(bars: IntradayBars) -> pd.DataFrame:
+    return bars.to_frame().set_index("date")
+
+
+# -----------------------------------
+# Resampling
+# -----------------------------------
+@pytest.mark.parametrize("interval, rule, offset", [("5m", "5min", None), ("1h", "1h", "30min"), ("1d", "1D", None)])
+def test_resample_matches_pandas(minutes, interval, rule, offset):
+    bars = IntradayBars.from_frame(minutes, "1m")
+    ours = _frame(resample(bars, interval))
+
+    # Hourly buckets start at the 9:30 open; daily buckets at local midnight.
+    frame = _frame(bars).astype(np.float64)
+    expected = frame.resample(rule, offset=offset).agg(AGGREGATIONS).dropna(subset=["close"])
+
+    assert ours.index.equals(expected.index)
+    for column in BAR_COLUMNS:
+        np.testing.assert_allclose(ours[column], expected[column], rtol=1e-6, err_msg=column)
+
+
+def test_resample_refuses_finer_intervals(minutes):
+    bars = IntradayBars.from_frame(minutes, "5m")
+    with pytest.raises(ValueError, match="finer"):
+        resample(bars, "1m")
+    assert resample(bars, "5m").timestamps is bars.timestamps
+
+
+# -----------------------------------
+# Merging
+# -----------------------------------
+def test_merge_keeps_the_new_bar_at_equal_times():
+    stored = IntradayBars(np.array([0, 60, 120]), {c: np.array([1, 2, 3], np.float32) for c in BAR_COLUMNS}, "1m")
+    new = IntradayBars(np.array([120, 180]), {"close": np.array([30, 40], np.float32)}, "1m")
+    merged = _merge(stored, new)
+
+    assert merged.timestamps.tolist() == [0, 60, 120, 180]
+    assert merged.close.tolist() == [1, 2, 30, 40]
+    # Columns the new bars lack are missing for them, not kept from the old bar.
+    np.testing.assert_array_equal(merged.columns["open"], [1, 2, np.nan, np.nan])
+
+
+# -----------------------------------
+# Store
+# -----------------------------------
+def test_write_load_round_trip(store, minutes):
+    assert store.write("SYN", "1m", minutes) == len(minutes)
+    loaded = store.load("SYN", "1m", columns=BAR_COLUMNS)
+
+    expected = IntradayBars.from_frame(minutes, "1m")
+    assert np.array_equal(loaded.timestamps, expected.timestamps)
+    for column in BAR_COLUMNS:
+        assert loaded.columns[column].dtype == np.float32
+        np.testing.assert_array_equal(loaded.columns[column], expected.columns[column])
+
+    months = minutes["date"].dt.strftime("%Y-%m").unique().tolist()
+    assert list(store.chunks("SYN", "1m")) == months
+    assert sum(chunk["rows"] for chunk in store.chunks("SYN", "1m").values()) == len(minutes)
+
+
+def test_load_windows_and_resampled_reads(store, minutes):
+    store.write("SYN", "1m", minutes)
+    start, end = minutes["date"].iloc[1000], minutes["date"].iloc[2000]
+
+    window = store.load("SYN", "1m", start=start, end=end)
+    assert len(window) == 1001
+    daily = store.load("SYN", "1m", resample_to="1d", columns=BAR_COLUMNS)
+    assert np.array_equal(daily.timestamps, resample(IntradayBars.from_frame(minutes, "1m"), "1d").timestamps)
+    assert len(store.load("SYN", "1m", period="5d", resample_to="1d")) <= 6
+
+
+def test_rewrite_merges_and_defers_deleting_replaced_chunks(store, minutes, monkeypatch):
+    store.write("SYN", "1m", minutes)
+    directory = store._dir("SYN", "1m")
+    old = {key: chunk["dir"] for key, chunk in store.chunks("SYN", "1m").items()}
+    last_month = list(old)[-1]
+
+    revised = minutes.tail(10).assign(close=1.0)
+    store.write("SYN", "1m", revised)
+
+    chunks = store.chunks("SYN", "1m")
+    assert chunks[last_month]["dir"] != old[last_month]
+    assert chunks[last_month]["rows"] == (minutes["date"].dt.strftime("%Y-%m") == last_month).sum()
+    assert store.load("SYN", "1m").close[-10:].tolist() == [1.0] * 10
+    # A read holding the previous manifest can still open the replaced chunk.
+    assert (directory / old[last_month]).exists()
+
+    monkeypatch.setattr(intraday, "RETIRED_CHUNK_SECONDS", 0)
+    store.write("SYN", "1m", revised)
+    assert not (directory / old[last_month]).exists()
+    on_disk = {path.name for path in directory.iterdir() if path.is_dir()}
+    assert on_disk == {chunk["dir"] for chunk in store.chunks("SYN", "1m").values()}
+
+
+def test_update_tops_up_within_the_ttl(store, minutes):
+    assert store.update("SYN", "1m") == "miss"
+    assert store.update("SYN", "1m") == "hit"
+    assert store.update("SYN", "1m", refresh=True) == "miss"
+
+    store.ttl_seconds = 0
+    assert store.update("SYN", "1m") == "refreshed"
+    assert len(store.load("SYN", "1m")) == len(minutes)
+    assert IntradayStore(store.root, provider=FixtureProvider({})).update("NONE", "1m") == "empty"
+
+
+def test_update_does_not_drop_a_concurrent_write(tmp_path, minutes):
+    early, late = minutes.iloc[:-5000], minutes.iloc[-5000:]
+    store = IntradayStore(tmp_path, provider=FixtureProvider({"SYN.1m": early}))
+    reads = []
+    read_manifest = store._manifest
+
+    def manifest(ticker, interval):
+        # Another writer lands bars right after update() has written its own.
+        current = read_manifest(ticker, interval)
+        reads.append(1)
+        if len(reads) == 3:
+            writer = threading.Thread(target=store.write, args=(ticker, interval, late))
+            writer.start()
+            writer.join(5)
+        return current
+
+    store._manifest = manifest
+    assert store.update("SYN", "1m") == "miss" and len(reads) >= 3
+
+    assert len(store.load("SYN", "1m")) == len(minutes)
+    directory = store._dir("SYN", "1m")
+    assert all((directory / chunk["dir"]).exists() for chunk in store.chunks("SYN", "1m").values())
+    assert store.update("SYN", "1m") == "hit"
+
+
+def test_intraday_summary(store):
+    summary = build_intraday_summary("SYN", "1m", resample_to="1h", store=store)
+    assert summary["data_available"] and summary["interval"] == "1h"
+    assert summary["observations"] == len(store.load("SYN", "1m", resample_to="1h"))
@@ -0,0 +1,102 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.jobs import DONE, FAILED, Job, JobQueue
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import get_price_cache
+
+
+VIEWER = str(Path(__file__).resolve().parent.parent / "app" / "viewer.py")
+
+
+def _wait(job: Job, timeout: float = 30.0) -> dict:
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.02)
+    return job.snapshot()
+
+
+def _submit(queue: JobQueue, ticker: str) -> Job:
+    hist = get_price_cache().get(ticker)
+    return queue.submit(ticker, hist, build_analysis_summary(ticker, AnalysisContext(ticker, hist)))
+
+
+# -----------------------------------
+# Jobs
+# -----------------------------------
+def test_job_debates_and_builds_the_pdf(offline):
+    job = _submit(JobQueue(max_workers=1), offline.tickers[0])
+    snapshot = _wait(job)
+
+    assert snapshot["status"] == DONE, snapshot["error"]
+    assert snapshot["pdf"].startswith(b"%PDF-")
+    assert len(snapshot["turns"]) == 4
+    # The streamed draft is the chair's memo; overrides are appended after it.
+    assert snapshot["draft"] and snapshot["result"]["agent_narrative"].startswith(snapshot["draft"].rstrip())
+
+
+def test_requests_for_the_same_data_share_a_job(offline):
+    queue = JobQueue(max_workers=2)
+    first = _submit(queue, offline.tickers[0])
+    assert _submit(queue, offline.tickers[0]) is first
+    other = _submit(queue, offline.tickers[1])
+    assert other is not first
+
+    _wait(first), _wait(other)
+    assert offline.committee.agents["chair"].model.calls == 2  # one debate per ticker
+
+
+def test_failed_jobs_are_retried(offline, monkeypatch):
+    import app.jobs as jobs
+
+    def broken(**options):
+        raise RuntimeError("provider down")
+
+    queue = JobQueue(max_workers=1)
+    with monkeypatch.context() as patch:
+        patch.setattr(jobs, "report_pipeline", broken)
+        failed = _wait(_submit(queue, offline.tickers[0]))
+    assert failed["status"] == FAILED and failed["error"] == "RuntimeError: provider down"
+
+    retried = _submit(queue, offline.tickers[0])
+    assert retried.id != failed["id"] and _wait(retried)["status"] == DONE
+
+
+def test_finished_jobs_expire(offline):
+    queue = JobQueue(max_workers=1, ttl_seconds=0)
+    job = _submit(queue, offline.tickers[0])
+    _wait(job)
+
+    assert _submit(queue, offline.tickers[0]) is not job
+    assert queue.get(job.id) is None
+
+
+def test_restart_discards_the_draft():
+    job = Job("SYN")
+    job.add_event({"type": "chunk", "text": "Strong upside "})
+    job.add_event({"type": "restart", "reason": "regime_conflict"})
+    job.add_event({"type": "chunk", "text": "Measured memo."})
+
+    snapshot = job.snapshot()
+    assert snapshot["draft"] == "Measured memo." and len(snapshot["restarts"]) == 1
+
+
+# -----------------------------------
+# Viewer
+# -----------------------------------
+def test_viewer_renders_metrics_before_the_memo(offline):
+    pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(VIEWER, default_timeout=60).run()
+    assert not app.exception
+
+    app.text_input[0].input(offline.tickers[0]).run()
+    app.button[0].click().run()
+    assert not app.exception
+    assert app.session_state["ticker"] == offline.tickers[0]
+    assert app.session_state["job_id"]
+    assert any("Volatility" in metric.label for metric in app.metric)
@@ -0,0 +1,164 @@
+import importlib.util
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.analytics import (
+    build_analysis_summary,
+    calculate_downtrend_duration,
+    calculate_volatility_percentile,
+)
+from core.context import AnalysisContext
+from core.kernels import below_ma_streak, close_stats, percentile_of_last, rolling_volatility
+
+
+BACKENDS = ["numpy"] + (["numba"] if importlib.util.find_spec("numba") else [])
+
+VOL_WINDOW = 60
+MA_WINDOW = 200
+
+
+def _walk(n: int, seed: int = 0, drift: float = 0.0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(drift, 0.015, n)))
+
+
+SERIES = {
+    "random_5y": _walk(1260),
+    "random_30y": _walk(7560, seed=1),
+    "uptrend": _walk(2000, seed=2, drift=0.002),
+    "downtrend": _walk(2000, seed=3, drift=-0.002),
+    "straight_decline": np.linspace(200, 50, 3000),
+    "flat_tail": np.concatenate([_walk(1000, seed=4), np.full(300, 90.0)]),
+    "flat": np.full(500, 10.0),
+    "short": _walk(70, seed=5),
+    "shorter_than_window": _walk(40, seed=6),
+    "two_bars": np.array([10.0, 11.0]),
+    "one_bar": np.array([10.0]),
+}
+
+
+# -----------------------------------
+# Reference (pandas) Implementations
+# -----------------------------------
+def _reference(close: np.ndarray) -> dict:
+    series = pd.Series(close)
+    returns = series.pct_change().dropna()
+    rolling_vol = returns.rolling(VOL_WINDOW).std() * np.sqrt(252)
+
+    streak = 0
+    for below in reversed((series < series.rolling(MA_WINDOW).mean()).tolist()):
+        if not below:
+            break
+        streak += 1
+
+    return {
+        "volatility": returns.std() * np.sqrt(252),
+        "max_drawdown": (series / series.cummax() - 1).min(),
+        "volatility_percentile": rolling_vol.rank(pct=True).iloc[-1] * 100 if len(rolling_vol) else math.nan,
+        "downtrend_days": streak,
+    }
+
+
+def _close(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=1e-10, abs_tol=1e-12) or (math.isnan(a) and math.isnan(b))
+
+
+# -----------------------------------
+# Parity
+# -----------------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", SERIES)
+def test_close_stats_matches_pandas(name, backend):
+    expected = _reference(SERIES[name])
+    actual = close_stats(SERIES[name], VOL_WINDOW, MA_WINDOW, backend=backend)
+
+    for key, value in expected.items():
+        assert _close(float(value), float(actual[key])), (key, value, actual[key])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["random_5y", "random_30y", "flat_tail"])
+def test_rolling_volatility_matches_pandas(name, backend):
+    returns = pd.Series(SERIES[name]).pct_change().dropna()
+    expected = (returns.rolling(VOL_WINDOW).std() * np.sqrt(252)).dropna().to_numpy()
+
+    np.testing.assert_allclose(rolling_volatility(returns, VOL_WINDOW, backend=backend), expected,
+                               rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_percentile_of_last_matches_rank(backend):
+    rng = np.random.default_rng(7)
+    for values in (rng.normal(size=500), rng.integers(0, 5, 200).astype(float), np.array([3.0])):
+        expected = pd.Series(values).rank(pct=True).iloc[-1] * 100
+        assert math.isclose(percentile_of_last(values, backend=backend), expected)
+
+    with_gaps = np.array([np.nan, 1.0, 3.0, np.nan, 2.0])
+    assert percentile_of_last(with_gaps, backend=backend) == pd.Series(with_gaps).rank(pct=True).iloc[-1] * 100
+    assert math.isnan(percentile_of_last(np.array([1.0, np.nan]), backend=backend))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["downtrend", "straight_decline", "uptrend", "short"])
+def test_below_ma_streak_matches_pandas(name, backend):
+    assert below_ma_streak(SERIES[name], MA_WINDOW, backend=backend) == _reference(SERIES[name])["downtrend_days"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_periods_per_year_scales_volatility(backend):
+    # Hourly bars: seven a session.
+    daily = close_stats(SERIES["random_5y"], VOL_WINDOW, MA_WINDOW, backend=backend)
+    hourly = close_stats(SERIES["random_5y"], VOL_WINDOW, MA_WINDOW, backend=backend, periods_per_year=252 * 7)
+
+    assert _close(hourly["volatility"], daily["volatility"] * math.sqrt(7))
+    assert _close(hourly["volatility_percentile"], daily["volatility_percentile"])
+    assert hourly["max_drawdown"] == daily["max_drawdown"]
+
+
+def test_backends_agree():
+    if len(BACKENDS) < 2:
+        pytest.skip("numba is not installed")
+    for close in SERIES.values():
+        numpy_stats = close_stats(close, VOL_WINDOW, MA_WINDOW, backend="numpy")
+        numba_stats = close_stats(close, VOL_WINDOW, MA_WINDOW, backend="numba")
+        assert all(_close(numpy_stats[key], numba_stats[key]) for key in numpy_stats)
+
+
+# -----------------------------------
+# Analytics Entry Points
+# -----------------------------------
+def _history(close: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({"date": pd.bdate_range("2000-01-03", periods=len(close)), "close": close})
+
+
+@pytest.mark.parametrize("name", ["random_5y", "random_30y", "downtrend", "flat_tail"])
+def test_analytics_functions_match_pandas(name):
+    close = SERIES[name]
+    hist = _history(close)
+    expected = _reference(close)
+    returns = hist["close"].pct_change().dropna()
+
+    assert calculate_volatility_percentile(returns) == round(expected["volatility_percentile"], 2)
+    assert calculate_downtrend_duration(hist) == expected["downtrend_days"]
+    assert calculate_downtrend_duration(hist, hist["close"].rolling(MA_WINDOW).mean()) == expected["downtrend_days"]
+
+
+@pytest.mark.parametrize("name", ["random_5y", "random_30y", "uptrend", "downtrend"])
+def test_summary_matches_pandas(name):
+    close = SERIES[name]
+    expected = _reference(close)
+    summary = build_analysis_summary("TEST", context=AnalysisContext("TEST", _history(close)))
+
+    assert summary["annualized_volatility"] == round(float(expected["volatility"]), 3)
+    assert summary["max_drawdown_pct"] == round(float(expected["max_drawdown"] * 100), 2)
+    assert summary["volatility_percentile"] == round(float(expected["volatility_percentile"]), 2)
+    assert summary["downtrend_days"] == expected["downtrend_days"]
+    assert summary["observations"] == len(close)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        close_stats(SERIES["short"], VOL_WINDOW, MA_WINDOW, backend="fortran")
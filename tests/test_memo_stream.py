@@ -0,0 +1,165 @@
+import pytest
+
+from agents.finance_agent_team import (
+    AGENT_SPECS,
+    HARD_CONFLICTS,
+    InvestmentCommittee,
+    NarrativeGuard,
+    run_financial_intelligence,
+    stream_financial_intelligence,
+)
+from agents.mock_model import mock_model_factory
+
+
+SUMMARY = {
+    "ticker": "SYN",
+    "data_available": True,
+    "trend": "downward",
+    "annualized_volatility": 0.412,
+    "volatility_percentile": 91.5,
+    "max_drawdown_pct": -38.2,
+    "downtrend_days": 45,
+    "recovery_probability_pct": 25.0,
+    "observations": 1260,
+    "regime": "DEFENSIVE",
+    "risk_score": 8,
+    "position_size_suggestion": "0%–1% or hedge; avoid new exposure",
+}
+
+CHAIR = AGENT_SPECS["chair"]["name"]
+MEASURED = "The committee recommends holding a minimal position until volatility eases. " * 4
+OPTIMISTIC = "The setup offers strong upside from here. " + "Further detail on the thesis follows. " * 40
+
+
+def _feed(guard: NarrativeGuard, text: str, size: int) -> list:
+    flags = []
+    for i in range(0, len(text), size):
+        flags += guard.feed(text[i:i + size])
+    return flags
+
+
+def _chair_replies(*replies):
+    """Reply callable giving each draft in turn, then repeating the last."""
+    drafts = list(replies)
+
+    def reply(messages):
+        return drafts.pop(0) if len(drafts) > 1 else drafts[0]
+
+    return reply
+
+
+def _committee(chair_reply, **options) -> InvestmentCommittee:
+    committee = InvestmentCommittee(mock_model_factory(), backoff=0, rate_limit_backoff=0, **options)
+    committee.agents["chair"].model.reply = chair_reply
+    return committee
+
+
+def _debate(committee: InvestmentCommittee, summary: dict = SUMMARY):
+    events = []
+    debate = committee.debate(summary, on_event=events.append, guard_factory=lambda: NarrativeGuard(summary))
+    return debate, events
+
+
+# -----------------------------------
+# Guard
+# -----------------------------------
+@pytest.mark.parametrize("size", [1, 4, 7, 1000])
+def test_guard_flags_phrases_split_across_chunks(size):
+    guard = NarrativeGuard(SUMMARY)
+    flags = _feed(guard, "We see Strong Upside and would increase exposure; strong upside again.", size)
+
+    assert sorted(flags) == ["allocation_conflict", "regime_conflict"]
+    assert len(guard.notes) == 2
+
+
+def test_guard_reports_fabricated_numbers_as_soft_by_default():
+    text = "Drawdown reached -38.2% while the stock could rally 63% next quarter. " * 2
+
+    guard = NarrativeGuard(SUMMARY)
+    assert _feed(guard, text, 16) == []
+    assert "fabricated_numbers_detected" in guard.conflicts and guard.notes == []
+
+    strict = NarrativeGuard(SUMMARY, hard_conflicts=HARD_CONFLICTS + ("fabricated_numbers_detected",))
+    assert _feed(strict, text, 16) == ["fabricated_numbers_detected"]
+
+
+def test_guard_ignores_phrases_outside_their_regime():
+    guard = NarrativeGuard({**SUMMARY, "regime": "AGGRESSIVE"})
+    assert _feed(guard, OPTIMISTIC, 16) == [] and guard.conflicts == {}
+
+
+# -----------------------------------
+# Streamed Memo
+# -----------------------------------
+def test_conflicting_draft_is_stopped_and_regenerated():
+    committee = _committee(_chair_replies(OPTIMISTIC, MEASURED))
+    debate, events = _debate(committee)
+    chair = debate["turns"][CHAIR]
+
+    restarts = [event for event in events if event["type"] == "restart"]
+    assert [event["reason"] for event in restarts] == ["conflict"]
+    assert restarts[0]["notes"] == ["Optimistic tone conflicts with DEFENSIVE regime."]
+
+    # The first draft was closed as soon as the phrase landed.
+    assert chair["regenerations"] == 1 and committee.agents["chair"].model.calls == 2
+    assert 0 < chair["discarded_chars"] < len(OPTIMISTIC) / 4
+    assert chair["stopped_drafts"][0]["conflicts"] == ["regime_conflict"]
+
+    after_restart = events[events.index(restarts[0]) + 1:]
+    assert debate["narrative"] == MEASURED == "".join(event["text"] for event in after_restart)
+
+
+def test_last_draft_runs_to_completion():
+    committee = _committee(OPTIMISTIC, regenerations=2)
+    debate, events = _debate(committee)
+    chair = debate["turns"][CHAIR]
+
+    assert chair["regenerations"] == 2 and len(chair["stopped_drafts"]) == 2
+    assert sum(event["type"] == "restart" for event in events) == 2
+    assert debate["narrative"] == OPTIMISTIC
+
+
+def test_chunks_carry_the_chair_and_time_to_first_token():
+    committee = _committee(MEASURED)
+    debate, events = _debate(committee)
+    chair = debate["turns"][CHAIR]
+
+    assert {event["agent"] for event in events} == {CHAIR}
+    assert len(events) == -(-len(MEASURED) // 16)
+    assert chair["regenerations"] == 0 and chair["discarded_chars"] == 0
+    assert chair["ttft_seconds"] is not None and chair["ttft_seconds"] <= chair["seconds"]
+
+
+# -----------------------------------
+# Pipeline
+# -----------------------------------
+def test_pipeline_streams_then_returns_the_result(offline):
+    ticker = offline.tickers[0]
+    events = list(stream_financial_intelligence(ticker))
+    result = events[-1]["result"]
+
+    assert events[-1]["type"] == "result"
+    chunks = [event["text"] for event in events[:-1] if event["type"] == "chunk"]
+    assert len(chunks) > 1 and result["agent_narrative"].startswith("".join(chunks).rstrip())
+    observability = result["observability"]
+    # runtime_seconds is rounded to hundredths, the first token to thousandths.
+    assert observability["time_to_first_token_seconds"] <= observability["runtime_seconds"] + 0.005
+
+
+def test_cached_memo_arrives_as_one_chunk(offline):
+    ticker = offline.tickers[0]
+    first = run_financial_intelligence(ticker)
+
+    events = []
+    cached = run_financial_intelligence(ticker, on_event=events.append)
+    assert cached["observability"]["narrative_cache"] == "hit"
+    assert events == [{"type": "chunk", "agent": CHAIR, "text": first["agent_narrative"]}]
+    assert "time_to_first_token_seconds" in cached["observability"]
+
+
+def test_pipeline_without_on_event_does_not_stream(offline):
+    result = run_financial_intelligence(offline.tickers[0], use_cache=False)
+    chair = result["observability"]["agent_turns"][CHAIR]
+
+    assert "time_to_first_token_seconds" not in result["observability"]
+    assert "regenerations" not in chair
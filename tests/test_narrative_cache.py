@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import agents.narrative_cache as narrative_cache
+from agents.finance_agent_team import AGENT_SPECS
+from agents.narrative_cache import NarrativeCache, narrative_cache_key
+
+
+SUMMARY = {"ticker": "SYN", "regime": "CAUTION", "annualized_volatility": 0.31, "max_drawdown_pct": -27.5}
+
+
+def test_key_depends_on_summary_agents_model_and_budgets():
+    key = narrative_cache_key(SUMMARY, AGENT_SPECS, "gpt-4o")
+
+    assert key == narrative_cache_key(dict(reversed(list(SUMMARY.items()))), AGENT_SPECS, "gpt-4o")
+    assert key != narrative_cache_key({**SUMMARY, "max_drawdown_pct": -27.6}, AGENT_SPECS, "gpt-4o")
+    assert key != narrative_cache_key(SUMMARY, AGENT_SPECS, "mock-chat")
+    assert key != narrative_cache_key(SUMMARY, AGENT_SPECS, "gpt-4o", {"chair": 100})
+
+
+def test_get_put_and_ttl(tmp_path):
+    cache = NarrativeCache(tmp_path, ttl_seconds=3600)
+    assert cache.get("k") is None
+
+    cache.put("k", {"agent_narrative": "memo"})
+    assert cache.get("k")["agent_narrative"] == "memo"
+
+    expired = NarrativeCache(tmp_path, ttl_seconds=0)
+    assert expired.get("k") is None
+    assert not (tmp_path / "k.json").exists()
+    assert cache.metrics()["hits"] == 1 and cache.metrics()["misses"] == 1
+
+
+def test_overflow_evicts_oldest_to_low_water(tmp_path):
+    cache = NarrativeCache(tmp_path, max_entries=10)
+    for i in range(11):
+        cache.put(f"k{i:02d}", {"i": i})
+        time.sleep(0.002)
+
+    remaining = sorted(p.stem for p in tmp_path.glob("*.json"))
+    assert remaining == [f"k{i:02d}" for i in range(2, 11)]
+    assert cache.metrics()["evictions"] == 2
+
+
+def test_directory_is_not_scanned_on_every_put(tmp_path, monkeypatch):
+    cache = NarrativeCache(tmp_path, max_entries=100)
+    scans = []
+    evict = cache._evict_overflow
+    monkeypatch.setattr(cache, "_evict_overflow", lambda: (scans.append(1), evict()))
+
+    for i in range(300):
+        cache.put(f"k{i}", {"i": i})
+
+    assert len(scans) < 30
+    assert len(list(tmp_path.glob("*.json"))) <= 100
+
+
+def test_concurrent_puts_stay_bounded(tmp_path):
+    cache = NarrativeCache(tmp_path, max_entries=20)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.put(f"k{i}", {"i": i}), range(400)))
+
+    assert len(list(tmp_path.glob("*.json"))) <= 20
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_writers_evicting_the_same_directory_do_not_fail(tmp_path):
+    # Separate instances stand in for processes that unlink files mid-scan.
+    caches = [NarrativeCache(tmp_path, max_entries=20) for _ in range(4)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: caches[i % 4].put(f"k{i}", {"i": i}), range(400)))
+
+    caches[0]._evict_overflow()
+    assert len(list(tmp_path.glob("*.json"))) <= 20
+
+
+def test_failed_put_leaves_no_temp_file(tmp_path, monkeypatch):
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    cache = NarrativeCache(tmp_path)
+    monkeypatch.setattr(narrative_cache.os, "replace", replace)
+    with pytest.raises(OSError, match="disk full"):
+        cache.put("k", {"agent_narrative": "memo"})
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,114 @@
+import importlib
+import sys
+from io import BytesIO
+
+import pytest
+from fpdf import FPDF
+from PIL import Image
+
+pypdf = pytest.importorskip("pypdf")
+
+import core.pdf_writer as pdf_writer
+from benchmarks.synthetic import synthetic_history
+from core.analytics import build_analysis_summary
+from core.charts import CHART_RENDERERS
+from core.context import AnalysisContext
+from core.data import normalize_history
+from core.reports import ReportBuilder
+from run_report import build_report_pdf
+
+
+@pytest.fixture(scope="module")
+def report():
+    context = AnalysisContext("SYN", normalize_history(synthetic_history("SYN", 2)))
+    result = {
+        "analysis_summary": build_analysis_summary("SYN", context),
+        "agent_narrative": "Constructive memo (with parentheses) and a backslash \\ in it. " * 60,
+        "reasoning_log": [f"Step {i}: reviewed the tape." for i in range(1, 7)],
+    }
+    return context, result
+
+
+def _reader(data: bytes):
+    return pypdf.PdfReader(BytesIO(data))
+
+
+def _png(mode: str) -> bytes:
+    out = BytesIO()
+    Image.new(mode, (40, 20), (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(out, format="PNG")
+    return out.getvalue()
+
+
+# -----------------------------------
+# Report Packet
+# -----------------------------------
+def test_report_parses_with_text_and_charts(report):
+    context, result = report
+    reader = _reader(build_report_pdf("SYN", context, result))
+    text = "\n".join(page.extract_text() for page in reader.pages)
+
+    assert len(reader.pages) >= 3
+    assert "Financial Intelligence Report: SYN" in text
+    assert "Constructive memo (with parentheses) and a backslash \\ in it." in text
+    assert "Step 6: reviewed the tape." in text
+    assert sum(len(page.images) for page in reader.pages) == len(CHART_RENDERERS)
+
+
+def test_streamed_file_matches_bytes(report, tmp_path):
+    context, result = report
+    charts = {"drawdown": _png("RGB")}
+    path = tmp_path / "report.pdf"
+
+    build_report_pdf("SYN", context, result, output=str(path), charts=charts)
+    assert path.read_bytes() == build_report_pdf("SYN", context, result, charts=charts)
+
+
+def test_page_count_matches_builder():
+    rb = ReportBuilder()
+    rb.add_title("Title")
+    for i in range(8):
+        rb.add_section(f"Section {i}", "Body text. " * 200)
+    pages = rb.pdf.page_count
+
+    assert len(_reader(rb.to_bytes()).pages) == pages > 1
+
+
+def test_flattened_and_passthrough_images_decode():
+    rb = ReportBuilder()
+    rb.add_title("Images")
+    rb.add_image(_png("RGB"))
+    rb.add_image(_png("RGBA"))
+
+    images = [image.image for page in _reader(rb.to_bytes()).pages for image in page.images]
+    assert [image.size for image in images] == [(40, 20), (40, 20)]
+    assert images[0].getpixel((0, 0))[:3] == (200, 30, 30)
+    # Half-transparent red over white.
+    assert images[1].getpixel((0, 0))[:3] == pytest.approx((228, 142, 142), abs=2)
+
+
+# -----------------------------------
+# Fonts
+# -----------------------------------
+@pytest.mark.parametrize("family, style", [("helvetica", ""), ("helvetica", "B"), ("times", "I"), ("courier", "")])
+def test_string_width_matches_fpdf(family, style):
+    text = "Drawdown -38.2%, volatility 0.41 (WWW iii)"
+    reference = FPDF()
+    reference.set_font(family, style, 11)
+
+    writer = pdf_writer.StreamingPDF(BytesIO())
+    writer.set_font(family, style, 11)
+    assert writer.string_width(text) == pytest.approx(reference.get_string_width(text))
+
+
+def test_fonts_without_private_fpdf_module(monkeypatch):
+    expected = {key: pdf_writer.font_widths(key) for key in pdf_writer.CORE_FONTS}
+    names = dict(pdf_writer.CORE_FONTS)
+
+    monkeypatch.setitem(sys.modules, "fpdf.fonts", None)
+    try:
+        fallback = importlib.reload(pdf_writer)
+        assert fallback.CORE_FONTS_CHARWIDTHS is None and fallback.CORE_FONTS == names
+        assert {key: fallback.font_widths(key) for key in names} == expected
+    finally:
+        monkeypatch.undo()
+        importlib.reload(pdf_writer)
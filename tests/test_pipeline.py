@@ -0,0 +1,148 @@
+import concurrent.futures
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import agents.finance_agent_team as team
+import core.pipeline as pipeline_module
+import run_report
+from agents.finance_agent_team import InvestmentCommittee
+from agents.mock_model import mock_model_factory
+from core.pipeline import CANCEL, PROCESS, Pipeline
+from tests.test_committee import SUMMARY
+
+
+def _pid(ticker: str) -> int:
+    return os.getpid()
+
+
+def _graph(calls: list) -> Pipeline:
+    def record(name, value):
+        calls.append(name)
+        return value
+
+    pipeline = Pipeline(max_workers=4)
+    pipeline.add("a", lambda x: record("a", x + 1), deps=["x"])
+    pipeline.add("b", lambda x: record("b", x * 2), deps=["x"])
+    pipeline.add("c", lambda a, y: record("c", a + y), deps=["a", "y"])
+    pipeline.add("d", lambda b, c: record("d", b + c), deps=["b", "c"])
+    return pipeline
+
+
+# -----------------------------------
+# Graph and Memoization
+# -----------------------------------
+def test_stages_run_once_in_dependency_order():
+    calls = []
+    results = _graph(calls).run({"x": 1, "y": 10})
+
+    assert (results["a"], results["b"], results["c"], results["d"]) == (2, 2, 12, 14)
+    assert sorted(calls) == ["a", "b", "c", "d"] and calls[-1] == "d"
+    assert calls.index("c") > calls.index("a")
+
+
+def test_changed_inputs_rerun_only_their_downstream():
+    calls = []
+    pipeline = _graph(calls)
+    results = pipeline.run({"x": 1, "y": 10})
+
+    calls.clear()
+    assert pipeline.run({"x": 1, "y": 20}, results)["d"] == 24 and sorted(calls) == ["c", "d"]
+    calls.clear()
+    assert pipeline.run({"x": 1, "y": 10}, results, targets=["b"])["b"] == 2 and calls == []
+    calls.clear()
+    pipeline.run({"x": 1, "y": 10}, results, invalidate=["a"])
+    assert sorted(calls) == ["a", "c", "d"]
+
+
+def test_independent_stages_overlap():
+    both = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline()
+    pipeline.add("left", lambda x: both.wait() >= 0, deps=["x"])
+    pipeline.add("right", lambda x: both.wait() >= 0, deps=["x"])
+    assert pipeline.run({"x": 0})["left"]
+
+
+def test_graph_errors():
+    pipeline = Pipeline().add("a", lambda x: x, deps=["x"])
+    with pytest.raises(ValueError, match="duplicate"):
+        pipeline.add("a", lambda x: x)
+    with pytest.raises(ValueError, match="added before"):
+        pipeline.add("x", lambda: 0)
+    with pytest.raises(ValueError, match="nothing provides"):
+        pipeline.run({})
+    with pytest.raises(ValueError, match="scheduler"):
+        pipeline.add("p", lambda cancel: 0, deps=[CANCEL], kind=PROCESS)
+
+
+# -----------------------------------
+# Failures and Cancellation
+# -----------------------------------
+def test_failure_signals_running_stages_and_waits_for_them():
+    stopped = {}
+
+    def slow(x, cancel):
+        stopped["signalled"] = cancel.wait(5)
+        time.sleep(0.05)
+        stopped["returned_at"] = time.time()
+
+    def broken(x):
+        time.sleep(0.05)
+        raise RuntimeError("chart failed")
+
+    pipeline = Pipeline().add("slow", slow, deps=["x", CANCEL]).add("broken", broken, deps=["x"])
+    started = time.time()
+    with pytest.raises(RuntimeError, match="chart failed"):
+        pipeline.run({"x": 0})
+
+    # The slow stage was told to stop and had returned before run() raised.
+    assert stopped["signalled"] and "returned_at" in stopped
+    assert time.time() - started < 2
+
+
+def test_cancel_stops_a_debate_between_model_calls():
+    committee = InvestmentCommittee(mock_model_factory(latency=0.3), backoff=0, rate_limit_backoff=0)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+
+    with pytest.raises(concurrent.futures.CancelledError):
+        committee.debate(SUMMARY, cancel=cancel)
+
+    # Uncancelled, the analysts would reply at 0.3s and the chair at 0.6s.
+    time.sleep(0.8)
+    assert [agent.model.calls for agent in committee.agents.values()] == [0, 0, 0, 0]
+
+
+def test_failed_chart_stops_the_report_debate(offline, monkeypatch):
+    committee = InvestmentCommittee(mock_model_factory(latency=0.3), backoff=0, rate_limit_backoff=0)
+    monkeypatch.setattr(team, "_committee", committee)
+
+    def render_chart(context, name):
+        time.sleep(0.05)
+        raise RuntimeError(f"{name} failed")
+
+    monkeypatch.setattr(run_report, "render_chart", render_chart)
+    with pytest.raises(RuntimeError, match="failed"):
+        run_report.report_pipeline().run({"ticker": offline.tickers[0], "output": None, "label": None})
+
+    time.sleep(0.8)
+    assert [agent.model.calls for agent in committee.agents.values()] == [0, 0, 0, 0]
+
+
+# -----------------------------------
+# Process Stages
+# -----------------------------------
+def test_process_pool_is_shared_across_runs(monkeypatch):
+    pool = ProcessPoolExecutor(max_workers=1)
+    monkeypatch.setattr(pipeline_module, "_process_pool", pool)
+    try:
+        first = Pipeline().add("pid", _pid, deps=["ticker"], kind=PROCESS).run({"ticker": "A"})["pid"]
+        second = Pipeline().add("pid", _pid, deps=["ticker"], kind=PROCESS).run({"ticker": "B"})["pid"]
+        assert first == second != os.getpid()
+        assert pipeline_module.get_process_pool() is pool
+        assert pool.submit(_pid, "C").result() == first  # still open after both runs
+    finally:
+        pool.shutdown()
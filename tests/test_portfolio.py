@@ -0,0 +1,130 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_universe
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import PriceCache
+from core.portfolio import (
+    PortfolioContext,
+    build_portfolio_summary,
+    normalize_weights,
+    portfolio_risk,
+    regime_breakdown,
+)
+from tests.test_data import RecordingProvider
+
+
+@pytest.fixture
+def book(tmp_path):
+    universe = synthetic_universe(4, 3)
+    tickers = list(universe)
+    # A late listing and a ticker that misses some sessions.
+    universe[tickers[1]] = universe[tickers[1]].iloc[400:]
+    universe[tickers[2]] = universe[tickers[2]].drop(universe[tickers[2]].index[100:600:29])
+    cache = PriceCache(tmp_path, RecordingProvider(universe))
+    weights = {tickers[0]: 4, tickers[1]: 3, tickers[2]: 2, tickers[3]: 1, "EMPTY": 0.5}
+    return PortfolioContext.load(weights, period="5y", cache=cache, max_workers=2), cache
+
+
+# -----------------------------------
+# Weights
+# -----------------------------------
+def test_normalize_weights():
+    weights = normalize_weights([("A", 1), ("B", 2), ("A", 1)])
+    assert weights.to_dict() == {"A": 0.5, "B": 0.5}
+    assert normalize_weights(pd.Series({"A": 3.0})).to_dict() == {"A": 1.0}
+
+    for bad in ({"A": -1}, {"A": float("nan")}, {"A": 0}, {}):
+        with pytest.raises(ValueError):
+            normalize_weights(bad)
+
+
+# -----------------------------------
+# Shared Load and Summaries
+# -----------------------------------
+def test_each_holding_is_fetched_once(book):
+    portfolio, cache = book
+    assert sorted(ticker for ticker, _, _ in cache.provider.calls) == sorted(portfolio.tickers)
+    assert portfolio.tickers[-1] == "EMPTY" and portfolio.weights.sum() == pytest.approx(1.0)
+
+
+def test_summaries_match_per_ticker_pipeline(book):
+    portfolio, _ = book
+    for ticker, summary in portfolio.summaries.items():
+        context = portfolio.contexts[ticker]
+        expected = build_analysis_summary(ticker, AnalysisContext(ticker, context.hist))
+        assert summary == expected, ticker
+        if summary["data_available"]:
+            assert context.summary is summary
+
+
+def test_returns_use_each_holdings_own_bars(book):
+    portfolio, _ = book
+    for ticker in portfolio.tickers[:3]:
+        own = portfolio.contexts[ticker].hist.set_index("date")["close"].pct_change().dropna()
+        aligned = portfolio.returns[ticker].dropna()
+        np.testing.assert_allclose(aligned.to_numpy(), own.to_numpy())
+
+
+def test_portfolio_returns_renormalize_over_traded_holdings(book):
+    portfolio, _ = book
+    returns = portfolio.returns
+    day = returns.index[200]  # before the late listing: some holdings did not trade
+    traded = returns.loc[day].dropna()
+    weights = portfolio.weights[traded.index]
+
+    assert portfolio.portfolio_returns[day] == pytest.approx((traded * weights).sum() / weights.sum())
+    assert portfolio.nav.iloc[-1] == pytest.approx((1 + portfolio.portfolio_returns).prod())
+
+
+def test_correlation_needs_overlap(tmp_path):
+    universe = synthetic_universe(2, 1)
+    a, b = universe
+    universe[b] = universe[b].iloc[-40:]
+    portfolio = PortfolioContext.load({a: 1, b: 1}, cache=PriceCache(tmp_path, RecordingProvider(universe)))
+
+    assert np.isnan(portfolio.correlation.loc[a, b]) and portfolio.correlation.loc[a, a] == 1.0
+    assert portfolio_risk(portfolio)["average_correlation"] is None
+
+
+# -----------------------------------
+# Cross-sectional Analytics
+# -----------------------------------
+def test_regime_breakdown_covers_the_book(book):
+    portfolio, _ = book
+    rows = regime_breakdown(portfolio)
+
+    assert sum(row["weight_pct"] for row in rows) == pytest.approx(100, abs=0.05)
+    assert rows[-1] == {"regime": "NO_DATA", "holdings": 1, "weight_pct": 4.76, "tickers": ["EMPTY"]}
+    for row in rows[:-1]:
+        assert all(portfolio.summaries[t]["regime"] == row["regime"] for t in row["tickers"])
+
+
+def test_portfolio_risk(book):
+    portfolio, _ = book
+    risk = portfolio_risk(portfolio)
+    returns = portfolio.portfolio_returns
+
+    assert risk["observations"] == len(returns)
+    assert risk["annualized_volatility"] == round(float(returns.std() * np.sqrt(252)), 3)
+    assert risk["max_drawdown_pct"] == round(float((portfolio.nav / portfolio.nav.cummax() - 1).min()) * 100, 2)
+    assert risk["diversification_ratio"] >= 1.0
+
+
+def test_portfolio_packet_has_every_holding(book):
+    pypdf = pytest.importorskip("pypdf")
+    from run_report import build_portfolio_pdf
+
+    portfolio, _ = book
+    summary = build_portfolio_summary(portfolio)
+    reader = pypdf.PdfReader(BytesIO(build_portfolio_pdf(portfolio, summary=summary)))
+    text = "\n".join(page.extract_text() for page in reader.pages)
+
+    assert "Portfolio Research Packet: 5 Holdings" in text
+    for ticker in portfolio.tickers:
+        assert f"Appendix: {ticker}" in text
+    assert sum(len(page.images) for page in reader.pages) >= 3
@@ -0,0 +1,152 @@
+import pytest
+
+from agents.finance_agent_team import AGENT_SPECS, InvestmentCommittee, validate_narrative
+from agents.mock_model import mock_model_factory
+from agents.narrative_cache import narrative_cache_key
+from agents.prompts import (
+    AGENT_BUDGETS,
+    AGENT_FIELDS,
+    CORE_FIELDS,
+    build_prompt,
+    condense_position,
+    estimate_tokens,
+    serialize_summary,
+    token_report,
+)
+
+
+SUMMARY = {
+    "ticker": "SYN",
+    "data_available": True,
+    "time_period": "2020-01-01 to 2024-12-31",
+    "trend": "downward",
+    "annualized_volatility": 0.4123456789,
+    "volatility_percentile": 71.5,
+    "max_drawdown_pct": -38.2,
+    "downtrend_days": 45,
+    "recovery_probability_pct": 25.0,
+    "observations": 1260,
+    "regime": "CAUTION",
+    "risk_score": 4,
+    "position_size_suggestion": "1%–3% tactical allocation with strict stop-loss",
+}
+
+TAKE = (
+    "## Bull case\n"
+    "**Recovery odds sit at 25.0%.** The trend may turn once volatility of 0.41 eases. "
+    "Momentum is fading. Momentum is fading.\n\n"
+    "- Drawdowns of -38.2% have healed before. Buyers defended 81.48 twice.\n"
+) * 3
+
+
+# -----------------------------------
+# Serialization
+# -----------------------------------
+def test_serialization_is_canonical_and_verbatim():
+    shuffled = dict(reversed(list(SUMMARY.items())))
+    text = serialize_summary(shuffled)
+
+    assert text == serialize_summary(SUMMARY)
+    assert text.splitlines()[:3] == ["ticker: SYN", "time_period: 2020-01-01 to 2024-12-31", "regime: CAUTION"]
+    assert "annualized_volatility: 0.4123456789" in text and "data_available" not in text
+    assert serialize_summary({**SUMMARY, "extra": float("nan"), "beta": 1.2}).endswith("beta: 1.2\nextra: n/a")
+
+
+def test_numbers_quoted_from_the_prompt_verify():
+    quoted = "\n".join(line.split(": ", 1)[1] for line in serialize_summary(SUMMARY).splitlines()[3:])
+    assert not validate_narrative(quoted, SUMMARY)["fabricated_numbers_detected"]
+
+
+# -----------------------------------
+# Budgets
+# -----------------------------------
+def test_prompts_within_budget_keep_every_field():
+    for key in AGENT_FIELDS:
+        prompt = build_prompt(key, SUMMARY)
+        assert prompt["prompt_tokens"] == estimate_tokens(prompt["text"]) <= AGENT_BUDGETS[key]
+        assert prompt["dropped_fields"] == [] and not prompt["over_budget"]
+
+
+def test_tight_budget_drops_lowest_priority_fields_first():
+    full = build_prompt("bear", SUMMARY)["prompt_tokens"]
+    prompt = build_prompt("bear", SUMMARY, budget=full - 10)
+
+    optional = AGENT_FIELDS["bear"]
+    assert prompt["dropped_fields"] == optional[len(optional) - len(prompt["dropped_fields"]):]
+    assert 0 < len(prompt["dropped_fields"]) < len(optional)
+    assert prompt["prompt_tokens"] <= full - 10
+    for field in CORE_FIELDS:
+        assert f"{field}: " in prompt["text"]
+
+
+def test_core_fields_survive_any_budget():
+    prompt = build_prompt("risk", SUMMARY, budget=1)
+    assert prompt["over_budget"] and prompt["dropped_fields"] == AGENT_FIELDS["risk"]
+    assert "regime: CAUTION" in prompt["text"] and "position_size_suggestion: " in prompt["text"]
+
+
+# -----------------------------------
+# Chair Positions
+# -----------------------------------
+def test_condense_position_keeps_leading_sentences():
+    condensed = condense_position(TAKE, max_tokens=30)
+
+    assert estimate_tokens(condensed) <= 30
+    assert condensed.startswith("Recovery odds sit at 25.0%.")
+    assert "Drawdowns of -38.2% have healed before." in condensed
+    assert "#" not in condensed and "**" not in condensed
+    assert condense_position(TAKE).count("Momentum is fading.") == 1
+    assert "81.48 twice." in condense_position(TAKE)
+
+
+def test_chair_prompt_condenses_each_position_within_budget():
+    takes = {spec["name"]: TAKE * 10 for key, spec in AGENT_SPECS.items() if key != "chair"}
+    prompt = build_prompt("chair", SUMMARY, takes)
+
+    assert prompt["prompt_tokens"] <= AGENT_BUDGETS["chair"]
+    assert set(prompt["condensed_positions"]) == set(takes)
+    for row in prompt["condensed_positions"].values():
+        assert row["kept_tokens"] < row["original_tokens"] == estimate_tokens(TAKE * 10)
+
+
+# -----------------------------------
+# Token Accounting
+# -----------------------------------
+def test_token_report_totals_turns():
+    turns = {
+        "Bull": {"prompt_tokens": 100, "budget_tokens": 400, "input_tokens": 120, "output_tokens": 50},
+        "Chair": {"prompt_tokens": 300, "budget_tokens": 900, "input_tokens": 330, "output_tokens": 200,
+                  "stopped_drafts": [{"conflicts": ["regime_conflict"], "chars": 41}]},
+    }
+    report = token_report(turns)
+
+    assert report["agents"]["Chair"]["discarded_tokens"] == 11
+    assert (report["input_tokens"], report["output_tokens"], report["total_tokens"]) == (450, 250, 700)
+    assert (report["prompt_tokens"], report["discarded_tokens"]) == (400, 11)
+
+
+def test_debate_turns_report_prompt_and_provider_tokens():
+    committee = InvestmentCommittee(mock_model_factory(), backoff=0, rate_limit_backoff=0)
+    turns = committee.debate(SUMMARY)["turns"]
+    report = token_report(turns)
+
+    assert set(report["agents"]) == {spec["name"] for spec in AGENT_SPECS.values()}
+    for row in report["agents"].values():
+        assert 0 < row["prompt_tokens"] <= row["budget_tokens"]
+        assert row["input_tokens"] >= row["prompt_tokens"] and row["output_tokens"] > 0
+
+
+def test_budgets_are_part_of_the_cache_key():
+    key = narrative_cache_key(SUMMARY, AGENT_SPECS, "mock-chat", AGENT_BUDGETS)
+    assert key == narrative_cache_key(dict(SUMMARY), AGENT_SPECS, "mock-chat", dict(AGENT_BUDGETS))
+    assert key != narrative_cache_key(SUMMARY, AGENT_SPECS, "mock-chat", {**AGENT_BUDGETS, "chair": 500})
+
+
+@pytest.mark.parametrize("budgets", [{"bull": 50}, {"chair": 120}])
+def test_committee_budget_overrides(budgets):
+    committee = InvestmentCommittee(mock_model_factory(), backoff=0, rate_limit_backoff=0, budgets=budgets)
+    assert committee.budgets == {**AGENT_BUDGETS, **budgets}
+
+    turns = committee.debate(SUMMARY)["turns"]
+    (key, budget), = budgets.items()
+    assert turns[AGENT_SPECS[key]["name"]]["budget_tokens"] == budget
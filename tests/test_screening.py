@@ -0,0 +1,56 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_universe
+from core.analytics import build_analysis_summary, classify_risk_regime, estimate_recovery_probability
+from core.context import AnalysisContext
+from core.data import close_matrix, normalize_history
+from core.screening import (
+    classify_regimes,
+    estimate_recovery_probabilities,
+    score_risk,
+    screen_summaries,
+    screen_universe,
+)
+
+
+@pytest.fixture(scope="module")
+def histories():
+    histories = {t: normalize_history(h) for t, h in synthetic_universe(12, 3).items()}
+    tickers = list(histories)
+    # A late listing and a ticker that skips some sessions (another venue's holidays).
+    histories[tickers[1]] = histories[tickers[1]].iloc[300:].reset_index(drop=True)
+    histories[tickers[2]] = histories[tickers[2]].drop(index=range(100, 700, 37)).reset_index(drop=True)
+    return histories
+
+
+def test_screen_matches_per_ticker_summaries(histories):
+    summaries = screen_summaries(screen_universe(close_matrix(histories)))
+
+    for ticker, hist in histories.items():
+        expected = build_analysis_summary(ticker, context=AnalysisContext(ticker, hist))
+        assert summaries[ticker] == expected, ticker
+
+
+def test_screen_marks_missing_tickers(histories):
+    histories = dict(histories, EMPTY=normalize_history(None))
+    summaries = screen_summaries(screen_universe(close_matrix(histories)))
+    assert summaries["EMPTY"]["data_available"] is False
+
+
+def test_vectorized_rules_match_scalar_rules():
+    cases = list(itertools.product(["upward", "downward"], [0.1, 0.3, 0.35, 0.4, 0.6],
+                                   [-10.0, -25.0, -40.0, -59.9, -60.0], [10.0, 50.0, 90.0]))
+    trend, volatility, drawdown, percentile = map(np.array, zip(*cases))
+
+    scores = score_risk(trend == "downward", volatility, drawdown)
+    regimes = classify_regimes(scores)
+    recovery = estimate_recovery_probabilities(trend == "upward", drawdown, percentile)
+
+    for i, (t, v, d, p) in enumerate(cases):
+        expected = classify_risk_regime({"data_available": True, "trend": t, "annualized_volatility": v,
+                                         "max_drawdown_pct": d})
+        assert (regimes[i], scores[i]) == (expected["regime"], expected["risk_score"])
+        assert recovery[i] == estimate_recovery_probability(t, d, p)
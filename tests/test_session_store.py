@@ -0,0 +1,198 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import agents.session_store as session_store
+from agents.finance_agent_team import run_financial_intelligence
+from agents.session_store import ConnectionPool, SessionStore
+
+
+SUMMARY = {"ticker": "SYN", "regime": "CAUTION", "risk_score": 4}
+
+
+def _debate(seq: int = 0) -> dict:
+    return {
+        "agent_narrative": f"Chair memo {seq}.",
+        "analyst_takes": {"Bull": f"Bull take {seq}.", "Bear": f"Bear take {seq}."},
+        "consistency_score": 90,
+        "agent_turns": {
+            "Bull": {"input_tokens": 10, "output_tokens": 5},
+            "Bear": {"input_tokens": 12, "output_tokens": 6},
+            "Chair": {"input_tokens": 30, "output_tokens": 20, "regenerations": 0},
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db")
+    yield store
+    store.close()
+
+
+def _count(store: SessionStore, table: str) -> int:
+    with store._pool.connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# -----------------------------------
+# Writes and Reads
+# -----------------------------------
+def test_debate_round_trip(store):
+    run_id = store.record_debate("SYN", "mock-chat", SUMMARY, _debate())
+    run, = store.recent_runs()
+
+    assert run["run_id"] == run_id and run["ticker"] == "SYN" and run["regime"] == "CAUTION"
+    assert (run["input_tokens"], run["output_tokens"]) == (52, 31)
+    assert [(turn["agent"], turn["content"]) for turn in run["turns"]] == [
+        ("Bull", "Bull take 0."), ("Bear", "Bear take 0."), ("Chair", "Chair memo 0."),
+    ]
+    assert run["turns"][-1]["regenerations"] == 0
+
+
+def test_recent_runs_are_newest_first_and_filtered(store):
+    for i, ticker in enumerate(["AAA", "BBB", "AAA"]):
+        store.record_debate(ticker, "mock-chat", {**SUMMARY, "ticker": ticker}, _debate(i))
+
+    assert [run["turns"][-1]["content"] for run in store.recent_runs()] == [
+        "Chair memo 2.", "Chair memo 1.", "Chair memo 0.",
+    ]
+    assert [run["ticker"] for run in store.recent_runs("AAA")] == ["AAA", "AAA"]
+    assert len(store.recent_runs(limit=1)) == 1
+
+
+def test_runs_are_batched_into_one_transaction(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", batch_size=3)
+    for i in range(2):
+        store.record_debate("SYN", "mock-chat", SUMMARY, _debate(i))
+    assert store.stats["flushes"] == 0 and _count(store, "debate_runs") == 0
+
+    store.record_debate("SYN", "mock-chat", SUMMARY, _debate(2))
+    assert store.stats["flushes"] == 1 and _count(store, "debate_runs") == 3
+
+    store.record_debate("SYN", "mock-chat", SUMMARY, _debate(3))
+    store.close()
+    reopened = SessionStore(tmp_path / "sessions.db")
+    assert reopened.metrics()["runs"] == 4 and _count(reopened, "debate_turns") == 12
+    reopened.close()
+
+
+def test_failed_flush_keeps_pending_runs(store, monkeypatch):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(store._pool, "connection", locked)
+        with pytest.raises(sqlite3.OperationalError):
+            store.record_debate("SYN", "mock-chat", SUMMARY, _debate(0))
+    assert len(store._pending) == 1 and store.stats["flushes"] == 0
+
+    store.record_debate("SYN", "mock-chat", SUMMARY, _debate(1))
+    assert [run["turns"][-1]["content"] for run in store.recent_runs()] == ["Chair memo 1.", "Chair memo 0."]
+    assert store.stats["flushes"] == 1 and not store._pending
+
+
+def test_concurrent_writers_share_the_pool(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", pool_size=2)
+
+    def write(worker):
+        for i in range(10):
+            store.record_debate(f"T{worker}", "mock-chat", SUMMARY, _debate(i))
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.metrics()["runs"] == 60 and store.stats["turns_written"] == 180
+    assert len(store._pool._all) <= 2
+    store.close()
+
+
+def test_pool_hands_each_connection_to_one_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+    with pool.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        waiter = threading.Thread(target=lambda: pool.connection().__enter__())
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive()  # blocked until the connection is returned
+    waiter.join(5)
+    assert not waiter.is_alive()
+    pool.close()
+
+
+# -----------------------------------
+# Retention
+# -----------------------------------
+def test_compact_applies_age_and_count_limits(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", retention_days=1, max_runs=3)
+    for i in range(5):
+        store.record_debate("SYN", "mock-chat", SUMMARY, _debate(i))
+    with store._pool.connection() as conn:
+        conn.execute("UPDATE debate_runs SET created_at = ? WHERE run_id = ?",
+                     (time.time() - 2 * 24 * 60 * 60, store.recent_runs()[0]["run_id"]))
+
+    # The aged run is also the oldest, so the count limit only adds one more.
+    assert store.compact() == 2
+    assert [run["turns"][-1]["content"] for run in store.recent_runs()] == [
+        "Chair memo 3.", "Chair memo 2.", "Chair memo 1.",
+    ]
+    assert _count(store, "debate_turns") == 9 and store.stats["runs_deleted"] == 2
+    store.close()
+
+
+def test_compaction_runs_every_n_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "COMPACT_EVERY_RUNS", 4)
+    store = SessionStore(tmp_path / "sessions.db", max_runs=2)
+    for i in range(7):
+        store.record_debate("SYN", "mock-chat", SUMMARY, _debate(i))
+
+    assert store.stats["runs_deleted"] == 2 and store.metrics()["runs"] == 5
+    store.close()
+
+
+# -----------------------------------
+# Default Store
+# -----------------------------------
+def test_pipeline_records_each_debate(offline):
+    ticker = offline.tickers[0]
+    run_financial_intelligence(ticker)
+    run_financial_intelligence(ticker)  # a cache hit is not a new run
+
+    runs = session_store.get_session_store().recent_runs(ticker)
+    assert len(runs) == 1 and len(runs[0]["turns"]) == 4
+    assert runs[0]["model"] == "mock-chat"
+
+
+def test_store_errors_do_not_fail_the_debate(offline, monkeypatch):
+    def broken(*args):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    ticker = offline.tickers[0]
+    with monkeypatch.context() as patch:
+        patch.setattr(session_store.get_session_store(), "record_debate", broken)
+        assert run_financial_intelligence(ticker)["agent_narrative"]
+    # The memo was still cached.
+    assert run_financial_intelligence(ticker)["observability"]["narrative_cache"] == "hit"
+
+
+def test_store_can_be_disabled(offline, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(session_store, "_default_store", session_store._UNSET)
+        patch.setattr(session_store, "DEFAULT_SESSION_DB", "off")
+        assert session_store.get_session_store() is None
+
+        result = run_financial_intelligence(offline.tickers[0], use_cache=False)
+        assert result["agent_narrative"]
+
+
+def test_store_file_is_a_plain_sqlite_database(store):
+    store.record_debate("SYN", "mock-chat", SUMMARY, _debate())
+    store.flush()
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("SELECT ticker FROM debate_runs").fetchall() == [("SYN",)]
+    conn.close()
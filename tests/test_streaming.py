@@ -0,0 +1,109 @@
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_history
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import normalize_history, slice_period
+from core.streaming import IncrementalAnalytics, _DrawdownWindow, _OrderStatistics, _RunningVariance
+
+
+@pytest.fixture(scope="module")
+def hist():
+    return normalize_history(synthetic_history("SYN", 8))
+
+
+def _batch_summary(hist: pd.DataFrame, period: str = "5y") -> dict:
+    return build_analysis_summary("SYN", AnalysisContext("SYN", slice_period(hist, period)))
+
+
+def _assert_matches(streamed: dict, batch: dict):
+    assert streamed.keys() == batch.keys()
+    for key, value in batch.items():
+        if isinstance(value, float) and math.isnan(value):
+            assert math.isnan(streamed[key]), key
+        else:
+            assert streamed[key] == value, key
+
+
+# -----------------------------------
+# Accumulators
+# -----------------------------------
+def test_order_statistics_match_brute_force():
+    rng = random.Random(0)
+    stats, values = _OrderStatistics(), []
+
+    for step in range(3000):
+        value = round(rng.random(), 2)  # plenty of ties
+        stats.add(value)
+        values.append(value)
+        if step % 3 == 2:
+            stats.remove(values.pop(rng.randrange(len(values))))
+
+        probe = rng.choice(values)
+        expected = pd.Series(values).rank(pct=True).iloc[values.index(probe)] * 100
+        assert stats.percentile(probe) == pytest.approx(expected)
+
+    assert stats.count == len(values) and sum(map(len, stats.blocks)) == len(values)
+
+
+def test_drawdown_window_matches_cummax():
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.02, 2000)))
+    window = _DrawdownWindow()
+    start = 0
+
+    for end, close in enumerate(closes, 1):
+        window.push(close)
+        while end - start > 250:
+            window.pop()
+            start += 1
+        segment = pd.Series(closes[start:end])
+        assert window.max_drawdown == (segment / segment.cummax() - 1).min()
+
+
+def test_running_variance_add_and_remove():
+    values = np.random.default_rng(2).normal(0, 0.01, 500)
+    variance = _RunningVariance()
+    for value in values:
+        variance.add(value)
+    for value in values[:200]:
+        variance.remove(value)
+    assert variance.std == pytest.approx(np.std(values[200:], ddof=1), rel=1e-9)
+
+
+# -----------------------------------
+# Incremental State
+# -----------------------------------
+def test_from_history_matches_batch_summary(hist):
+    recent = slice_period(hist, "5y")
+    state = IncrementalAnalytics.from_history("SYN", recent)
+    _assert_matches(state.summary(), _batch_summary(recent))
+
+
+def test_state_is_bounded_to_the_period(hist):
+    # Seed with two years, then stream six more: bars past five years must fall out.
+    seed = 500
+    state = IncrementalAnalytics.from_history("SYN", hist.iloc[:seed])
+
+    for i in range(seed, len(hist)):
+        row = hist.iloc[i]
+        summary = state.update(row["date"], float(row["close"]))
+        if i % 250 == 0 or i == len(hist) - 1:
+            _assert_matches(summary, _batch_summary(hist.iloc[:i + 1]))
+
+    assert state.observations == len(slice_period(hist, "5y"))
+    assert state.vol_ranks.count == len(state.window_vols) == state.observations - 60
+
+
+def test_period_none_keeps_every_bar(hist):
+    state = IncrementalAnalytics.from_history("SYN", hist, period=None)
+    assert state.observations == len(hist)
+    _assert_matches(state.summary(), _batch_summary(hist, "max"))
+
+
+def test_empty_state_reports_no_data():
+    assert IncrementalAnalytics("SYN").summary()["data_available"] is False
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import core.tracing as tracing
+from agents.finance_agent_team import run_financial_intelligence
+from core.tracing import AggregatorSink, JsonlSink, Tracer, current_span, summarize_trace
+
+
+class ListSink:
+    def __init__(self):
+        self.spans = []
+
+    def emit(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = ListSink()
+    monkeypatch.setattr(tracing, "_tracer", Tracer([sink]))
+    return sink
+
+
+# -----------------------------------
+# Spans
+# -----------------------------------
+def test_nested_spans_share_a_trace(sink):
+    with tracing.span("outer", rows=3) as outer:
+        with tracing.span("inner") as inner:
+            assert current_span() is inner
+        assert current_span() is outer
+    assert current_span() is None
+
+    inner, outer = sink.spans
+    assert inner.trace_id == outer.trace_id and inner.parent_id == outer.span_id
+    assert outer.parent_id is None and outer.to_dict()["rows"] == 3
+    assert outer.duration_seconds >= inner.duration_seconds >= 0
+
+
+def test_errors_are_recorded_and_raised(sink):
+    with pytest.raises(ValueError):
+        with tracing.span("failing"):
+            raise ValueError("bad bar")
+
+    assert sink.spans[0].status == "error" and sink.spans[0].error == "ValueError: bad bar"
+
+
+# -----------------------------------
+# Sinks
+# -----------------------------------
+def test_aggregator_percentiles_and_totals():
+    aggregator = AggregatorSink()
+    for i in range(1, 101):
+        aggregator.record("stage", i / 100, attrs={"rows": 10, "input_tokens": 2, "note": "x"})
+    aggregator.record("stage", 2.0, status="error")
+
+    stats = aggregator.stats()["stage"]
+    assert stats["count"] == 101 and stats["errors"] == 1
+    assert stats["p50_seconds"] == 0.51 and stats["p99_seconds"] == 1.0 and stats["max_seconds"] == 2.0
+    assert stats["rows"] == 1000 and stats["input_tokens"] == 200 and "note" not in stats
+
+
+def test_aggregator_keeps_a_bounded_sample():
+    aggregator = AggregatorSink(max_samples=5)
+    for i in range(20):
+        aggregator.record("stage", float(i))
+    stats = aggregator.stats()["stage"]
+    assert stats["count"] == 20 and stats["p50_seconds"] == 17.0
+
+
+def test_jsonl_trace_round_trip(tmp_path):
+    path = tmp_path / "traces" / "run.jsonl"
+    tracer = Tracer([JsonlSink(str(path))])
+    for rows in (5, 7):
+        with tracer.span("data.fetch", rows=rows):
+            pass
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["rows"] for line in lines] == [5, 7] and all("pid" in line for line in lines)
+    assert summarize_trace(str(path))["data.fetch"]["rows"] == 12
+
+
+def test_profiled_stages_carry_profile_and_memory():
+    sink = ListSink()
+    tracer = Tracer([sink], profile_stages=["hot"], profile_limit=5)
+    with tracer.span("hot"):
+        sum(list(range(10000)))
+    with tracer.span("cold"):
+        pass
+
+    hot, cold = sink.spans
+    assert "cumulative" in hot.attrs["profile"] and hot.attrs["memory_peak_bytes"] > 0
+    assert "profile" not in cold.attrs
+
+
+def test_tracer_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("FINANCE_TRACE_FILE", str(tmp_path / "trace.jsonl"))
+    monkeypatch.setenv("FINANCE_PROFILE_STAGES", "pdf.write, data.fetch")
+    tracer = tracing._tracer_from_env()
+    assert tracer.profile_stages == {"pdf.write", "data.fetch"}
+    assert isinstance(tracer.sinks[0], JsonlSink)
+
+
+# -----------------------------------
+# Pipeline Instrumentation
+# -----------------------------------
+def test_pipeline_emits_stage_spans(offline, sink):
+    run_financial_intelligence(offline.tickers[0], use_cache=False)
+    names = [span.name for span in sink.spans]
+
+    for stage in ("data.fetch", "analytics.summary", "committee.debate", "agent.turn",
+                  "narrative.validation", "pipeline.intelligence"):
+        assert stage in names, stage
+    assert names.count("agent.turn") == 4
+
+    fetch = next(span for span in sink.spans if span.name == "data.fetch")
+    assert fetch.attrs["rows"] > 0 and fetch.attrs["bytes"] > 0
+    turns = [span for span in sink.spans if span.name == "agent.turn"]
+    assert all("input_tokens" in span.attrs and "output_tokens" in span.attrs for span in turns)
+    assert len({span.trace_id for span in sink.spans if span.name != "committee.build"}) == 1
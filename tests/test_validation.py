@@ -0,0 +1,115 @@
+import pytest
+
+from agents.finance_agent_team import validate_narrative
+from agents.validation import NumberStream, ValueIndex, check_numbers, tokenize_numbers
+
+
+SUMMARY = {
+    "ticker": "SYN",
+    "annualized_volatility": 0.412,
+    "volatility_percentile": 45.0,
+    "max_drawdown_pct": -32.5,
+    "downtrend_days": 12,
+    "recovery_probability_pct": 55.0,
+    "risk_score": 4,
+    "observations": 1260,
+    "regime": "CAUTION",
+    "position_size_suggestion": "1%–3% tactical allocation with strict stop-loss",
+}
+
+MEMO = (
+    "1. Annualized volatility stands at 41.2% (0.412), in the 45th percentile.\n"
+    "2. The maximum drawdown of -32.5% since 2020-03-23 and 12 days below the 200-day average "
+    "leave a recovery probability of 55%.\n"
+    "Step 3: keep a 1%-3% tactical allocation; the risk score is 4 over 1,260 observations in 2024.\n"
+    "Allocate 55% of the book and expect +32.5% upside over 45 days."
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ValueIndex.from_summary(SUMMARY)
+
+
+def _statuses(text: str, index: ValueIndex) -> list:
+    return [(finding["text"], finding["status"], finding["field"]) for finding in check_numbers(text, index)]
+
+
+# -----------------------------------
+# Tokens
+# -----------------------------------
+def test_tokens_carry_sign_unit_and_decimals():
+    tokens = tokenize_numbers("Down -32.5% over 12 days, v1.2 and Q3, range 1%-3%, +4, 1,260 bars on 2024-01-02")
+    assert [(t["value"], t["decimals"], t["unit"]) for t in tokens if t["kind"] == "number"] == [
+        (-32.5, 1, "percent"), (12.0, 0, "days"), (1.0, 0, "percent"), (3.0, 0, "percent"),
+        (4.0, 0, None), (1260.0, 0, None),
+    ]
+    assert tokens[-1]["kind"] == "date"
+
+
+# -----------------------------------
+# Value Index
+# -----------------------------------
+@pytest.mark.parametrize("text, field", [
+    ("41.2%", "annualized_volatility"),
+    ("41%", "annualized_volatility"),
+    ("0.41", "annualized_volatility"),
+    ("45th percentile", "volatility_percentile"),
+    ("-32.5%", "max_drawdown_pct"),
+    ("a 32.5% drawdown", "max_drawdown_pct"),
+    ("12 days", "downtrend_days"),
+    ("55%", "recovery_probability_pct"),
+    ("risk score 4", "risk_score"),
+    ("1,260", "observations"),
+    ("Exposure of 3%", "position_size_suggestion"),
+    ("Allocate cautiously given a recovery probability of 55%", "recovery_probability_pct"),
+])
+def test_rounded_figures_verify(text, field, index):
+    _, status, found = _statuses(text, index)[-1]
+    assert (status, found) == ("verified", field)
+
+
+@pytest.mark.parametrize("text", [
+    "45 days",                    # the percentile, written as a day count
+    "12%",                        # the downtrend, written as a percentage
+    "4%",                         # the risk score, written as a percentage
+    "Allocate 55% of the book",   # a position size, not the recovery probability
+    "+32.5%, a gain",             # the drawdown with the wrong sign
+    "-41.2%",                     # volatility is never negative
+    "0",
+])
+def test_figures_with_the_wrong_unit_or_sign_are_unverified(text, index):
+    assert [status for _, status, _ in _statuses(text, index)] == ["unverified"]
+
+
+def test_incidental_numbers(index):
+    findings = check_numbers(MEMO, index)
+    reasons = {finding["text"]: finding["reason"] for finding in findings if finding["status"] == "incidental"}
+    assert reasons == {"1": "list_marker", "2": "list_marker", "3": "list_marker", "2020-03-23": "date",
+                       "200-day": "method_window", "2024": "year"}
+
+
+@pytest.mark.parametrize("text", ["A 5-year history", "over 3 months", "the last 12 months", "a 2-week rally"])
+def test_horizon_phrases_are_incidental(text, index):
+    finding, = check_numbers(text, index)
+    assert (finding["status"], finding["reason"]) == ("incidental", "horizon")
+    assert not validate_narrative(text, SUMMARY)["fabricated_numbers_detected"]
+
+
+def test_validate_narrative_flags_only_fabricated_figures():
+    validation = validate_narrative(MEMO, SUMMARY)
+    flagged = [note.rsplit(": ", 1)[1] for note in validation["validation_notes"]]
+    assert validation["fabricated_numbers_detected"]
+    assert flagged == ["55%", "32.5%", "45 days"]
+
+
+# -----------------------------------
+# Streaming
+# -----------------------------------
+@pytest.mark.parametrize("size", [1, 3, 16, 1000])
+def test_stream_matches_batch_check(size, index):
+    stream = NumberStream(index)
+    for i in range(0, len(MEMO), size):
+        stream.feed(MEMO[i:i + size])
+    stream.close()
+    assert stream.findings == check_numbers(MEMO, index)
@@ -0,0 +1,124 @@
+import time
+
+import pandas as pd
+import pytest
+
+from core.analytics import build_analysis_summary
+from core.context import AnalysisContext
+from core.data import FixtureProvider, PriceCache
+from core.watcher import RegimeWatcher
+from tests.test_data import RecordingProvider, _history
+
+
+FULL = _history(days=900)
+
+
+@pytest.fixture
+def source():
+    return {"SYN": FULL.iloc[:-5].copy()}
+
+
+@pytest.fixture
+def cache(tmp_path, source):
+    return PriceCache(tmp_path, RecordingProvider(source))
+
+
+def _seeded(cache, **options) -> RegimeWatcher:
+    watcher = RegimeWatcher(["SYN"], period="2y", cache=cache, max_workers=1, **options)
+    watcher.seed()
+    return watcher
+
+
+def _assert_matches_batch(watcher, cache):
+    cached = cache.get("SYN", period="2y")
+    assert watcher.states["SYN"].summary() == build_analysis_summary("SYN", AnalysisContext("SYN", cached))
+
+
+# -----------------------------------
+# Pull Mode
+# -----------------------------------
+def test_pull_reads_through_the_cache(cache, source):
+    watcher = _seeded(cache)
+    source["SYN"] = FULL.copy()
+    cache.provider.calls.clear()
+
+    watcher.refresh()
+
+    # Only the top-up since the last cached bar hit the provider, and the cache kept it.
+    assert [start for _, _, start in cache.provider.calls] == [pd.Timestamp(FULL.index[-6])]
+    assert cache._read("SYN")[1]["last_date"] == str(FULL.index[-1])
+    assert watcher.cycles[-1]["bars_ingested"] == 5
+    _assert_matches_batch(watcher, cache)
+
+
+def test_fresh_cache_entries_are_not_refetched(cache, source):
+    watcher = _seeded(cache, max_age=3600)
+    source["SYN"] = FULL.copy()
+    cache.provider.calls.clear()
+
+    assert watcher.refresh() == []
+    assert cache.provider.calls == [] and watcher.cycles[-1]["tickers_updated"] == 0
+
+
+def test_partial_last_bar_is_replaced(cache, source):
+    watcher = _seeded(cache)
+    corrected = source["SYN"].copy()
+    corrected.iloc[-1, corrected.columns.get_loc("Close")] *= 0.97
+    source["SYN"] = corrected
+
+    watcher.refresh()
+
+    assert watcher.cycles[-1]["bars_revised"] == 1
+    assert watcher.states["SYN"].last_close == pytest.approx(corrected["Close"].iloc[-1])
+    _assert_matches_batch(watcher, cache)
+
+
+def test_unchanged_bars_do_not_count_as_updates(cache):
+    watcher = _seeded(cache)
+    watcher.refresh()
+    assert watcher.cycles[-1]["tickers_updated"] == 0 and watcher.cycles[-1]["bars_revised"] == 0
+
+
+# -----------------------------------
+# Push Mode
+# -----------------------------------
+def test_push_updates_emit_transitions(cache):
+    events = []
+    watcher = _seeded(cache, on_transition=[events.append])
+    state = watcher.states["SYN"]
+    before = watcher.regimes["SYN"][0]
+
+    # A steady slide: deep drawdown, high volatility, below the moving average.
+    dates = pd.bdate_range(state.last_date + pd.Timedelta(days=1), periods=120)
+    closes = state.last_close * 0.97 ** pd.Series(range(1, 121)) * (1 + 0.03 * (-1) ** pd.Series(range(120)))
+    watcher.refresh({"SYN": list(zip(dates, closes)), "UNKNOWN": [(dates[0], 1.0)]})
+
+    assert watcher.cycles[-1]["bars_ingested"] == 120
+    assert watcher.regimes["SYN"][0] == "DEFENSIVE" != before
+    assert events and events[0]["from_regime"] == before and events[-1]["to_regime"] == "DEFENSIVE"
+    assert watcher.metrics()["events"] == len(events)
+
+
+def test_stale_pushed_bars_are_ignored(cache):
+    watcher = _seeded(cache)
+    state = watcher.states["SYN"]
+    observations = state.observations
+
+    watcher.refresh({"SYN": [(state.bars[-10][0], 1.0), (state.last_date, state.last_close)]})
+    assert state.observations == observations and watcher.cycles[-1]["tickers_updated"] == 0
+
+
+class SlowProvider(FixtureProvider):
+    def history(self, *args, **kwargs):
+        time.sleep(0.05)
+        return super().history(*args, **kwargs)
+
+
+def test_cycle_records_its_start_time(tmp_path, source):
+    watcher = _seeded(PriceCache(tmp_path, SlowProvider(source)))
+    before = time.time()
+    watcher.refresh()
+    after = time.time()
+
+    cycle = watcher.cycles[-1]
+    assert before <= cycle["started_at"] <= after - cycle["latency_seconds"] + 1e-3